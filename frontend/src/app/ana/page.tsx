@@ -2,7 +2,7 @@
 
 import { useState, useRef, useEffect } from 'react';
 import { apiFetch } from '@/lib/api';
-import type { ChatMessage as ChatMsg } from '@/lib/types';
+import type { AnaChatResponse, ChatMessage as ChatMsg } from '@/lib/types';
 import ChatMessage from '@/components/ana/ChatMessage';
 import ChatInput from '@/components/ana/ChatInput';
 import ChatSuggestions from '@/components/ana/ChatSuggestions';
@@ -11,6 +11,7 @@ export default function AnaPage() {
   const [messages, setMessages] = useState<ChatMsg[]>([]);
   const [input, setInput] = useState('');
   const [sending, setSending] = useState(false);
+  const [conversationId, setConversationId] = useState<string | null>(null);
   const bottomRef = useRef<HTMLDivElement>(null);
 
   useEffect(() => {
@@ -28,13 +29,14 @@ export default function AnaPage() {
     setSending(true);
 
     try {
-      const res = await apiFetch<{ reply: string }>('/ana/chat', {
+      const res = await apiFetch<AnaChatResponse>('/ana/chat', {
         method: 'POST',
         body: JSON.stringify({
           message: msg,
-          history: updated.slice(-10),
+          conversation_id: conversationId,
         }),
       });
+      setConversationId(res.conversation_id);
       setMessages((prev) => [...prev, { role: 'assistant', content: res.reply }]);
     } catch (err: any) {
       setMessages((prev) => [
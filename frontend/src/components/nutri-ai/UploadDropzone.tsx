@@ -5,6 +5,13 @@ import { useRouter } from 'next/navigation';
 import { apiFetch } from '@/lib/api';
 import Button from '@/components/ui/Button';
 import Alert from '@/components/ui/Alert';
+import Input from '@/components/ui/Input';
+
+interface CatalogProduct {
+  barcode: string;
+  product_name: string | null;
+  brand: string | null;
+}
 
 export default function UploadDropzone() {
   const router = useRouter();
@@ -16,6 +23,8 @@ export default function UploadDropzone() {
   const [error, setError] = useState('');
   const [step, setStep] = useState<'upload' | 'extracted'>('upload');
   const [nutritionData, setNutritionData] = useState<Record<string, number> | null>(null);
+  const [barcode, setBarcode] = useState('');
+  const [product, setProduct] = useState<CatalogProduct | null>(null);
 
   function handleFile(f: File) {
     if (!f.type.startsWith('image/')) { setError('Please upload an image file.'); return; }
@@ -24,6 +33,7 @@ export default function UploadDropzone() {
     setPreview(URL.createObjectURL(f));
     setStep('upload');
     setNutritionData(null);
+    setProduct(null);
   }
 
   function onDrop(e: DragEvent) {
@@ -33,14 +43,19 @@ export default function UploadDropzone() {
   }
 
   async function handleUpload() {
-    if (!file) return;
+    if (!file && !barcode.trim()) return;
     setUploading(true);
     setError('');
     try {
+      // A barcode already in the product catalog is answered without OCR
       const body = new FormData();
-      body.append('image', file);
-      const result = await apiFetch<{ nutrition_info: Record<string, number> }>('/nutri-ai/upload', { method: 'POST', body });
+      if (file) body.append('image', file);
+      if (barcode.trim()) body.append('barcode', barcode.trim());
+      const result = await apiFetch<{ nutrition_info: Record<string, number>; product?: CatalogProduct }>(
+        '/nutri-ai/upload', { method: 'POST', body },
+      );
       setNutritionData(result.nutrition_info);
+      setProduct(result.product ?? null);
       setStep('extracted');
     } catch (err: unknown) {
       const message = err instanceof Error ? err.message : 'Upload failed';
@@ -63,7 +78,13 @@ export default function UploadDropzone() {
       };
       const result = await apiFetch('/nutri-ai/analyze', {
         method: 'POST',
-        body: JSON.stringify({ nutrition_info: nutritionData, user_profile: userProfile }),
+        body: JSON.stringify({
+          nutrition_info: nutritionData,
+          user_profile: userProfile,
+          barcode: barcode.trim() || undefined,
+          product_name: product?.product_name ?? undefined,
+          brand: product?.brand ?? undefined,
+        }),
       });
       sessionStorage.setItem('nutri_result', JSON.stringify(result));
       router.push('/nutri-ai/results');
@@ -103,8 +124,17 @@ export default function UploadDropzone() {
         <p className="mt-1 text-xs text-text-tertiary">JPG, PNG, WEBP up to 10 MB</p>
       </div>
 
+      <Input
+        label="Barcode (optional)"
+        id="barcode"
+        inputMode="numeric"
+        placeholder="e.g. 5000159484695"
+        value={barcode}
+        onChange={(e) => { setBarcode(e.target.value); setStep('upload'); setProduct(null); }}
+      />
+
       {step === 'upload' && (
-        <Button onClick={handleUpload} loading={uploading} disabled={!file} size="lg" className="w-full">
+        <Button onClick={handleUpload} loading={uploading} disabled={!file && !barcode.trim()} size="lg" className="w-full">
           {uploading ? 'Extracting nutrition data...' : 'Extract Nutrition Data'}
         </Button>
       )}
@@ -112,7 +142,9 @@ export default function UploadDropzone() {
       {step === 'extracted' && nutritionData && (
         <div className="space-y-4">
           <div className="rounded-xl border border-border bg-surface p-6">
-            <h3 className="mb-4 text-lg font-semibold">Extracted Nutrition Facts</h3>
+            <h3 className="mb-4 text-lg font-semibold">
+              {product ? `${product.product_name ?? 'Catalog product'}${product.brand ? ` · ${product.brand}` : ''}` : 'Extracted Nutrition Facts'}
+            </h3>
             <div className="grid grid-cols-2 gap-3 sm:grid-cols-3">
               {Object.entries(nutritionData).map(([key, val]) => (
                 <div key={key} className="rounded-lg bg-bg p-3 text-center">
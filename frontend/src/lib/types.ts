@@ -66,6 +66,12 @@ export interface ChatMessage {
   content: string;
 }
 
+export interface AnaChatResponse {
+  reply: string;
+  conversation_id: string;
+  cached: boolean;
+}
+
 export interface MuscleTaskStatus {
   task_id: string;
   status: 'pending' | 'processing' | 'completed' | 'failed';
@@ -4,8 +4,10 @@ Main application entry point with authentication and routing to microservices.
 Serves both the legacy Jinja2 frontend and the new JSON API for the Next.js frontend.
 """
 
+import math
 import os
 import sys
+import time
 import secrets
 from pathlib import Path
 from datetime import datetime, timezone
@@ -32,7 +34,13 @@ if str(PROJECT_ROOT) not in sys.path:
 
 from services.shared.database.models import db, User, ScanHistory, WorkoutSession, init_db
 from gateway.auth_jwt import generate_tokens, decode_token, jwt_required, jwt_optional
-from gateway.nutri_ai_lite import extract_nutrition_from_image, calculate_health_metrics, generate_score
+from gateway.nutri_ai_lite import calculate_health_metrics, generate_score
+from gateway.image_prep import prepare_label_image, ImageRejected
+from gateway.label_hash_cache import fingerprint, label_hash_index
+from gateway.product_catalog import normalize_barcode, lookup_barcode, record_catalog_hit
+from gateway.extraction_tiers import tiered_extractor
+from gateway.user_metrics import get_user_metrics, metric_inputs, profile_from_user, refresh_if_changed
+from services.nutri_ai_service.core.prompts.compiler import prompt_compiler
 
 login_manager = LoginManager()
 oauth = OAuth()
@@ -298,6 +306,7 @@ def _register_legacy_dashboard(app):
     @login_required
     def settings():
         if request.method == 'POST':
+            before = metric_inputs(current_user)
             current_user.name = request.form.get('name', current_user.name)
             current_user.age = request.form.get('age', type=int)
             current_user.gender = request.form.get('gender')
@@ -306,7 +315,9 @@ def _register_legacy_dashboard(app):
             current_user.activity_level = request.form.get('activity_level')
             current_user.diet_type = request.form.get('diet_type')
             current_user.goal = request.form.get('goal')
+            refresh_if_changed(current_user, before)
             db.session.commit()
+            prompt_compiler.invalidate_user(current_user.id)
             flash('Settings saved', 'success')
             return redirect(url_for('settings'))
         return render_template('dashboard/settings.html', user=current_user)
@@ -474,6 +485,7 @@ def _register_api_user(app):
         if not user:
             return jsonify({'error': 'User not found'}), 404
         data = request.get_json(silent=True) or {}
+        before = metric_inputs(user)
         for field in ['name', 'age', 'gender', 'height_cm', 'weight_kg', 'activity_level', 'diet_type', 'goal']:
             if field in data:
                 setattr(user, field, data[field])
@@ -481,7 +493,9 @@ def _register_api_user(app):
             user.allergies = data['allergies']
         if 'medical_conditions' in data:
             user.medical_conditions = data['medical_conditions']
+        refresh_if_changed(user, before)
         db.session.commit()
+        prompt_compiler.invalidate_user(user.id)
         return jsonify(_user_to_full_dict(user))
 
     @app.route('/api/v1/user/scans', methods=['GET'])
@@ -543,18 +557,64 @@ def _register_api_services(app):
     @app.route('/api/v1/nutri-ai/upload', methods=['POST'])
     @jwt_optional
     def api_nutri_upload():
+        barcode = normalize_barcode(request.form.get('barcode'))
+        if barcode:
+            product = lookup_barcode(barcode)
+            if product:
+                record_catalog_hit(barcode)
+                return jsonify({
+                    'success': True,
+                    'nutrition_info': product['nutrition_data'],
+                    'product': {k: product[k] for k in ('barcode', 'product_name', 'brand')},
+                    'source': 'catalog',
+                    'cached': True,
+                })
+
         if 'image' not in request.files:
+            if barcode:
+                return jsonify({'error': 'Product not in catalog, please upload the label image', 'barcode': barcode}), 404
             return jsonify({'error': 'No image file provided'}), 400
         file = request.files['image']
         if not file.filename:
             return jsonify({'error': 'Empty filename'}), 400
 
         mime = file.content_type or 'image/jpeg'
-        image_bytes = file.read()
-        nutrition_info = extract_nutrition_from_image(image_bytes, mime)
+        try:
+            image_bytes, mime, image_stats = prepare_label_image(file.read(), mime)
+        except ImageRejected as e:
+            return jsonify({'error': str(e)}), e.status
+
+        label_fp = fingerprint(image_bytes)
+        if label_fp is not None:
+            match = label_hash_index.lookup(label_fp, g.current_user_id)
+            if match:
+                return jsonify({
+                    'success': True,
+                    'nutrition_info': match['nutrition_info'],
+                    'cached': True,
+                    'match': {'confidence': match['confidence'], 'scope': match['scope']},
+                    'image_stats': image_stats,
+                })
+
+        started = time.perf_counter()
+        nutrition_info, tier_info = tiered_extractor.extract(image_bytes, mime)
+        image_stats['extract_ms'] = round((time.perf_counter() - started) * 1000, 1)
         if 'error' in nutrition_info:
-            return jsonify(nutrition_info), 422
-        return jsonify({'success': True, 'nutrition_info': nutrition_info})
+            return jsonify({**nutrition_info, 'image_stats': image_stats, 'extraction': tier_info}), 422
+        if label_fp is not None:
+            label_hash_index.add(label_fp, nutrition_info, g.current_user_id)
+        return jsonify({
+            'success': True,
+            'nutrition_info': nutrition_info,
+            'cached': False,
+            'image_stats': image_stats,
+            'extraction': tier_info,
+        })
+
+    @app.route('/api/v1/nutri-ai/cache-stats', methods=['GET'])
+    @jwt_required
+    def api_nutri_cache_stats():
+        return jsonify({'label_hash': label_hash_index.stats(), 'extraction': tiered_extractor.stats()})
 
     @app.route('/api/v1/nutri-ai/analyze', methods=['POST'])
     @jwt_optional
@@ -562,11 +622,34 @@ def _register_api_services(app):
         data = request.get_json(silent=True) or {}
         nutrition_info = data.get('nutrition_info')
         user_profile = data.get('user_profile')
+
+        # Signed-in users with measurements on file use their stored profile
+        # and materialized metrics; the profile payload is only a fallback.
+        health_metrics = None
+        if g.current_user_id:
+            user = _get_user_by_id(g.current_user_id)
+            health_metrics = get_user_metrics(user) if user else None
+            if health_metrics:
+                user_profile = profile_from_user(user)
         if not nutrition_info or not user_profile:
             return jsonify({'error': 'nutrition_info and user_profile are required'}), 400
+        if health_metrics is None:
+            health_metrics = calculate_health_metrics(user_profile)
+        score, explanation = generate_score(user_profile, nutrition_info, health_metrics, g.current_user_id)
 
-        health_metrics = calculate_health_metrics(user_profile)
-        score, explanation = generate_score(user_profile, nutrition_info, health_metrics)
+        # Recorded scans feed the dashboard history and catalog promotion.
+        if g.current_user_id:
+            db.session.add(ScanHistory(
+                user_id=g.current_user_id,
+                product_name=data.get('product_name'),
+                brand=data.get('brand'),
+                barcode=normalize_barcode(data.get('barcode')),
+                nutrition_data=nutrition_info,
+                score=score,
+                explanation=explanation,
+                meal_type=data.get('meal_type'),
+            ))
+            db.session.commit()
         return jsonify({
             'success': True,
             'score': score,
@@ -592,8 +675,17 @@ def _register_api_services(app):
             return jsonify({'error': 'No video file'}), 400
         file = request.files['video']
         exercise_type = request.form.get('exercise_type', '')
+        # Optional Muscle AI settings: analysis_fps, mode=metrics, timeline=1
+        options = {k: request.form[k] for k in ('analysis_fps', 'mode', 'timeline') if request.form.get(k)}
         if not file.filename or not exercise_type:
             return jsonify({'error': 'Video and exercise_type are required'}), 400
+        if 'analysis_fps' in options:
+            try:
+                analysis_fps = float(options['analysis_fps'])
+            except ValueError:
+                analysis_fps = None
+            if analysis_fps is None or not math.isfinite(analysis_fps) or analysis_fps <= 0:
+                return jsonify({'error': 'analysis_fps must be a positive number'}), 400
 
         filename = secure_filename(file.filename)
         ts = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -605,7 +697,7 @@ def _register_api_services(app):
 
         try:
             from gateway.tasks import analyze_video
-            task = analyze_video.delay(str(save_path), exercise_type)
+            task = analyze_video.delay(str(save_path), exercise_type, options)
             return jsonify({'task_id': task.id, 'status': 'processing'})
         except Exception:
             _, muscle_url = _service_urls()
@@ -614,7 +706,7 @@ def _register_api_services(app):
                     resp = http_requests.post(
                         f"{muscle_url}/muscle/upload",
                         files={'video': (save_name, f, 'video/mp4')},
-                        data={'exercise_type': exercise_type},
+                        data={**options, 'exercise_type': exercise_type},
                         timeout=120,
                     )
                 if save_path.exists():
@@ -653,20 +745,17 @@ def _register_api_ana(app):
         if g.current_user_id:
             user = _get_user_by_id(g.current_user_id)
             if user:
-                user_profile = {
-                    'age': user.age, 'gender': user.gender,
-                    'activity_level': user.activity_level,
-                    'diet_type': user.diet_type, 'goal': user.goal,
-                    'allergies': user.allergies or [],
-                    'medical_history': {'diseases': user.medical_conditions or []},
-                }
-
-        reply = ana_chat_fn(
+                user_profile = profile_from_user(user)
+                user_profile['health_metrics'] = get_user_metrics(user)
+
+        result = ana_chat_fn(
             message=message,
             history=data.get('history', []),
             user_profile=user_profile,
+            conversation_id=data.get('conversation_id'),
+            owner_id=g.current_user_id,
         )
-        return jsonify({'reply': reply})
+        return jsonify(result)
 
 
 # ===================================================================
@@ -21,4 +21,10 @@ celery_app.conf.update(
     enable_utc=True,
     task_track_started=True,
     result_expires=3600,
+    beat_schedule={
+        'promote-catalog-products': {
+            'task': 'wellnix.promote_catalog_products',
+            'schedule': 3600.0,
+        },
+    },
 )
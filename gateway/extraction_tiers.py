@@ -0,0 +1,207 @@
+"""
+Confidence-tiered nutrition label extraction.
+
+Tier 1 sends the image to the Nutri AI service's OCR endpoint
+(``POST /health/api/ocr``: the EasyOCR worker pool and the label parser),
+so the gateway itself never loads EasyOCR.  It is off unless
+``NUTRI_LOCAL_OCR=1`` and that service is deployed.  The parse is scored
+on completeness, the parser's per-field confidence and plausibility - the
+macros should reconcile with the calories (4 kcal/g protein and carbs,
+9 kcal/g fat) and sub-fields should not exceed their parents.  Only when
+that score is below ``MIN_CONFIDENCE``, a scoring field (``SCORING_FIELDS``)
+was not found, or the service is unreachable does the image go to tier 2,
+the Groq vision model.  A local answer carries only the fields OCR found,
+so a missed field is never reported as 0.
+
+Every extraction records the tier that answered and its latency, so
+``stats()`` shows how much vision traffic and time the local tier saves.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+import requests as http_requests
+
+from gateway.nutri_ai_lite import extract_nutrition_from_image
+
+LOCAL_OCR_ENABLED = os.getenv("NUTRI_LOCAL_OCR", "0") == "1"
+LOCAL_OCR_TIMEOUT_SECONDS = float(os.getenv("NUTRI_LOCAL_OCR_TIMEOUT", "20"))
+MIN_CONFIDENCE = float(os.getenv("NUTRI_TIER_MIN_CONFIDENCE", "0.75"))
+FALLBACK_MIN_CONFIDENCE = float(os.getenv("NUTRI_TIER_FALLBACK_MIN_CONFIDENCE", "0.5"))
+
+CORE_FIELDS = ("calories", "protein", "carbs", "fat")
+SCORING_FIELDS = CORE_FIELDS + ("sugars", "sodium")  # a local answer must have all of these
+CALORIE_TOLERANCE = 0.2  # relative gap allowed between stated and macro calories
+LATENCY_WINDOW = 500
+
+
+def _ocr_url() -> str:
+    return os.environ.get("NUTRI_AI_URL", "http://localhost:5001").rstrip("/") + "/health/api/ocr"
+
+
+def found_fields(values: Dict[str, float], confidence: Dict[str, float]) -> Dict[str, float]:
+    """Only the fields the parser actually found (it reports the rest as 0.0)."""
+    return {field: value for field, value in values.items() if confidence.get(field, 0.0) > 0}
+
+
+def _calorie_gap(values: Dict[str, float]) -> Optional[float]:
+    """Relative gap between stated calories and the macro estimate, or None."""
+    calories = values.get("calories", 0.0)
+    if calories <= 0:
+        return None
+    protein, carbs, fat = values.get("protein", 0.0), values.get("carbs", 0.0), values.get("fat", 0.0)
+    fiber = min(values.get("fiber", 0.0), carbs)
+    # Labels differ on whether fibre counts as 4 or 2 kcal/g; take the closer.
+    estimates = (4 * (protein + carbs) + 9 * fat, 4 * (protein + carbs - fiber) + 2 * fiber + 9 * fat)
+    return min(abs(est - calories) for est in estimates) / calories
+
+
+def score_extraction(values: Dict[str, float], confidence: Dict[str, float]) -> Tuple[float, Dict]:
+    """Score a local parse in [0, 1]; returns ``(score, details)``."""
+    found = [f for f in CORE_FIELDS if confidence.get(f, 0.0) > 0]
+    completeness = len(found) / len(CORE_FIELDS)
+    field_confidence = sum(confidence[f] for f in found) / len(found) if found else 0.0
+
+    gap = _calorie_gap(values) if len(found) == len(CORE_FIELDS) else None
+    if gap is None:
+        plausibility = 0.85
+    else:
+        plausibility = 1.0 if gap <= CALORIE_TOLERANCE else 0.5
+    if values.get("sugars", 0.0) > values.get("carbs", 0.0) + 0.5:
+        plausibility *= 0.7
+    if values.get("saturated_fat", 0.0) + values.get("trans_fat", 0.0) > values.get("fat", 0.0) + 0.5:
+        plausibility *= 0.7
+
+    score = round(completeness * field_confidence * plausibility, 3)
+    return score, {
+        "completeness": round(completeness, 2),
+        "field_confidence": round(field_confidence, 2),
+        "calorie_gap": round(gap, 3) if gap is not None else None,
+        "plausibility": round(plausibility, 2),
+    }
+
+
+class TieredExtractor:
+    """Local OCR first, vision model only when the local parse is weak."""
+
+    TIERS = ("local", "vision")
+
+    def __init__(self, min_confidence: float = MIN_CONFIDENCE,
+                 fallback_min_confidence: float = FALLBACK_MIN_CONFIDENCE):
+        self.min_confidence = min_confidence
+        self.fallback_min_confidence = fallback_min_confidence
+        self._latency = {tier: deque(maxlen=LATENCY_WINDOW) for tier in self.TIERS}
+        self._lock = threading.Lock()
+        self.metrics = {
+            "extractions": 0,
+            "local_answers": 0,
+            "vision_answers": 0,
+            "escalations": 0,
+            "local_unavailable": 0,
+            "local_errors": 0,
+            "failures": 0,
+        }
+
+    def _bump(self, key: str) -> None:
+        with self._lock:
+            self.metrics[key] += 1
+
+    def _timed(self, tier: str, started: float) -> float:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._latency[tier].append(elapsed_ms)
+        return round(elapsed_ms, 1)
+
+    def _run_local(self, image_bytes: bytes, mime_type: str):
+        """``(values, confidence)`` from the OCR service, or None if it can't run."""
+        if not LOCAL_OCR_ENABLED:
+            self._bump("local_unavailable")
+            return None
+        try:
+            resp = http_requests.post(
+                _ocr_url(),
+                files={"image": ("label.jpg", image_bytes, mime_type)},
+                timeout=LOCAL_OCR_TIMEOUT_SECONDS,
+            )
+            resp.raise_for_status()
+            data = resp.json()
+            return data["nutrition_info"], data["confidence"]
+        except Exception:
+            # Service down, busy pool, timeout or a broken worker: the
+            # vision tier answers.
+            self._bump("local_errors")
+            return None
+
+    @staticmethod
+    def _usable(confidence: Dict[str, float], score: float, min_score: float) -> bool:
+        return score >= min_score and all(confidence.get(f, 0.0) > 0 for f in SCORING_FIELDS)
+
+    def extract(self, image_bytes: bytes, mime_type: str) -> Tuple[Dict, Dict]:
+        """Return ``(nutrition_info, tier_info)``.
+
+        ``nutrition_info`` has the same shape as
+        ``extract_nutrition_from_image`` (including its ``error`` key on
+        failure); ``tier_info`` says which tier answered and how long each
+        took.
+        """
+        self._bump("extractions")
+        tier_info: Dict = {"tier": None, "escalated": False}
+
+        started = time.perf_counter()
+        local = self._run_local(image_bytes, mime_type)
+        if local is not None:
+            values, confidence = local
+            score, details = score_extraction(values, confidence)
+            details["missing"] = [f for f in SCORING_FIELDS if confidence.get(f, 0.0) <= 0]
+            tier_info.update(local_ms=self._timed("local", started), local_score=score, local_details=details)
+            if self._usable(confidence, score, self.min_confidence):
+                self._bump("local_answers")
+                tier_info["tier"] = "local"
+                return found_fields(values, confidence), tier_info
+
+        tier_info["escalated"] = local is not None
+        if local is not None:
+            self._bump("escalations")
+        started = time.perf_counter()
+        nutrition_info = extract_nutrition_from_image(image_bytes, mime_type)
+        tier_info["vision_ms"] = self._timed("vision", started)
+
+        if "error" in nutrition_info:
+            if local is not None and self._usable(local[1], tier_info["local_score"],
+                                                  self.fallback_min_confidence):
+                # A weaker but complete local parse beats no answer at all.
+                self._bump("local_answers")
+                tier_info["tier"] = "local"
+                return found_fields(*local), tier_info
+            self._bump("failures")
+            return nutrition_info, tier_info
+
+        self._bump("vision_answers")
+        tier_info["tier"] = "vision"
+        return nutrition_info, tier_info
+
+    def stats(self) -> Dict:
+        with self._lock:
+            answered = self.metrics["local_answers"] + self.metrics["vision_answers"]
+            latency = {}
+            for tier, samples in self._latency.items():
+                ordered = sorted(samples)
+                latency[tier] = {
+                    "samples": len(ordered),
+                    "mean_ms": round(sum(ordered) / len(ordered), 1) if ordered else None,
+                    "p50_ms": round(ordered[len(ordered) // 2], 1) if ordered else None,
+                    "p95_ms": round(ordered[int(len(ordered) * 0.95)], 1) if ordered else None,
+                }
+            return {
+                **self.metrics,
+                "vision_avoided_rate": round(self.metrics["local_answers"] / answered, 3) if answered else 0.0,
+                "min_confidence": self.min_confidence,
+                "fallback_min_confidence": self.fallback_min_confidence,
+                "latency": latency,
+            }
+
+
+tiered_extractor = TieredExtractor()
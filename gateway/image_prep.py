@@ -0,0 +1,108 @@
+"""
+Label image preparation for the Groq vision call.
+
+Phone photos arrive at 12 MP+ and several MB; base64-encoding them as-is
+makes every vision request 5-8 MB.  This stage enforces upload limits,
+applies the EXIF orientation, crops to the nutrition panel when one is
+found (core/ocr/panel_detector.py in the nutri-ai service), downsamples to
+a long edge that keeps label text legible (see scripts/bench_image_prep.py)
+and re-encodes to a JPEG tuned to stay under a byte budget.
+
+Pillow is optional here: without it images pass through unchanged apart
+from the size limit.
+"""
+
+import io
+import os
+import time
+from typing import Dict, Tuple
+
+from services.nutri_ai_service.core.ocr.panel_detector import crop_to_panel
+
+MAX_UPLOAD_BYTES = int(os.getenv("NUTRI_MAX_IMAGE_BYTES", str(15 * 1024 * 1024)))
+MAX_PIXELS = 50_000_000
+TARGET_LONG_EDGE = int(os.getenv("NUTRI_IMAGE_LONG_EDGE", "1536"))
+TARGET_BYTES = int(os.getenv("NUTRI_IMAGE_TARGET_BYTES", str(350 * 1024)))
+JPEG_QUALITIES = (85, 78, 70, 62)
+
+
+class ImageRejected(ValueError):
+    """Upload cannot be used; ``status`` is the HTTP code to answer with."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def prepare_label_image(image_bytes: bytes, mime_type: str,
+                        long_edge: int = TARGET_LONG_EDGE,
+                        target_bytes: int = TARGET_BYTES) -> Tuple[bytes, str, Dict]:
+    """Return ``(bytes, mime_type, stats)`` ready for the vision model.
+
+    ``stats`` reports original/prepared byte counts and dimensions plus the
+    time spent here, so callers can surface the savings.
+    """
+    started = time.perf_counter()
+    stats = {"original_bytes": len(image_bytes)}
+
+    if not image_bytes:
+        raise ImageRejected("Empty image upload")
+    if len(image_bytes) > MAX_UPLOAD_BYTES:
+        raise ImageRejected(
+            f"Image exceeds the {MAX_UPLOAD_BYTES // (1024 * 1024)} MB upload limit", 413,
+        )
+
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        stats.update(prepared_bytes=len(image_bytes), prep_ms=0.0, resized=False)
+        return image_bytes, mime_type, stats
+
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+        width, height = image.size
+        if width * height > MAX_PIXELS:
+            raise ImageRejected("Image resolution is too large", 413)
+        orientation = image.getexif().get(0x0112, 1)
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+    except ImageRejected:
+        raise
+    except Exception:
+        raise ImageRejected("Uploaded file is not a readable image")
+
+    stats["original_size"] = list(image.size)
+    # Spend the pixel budget on the nutrition table, not the packaging art.
+    image, panel_box = crop_to_panel(image)
+    stats["panel_box"] = list(panel_box) if panel_box else None
+    resized = max(image.size) > long_edge
+    if resized:
+        image.thumbnail((long_edge, long_edge), Image.LANCZOS)
+    stats["prepared_size"] = list(image.size)
+
+    encoded = b""
+    for quality in JPEG_QUALITIES:
+        buf = io.BytesIO()
+        image.save(buf, format="JPEG", quality=quality, optimize=True, progressive=True)
+        encoded = buf.getvalue()
+        if len(encoded) <= target_bytes:
+            break
+    stats["jpeg_quality"] = quality
+
+    # A small, upright, already-compressed upload can come out larger; keep it.
+    keep_original = (
+        not resized and panel_box is None and orientation == 1 and len(encoded) >= len(image_bytes)
+        and mime_type in ("image/jpeg", "image/png", "image/webp")
+    )
+    if keep_original:
+        encoded = image_bytes
+    else:
+        mime_type = "image/jpeg"
+
+    stats.update(
+        prepared_bytes=len(encoded),
+        resized=resized,
+        prep_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+    return encoded, mime_type, stats
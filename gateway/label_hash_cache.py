@@ -0,0 +1,238 @@
+"""
+Perceptual-hash cache for nutrition label extraction.
+
+People scan the same products again and again.  Each processed label image
+is reduced to a 64-bit difference hash (dHash) and indexed in a BK-tree
+keyed on Hamming distance, mapping to the extracted ``nutrition_info``.
+A new photo of the same label lands within a few bits of the old one, so
+the previous extraction is reused instead of calling the vision model.
+
+A dHash only sees the layout of a label, not its digits: two products with
+the same ruled table and different values hash a bit or two apart.  So a
+near match is only a candidate.  It is served after a confirmation step
+that compares small grayscale thumbnails of both images pixel by pixel,
+which rejects any difference as large as a changed digit.  Near matches
+are searched in the user's own scans only.  Across users, an extraction is
+shared only for byte-identical images (same SHA-256).
+"""
+
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+HASH_BITS = 64
+MIN_CONFIDENCE = float(os.getenv("NUTRI_LABEL_HASH_MIN_CONFIDENCE", "0.9"))
+THUMBNAIL_SIZE = 64
+CONFIRM_MAX_DIFF = int(os.getenv("NUTRI_LABEL_HASH_CONFIRM_MAX_DIFF", "24"))
+MAX_ENTRIES_PER_SCOPE = 5000
+MAX_ENTRIES_PER_USER = 500
+MAX_USER_SCOPES = 2000
+
+
+class LabelFingerprint(NamedTuple):
+    digest: str  # SHA-256 of the image bytes
+    dhash: int
+    thumbnail: bytes  # THUMBNAIL_SIZE x THUMBNAIL_SIZE grayscale pixels
+
+
+def _dhash_pixels(pixels: List[int]) -> int:
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def fingerprint(image_bytes: bytes) -> Optional[LabelFingerprint]:
+    """Digest, dHash and confirmation thumbnail, or None if undecodable."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+        image.draft("L", (THUMBNAIL_SIZE, THUMBNAIL_SIZE))  # cheap JPEG downscale at decode time
+        gray = image.convert("L")
+        pixels = list(gray.resize((9, 8), Image.LANCZOS).getdata())
+        thumbnail = gray.resize((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.BOX).tobytes()
+    except Exception:
+        return None
+    return LabelFingerprint(hashlib.sha256(image_bytes).hexdigest(), _dhash_pixels(pixels), thumbnail)
+
+
+def thumbnails_match(a: bytes, b: bytes, max_diff: int = CONFIRM_MAX_DIFF) -> bool:
+    """True when no thumbnail pixel differs by more than ``max_diff`` levels.
+
+    A thumbnail pixel averages a small block of the label, so recompression
+    noise stays well below the threshold while a changed digit does not.
+    """
+    if len(a) != len(b):
+        return False
+    from PIL import Image, ImageChops
+
+    size = (THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+    diff = ImageChops.difference(Image.frombytes("L", size, a), Image.frombytes("L", size, b))
+    return diff.getextrema()[1] <= max_diff
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """Burkhard-Keller tree over 64-bit hashes with Hamming distance.
+
+    Nodes are ``[hash, [entry ids], {distance: child}]``; the triangle
+    inequality prunes every child whose edge distance is outside
+    ``d ± radius``.  Different labels can share a hash, so a node keeps
+    every entry stored under it.
+    """
+
+    def __init__(self):
+        self._root = None
+        self._entries: "OrderedDict[int, Tuple[int, Dict]]" = OrderedDict()  # id -> (hash, value), oldest first
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, key: int, value: Dict, same: Optional[Callable[[Dict], bool]] = None) -> None:
+        """Store ``value`` under ``key``.
+
+        An entry under the same hash for which ``same(entry)`` is true is
+        replaced (the newest extraction wins); any other is kept beside it.
+        """
+        node = self._node(key)
+        if same is not None:
+            for entry_id in node[1]:
+                if same(self._entries[entry_id][1]):
+                    node[1].remove(entry_id)
+                    del self._entries[entry_id]
+                    break
+        entry_id, self._next_id = self._next_id, self._next_id + 1
+        self._entries[entry_id] = (key, value)
+        node[1].append(entry_id)
+
+    def _node(self, key: int) -> list:
+        """The node holding ``key``, created if missing."""
+        if self._root is None:
+            self._root = [key, [], {}]
+            return self._root
+        node = self._root
+        while True:
+            d = hamming(key, node[0])
+            if d == 0:
+                return node
+            child = node[2].get(d)
+            if child is None:
+                child = node[2][d] = [key, [], {}]
+                return child
+            node = child
+
+    def search(self, key: int, radius: int) -> List[Tuple[int, Dict]]:
+        """All ``(distance, value)`` within ``radius``, nearest (then newest) first."""
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            d = hamming(key, node[0])
+            if d <= radius:
+                found.extend((d, self._entries[entry_id][1]) for entry_id in reversed(node[1]))
+            for edge, child in node[2].items():
+                if d - radius <= edge <= d + radius:
+                    stack.append(child)
+        found.sort(key=lambda item: item[0])
+        return found
+
+    def trim(self, max_entries: int) -> None:
+        """Drop the oldest half once over capacity (BK-trees can't delete)."""
+        if len(self._entries) <= max_entries:
+            return
+        for _ in range(len(self._entries) // 2):
+            self._entries.popitem(last=False)
+        self._root = None
+        for entry_id, (key, _) in self._entries.items():
+            self._node(key)[1].append(entry_id)
+
+
+class LabelHashIndex:
+    """Per-user BK-trees for confirmed near matches, a global table of exact
+    image digests, and hit metrics."""
+
+    def __init__(self, min_confidence: float = MIN_CONFIDENCE):
+        self.min_confidence = min_confidence
+        self._exact: "OrderedDict[str, Dict]" = OrderedDict()
+        self._users: Dict[int, BKTree] = {}
+        self._lock = threading.Lock()
+        self.metrics = {"lookups": 0, "exact_hits": 0, "user_hits": 0,
+                        "unconfirmed": 0, "misses": 0, "stored": 0}
+
+    @property
+    def radius(self) -> int:
+        return int((1 - self.min_confidence) * HASH_BITS)
+
+    def lookup(self, fp: LabelFingerprint, user_id: Optional[int] = None) -> Optional[Dict]:
+        """Best match as ``{'nutrition_info', 'confidence', 'scope'}`` or None."""
+        with self._lock:
+            self.metrics["lookups"] += 1
+            value = self._exact.get(fp.digest)
+            if value is not None:
+                self.metrics["exact_hits"] += 1
+                return {"nutrition_info": dict(value), "confidence": 1.0, "scope": "exact"}
+
+            tree = self._users.get(user_id) if user_id is not None else None
+            candidates = tree.search(fp.dhash, self.radius) if tree is not None else []
+        # Thumbnail comparison runs outside the lock
+        for distance, entry in candidates:
+            if thumbnails_match(fp.thumbnail, entry["thumbnail"]):
+                with self._lock:
+                    self.metrics["user_hits"] += 1
+                return {
+                    "nutrition_info": dict(entry["nutrition_info"]),
+                    "confidence": round(1 - distance / HASH_BITS, 3),
+                    "scope": "user",
+                }
+        with self._lock:
+            self.metrics["unconfirmed" if candidates else "misses"] += 1
+        return None
+
+    def add(self, fp: LabelFingerprint, nutrition_info: Dict, user_id: Optional[int] = None) -> None:
+        value = dict(nutrition_info)
+        with self._lock:
+            self._exact.pop(fp.digest, None)
+            self._exact[fp.digest] = value
+            while len(self._exact) > MAX_ENTRIES_PER_SCOPE:
+                self._exact.popitem(last=False)
+            if user_id is not None:
+                tree = self._users.get(user_id)
+                if tree is None:
+                    if len(self._users) >= MAX_USER_SCOPES:
+                        self._users.pop(next(iter(self._users)))
+                    tree = self._users[user_id] = BKTree()
+                tree.add(
+                    fp.dhash, {"nutrition_info": value, "thumbnail": fp.thumbnail},
+                    same=lambda entry: thumbnails_match(entry["thumbnail"], fp.thumbnail),
+                )
+                tree.trim(MAX_ENTRIES_PER_USER)
+            self.metrics["stored"] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.metrics["lookups"]
+            hits = self.metrics["exact_hits"] + self.metrics["user_hits"]
+            return {
+                **self.metrics,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "exact_entries": len(self._exact),
+                "user_scopes": len(self._users),
+                "min_confidence": self.min_confidence,
+                "confirm_max_diff": CONFIRM_MAX_DIFF,
+            }
+
+
+label_hash_index = LabelHashIndex()
@@ -11,6 +11,9 @@ import requests
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 
+from services.nutri_ai_service.core.profile.metrics_engine import compute_metrics
+from services.nutri_ai_service.core.prompts.compiler import prompt_compiler
+
 DATA_DIR = Path(__file__).resolve().parents[1] / "data" / "nutri-ai"
 
 GROQ_MODELS = [
@@ -117,61 +120,17 @@ def extract_nutrition_from_image(image_bytes: bytes, mime_type: str) -> Dict:
 
 def calculate_health_metrics(profile: Dict) -> Dict:
     """Pure-Python health metrics calculation (no heavy deps)."""
-    height_cm = profile.get("height_cm", 170)
-    weight_kg = profile.get("weight_kg", 70)
-    age = profile.get("age", 30)
-    gender = profile.get("gender", "male")
-
-    height_m = height_cm / 100
-    bmi = round(weight_kg / (height_m * height_m), 2)
-
-    if bmi < 18.5:
-        bmi_cat = "Underweight"
-    elif bmi < 25:
-        bmi_cat = "Normal weight"
-    elif bmi < 30:
-        bmi_cat = "Overweight"
-    else:
-        bmi_cat = "Obesity"
-
-    if gender.lower() == "male":
-        bmr = (10 * weight_kg) + (6.25 * height_cm) - (5 * age) + 5
-    else:
-        bmr = (10 * weight_kg) + (6.25 * height_cm) - (5 * age) - 161
-
-    multipliers = {"sedentary": 1.2, "light": 1.375, "moderate": 1.55, "active": 1.725, "very_active": 1.9}
-    tdee = round(bmr * multipliers.get(profile.get("activity_level", "moderate"), 1.55))
-
-    goal = profile.get("goal", "maintain weight")
-    if goal == "lose weight":
-        cal_target = tdee - 500
-    elif goal == "gain weight":
-        cal_target = tdee + 500
-    else:
-        cal_target = tdee
-
-    return {
-        "bmi": bmi,
-        "bmi_category": bmi_cat,
-        "bmr": round(bmr),
-        "tdee": tdee,
-        "calorie_target": cal_target,
-        "macros": {
-            "carbs_g": round((cal_target * 0.4) / 4),
-            "protein_g": round((cal_target * 0.3) / 4),
-            "fat_g": round((cal_target * 0.3) / 9),
-        },
-    }
-
-
-def generate_score(user_profile: Dict, nutrition_info: Dict, health_metrics: Dict) -> Tuple[int, str]:
+    return compute_metrics(profile)
+
+
+def generate_score(user_profile: Dict, nutrition_info: Dict, health_metrics: Dict,
+                   user_id: Optional[int] = None) -> Tuple[int, str]:
     """Call Groq to generate a consumability score and explanation."""
     api_key = _groq_api_key()
     if not api_key:
         return 50, "Scoring unavailable (GROQ_API_KEY not set)."
 
     book_chunks = _load_json("book_chunks.json")
-    diseases_data = _load_json("diseases.json")
 
     keywords = list(nutrition_info.keys())
     if user_profile.get("allergies"):
@@ -193,20 +152,13 @@ def generate_score(user_profile: Dict, nutrition_info: Dict, health_metrics: Dic
     nutrition_str = "\n".join(f"{k}: {v}" for k, v in nutrition_info.items())
     knowledge_str = "\n\n".join(relevant) if relevant else "No specific knowledge."
 
-    user_diseases = []
-    for d in user_profile.get("medical_history", {}).get("diseases", []):
-        name = d.get("name") if isinstance(d, dict) else d
-        if name:
-            user_diseases.append(str(name))
-
-    prompt = f"""You are a nutritional expert. Analyze this food's nutrition against the user's profile and assign a Consumability Score from 0-100.
+    # Static system segment first, then the cached per-user fragment, then
+    # the per-request numbers, so repeated scans share a prompt prefix.
+    fragments = prompt_compiler.fragments(user_profile, user_id)
+    prompt = f"""{fragments.scoring_profile}
 
-USER PROFILE:
-Age: {user_profile.get('age', 'N/A')}, Gender: {user_profile.get('gender', 'N/A')}
-Activity: {user_profile.get('activity_level', 'N/A')}, Goal: {user_profile.get('goal', 'N/A')}
-Diet: {user_profile.get('diet_type', 'N/A')}
-Allergies: {', '.join(user_profile.get('allergies', [])) or 'None'}
-Medical Conditions: {', '.join(user_diseases) or 'None'}
+DISEASE CONSTRAINTS:
+{fragments.disease_constraints}
 
 HEALTH METRICS:
 BMI: {health_metrics.get('bmi')}, TDEE: {health_metrics.get('tdee')} kcal
@@ -216,19 +168,10 @@ NUTRITION (per serving):
 {nutrition_str}
 
 RELEVANT KNOWLEDGE:
-{knowledge_str}
-
-Respond in this exact format:
-SCORE: [number 0-100]
-
-EXPLANATION:
-[detailed explanation]
-
-RECOMMENDATIONS:
-[specific recommendations]"""
+{knowledge_str}"""
 
     messages = [
-        {"role": "system", "content": "You are a nutritional expert that provides personalized health advice."},
+        {"role": "system", "content": prompt_compiler.scoring_system},
         {"role": "user", "content": prompt},
     ]
 
@@ -0,0 +1,183 @@
+"""
+Barcode-keyed product catalog.
+
+When the client sends a barcode with a label upload, the gateway looks it
+up here first and, on a hit, returns the catalog's canonical nutrition data
+without calling ``extract_nutrition_from_image``.  Lookups go through an
+in-memory front cache (including short-lived negative entries) before the
+indexed ``product_catalog`` table.
+
+``promote_frequent_products`` is run periodically by a Celery beat task.
+A barcode scanned by enough different users (``ScanHistory.barcode``)
+enters the catalog once their nutrition data agrees: each value is the
+median over the users' latest scans, and a majority of them must fall
+within a tolerance of it.  A single account scanning a barcode repeatedly
+cannot put its own values into the shared catalog.
+"""
+
+import re
+import statistics
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional
+
+from services.shared.database.models import db, ScanHistory, ProductCatalog
+
+FRONT_CACHE_SIZE = 10000
+NEGATIVE_TTL_SECONDS = 300
+PROMOTE_MIN_USERS = 3
+AGREEMENT_TOLERANCE = 0.1  # relative difference from the median that still agrees
+AGREEMENT_MIN_ABS = 0.5  # ... or absolute, for values near zero
+
+_BARCODE_RE = re.compile(r"^\d{8,14}$")
+
+
+def normalize_barcode(raw: Optional[str]) -> Optional[str]:
+    """Digits-only EAN/UPC (8-14 digits), or None if it doesn't look like one."""
+    if not raw:
+        return None
+    digits = re.sub(r"[\s-]", "", str(raw))
+    return digits if _BARCODE_RE.match(digits) else None
+
+
+class CatalogFrontCache:
+    """LRU of barcode -> catalog dict; ``None`` entries expire quickly."""
+
+    def __init__(self, max_entries: int = FRONT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, barcode: str):
+        """Return ``(found, entry)``; ``found`` is False when not cached."""
+        with self._lock:
+            item = self._items.get(barcode)
+            if item is None:
+                return False, None
+            stored_at, entry = item
+            if entry is None and time.time() - stored_at > NEGATIVE_TTL_SECONDS:
+                del self._items[barcode]
+                return False, None
+            self._items.move_to_end(barcode)
+            return True, entry
+
+    def put(self, barcode: str, entry: Optional[Dict]) -> None:
+        with self._lock:
+            self._items[barcode] = (time.time(), entry)
+            self._items.move_to_end(barcode)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def discard(self, barcode: str) -> None:
+        with self._lock:
+            self._items.pop(barcode, None)
+
+
+front_cache = CatalogFrontCache()
+
+
+def lookup_barcode(barcode: str) -> Optional[Dict]:
+    """Catalog entry for a normalized barcode, or None."""
+    found, entry = front_cache.get(barcode)
+    if found:
+        return entry
+    product = ProductCatalog.query.filter_by(barcode=barcode).first()
+    entry = product.to_dict() if product else None
+    front_cache.put(barcode, entry)
+    return entry
+
+
+def record_catalog_hit(barcode: str) -> None:
+    ProductCatalog.query.filter_by(barcode=barcode).update(
+        {ProductCatalog.scan_count: ProductCatalog.scan_count + 1},
+        synchronize_session=False,
+    )
+    db.session.commit()
+
+
+def _agrees(value: float, median: float) -> bool:
+    return abs(value - median) <= max(AGREEMENT_TOLERANCE * abs(median), AGREEMENT_MIN_ABS)
+
+
+def consensus_nutrition(samples: List[Dict]) -> Optional[Dict]:
+    """Agreed nutrition data from one sample per user, or None.
+
+    Each field reported by a majority of the samples takes the median of
+    the numeric values (or the most common non-numeric value), and a
+    majority of all samples must agree with it; otherwise there is no
+    consensus.  Fields reported by a minority are dropped.
+    """
+    majority = len(samples) // 2 + 1
+    fields = Counter(key for sample in samples for key in sample)
+    consensus = {}
+    for field, reported in fields.items():
+        if reported < majority:
+            continue
+        values = [sample[field] for sample in samples if field in sample]
+        numbers = [float(v) for v in values if isinstance(v, (int, float)) and not isinstance(v, bool)]
+        if len(numbers) == len(values):
+            median = statistics.median(numbers)
+            agreeing = sum(_agrees(v, median) for v in numbers)
+            value = round(median, 2)
+        else:
+            value, agreeing = Counter(map(str, values)).most_common(1)[0]
+            value = next(v for v in values if str(v) == value)
+        if agreeing < majority:
+            return None
+        consensus[field] = value
+    return consensus or None
+
+
+def promote_frequent_products(min_users: int = PROMOTE_MIN_USERS) -> int:
+    """Add barcodes scanned by at least ``min_users`` users to the catalog
+    when their nutrition data agrees (see ``consensus_nutrition``).
+
+    Must run inside an app context.  Returns the number of new entries.
+    """
+    counts = (
+        db.session.query(ScanHistory.barcode, db.func.count(db.distinct(ScanHistory.user_id)))
+        .filter(ScanHistory.barcode.isnot(None), ScanHistory.nutrition_data.isnot(None))
+        .group_by(ScanHistory.barcode)
+        .having(db.func.count(db.distinct(ScanHistory.user_id)) >= min_users)
+        .all()
+    )
+    known = {
+        row.barcode for row in
+        ProductCatalog.query.with_entities(ProductCatalog.barcode)
+        .filter(ProductCatalog.barcode.in_([b for b, _ in counts])).all()
+    } if counts else set()
+
+    promoted = 0
+    for barcode, users in counts:
+        if barcode in known or not normalize_barcode(barcode):
+            continue
+        scans = (
+            ScanHistory.query.filter_by(barcode=barcode)
+            .filter(ScanHistory.nutrition_data.isnot(None))
+            .order_by(ScanHistory.created_at.desc()).all()
+        )
+        latest_per_user = {}
+        for scan in scans:
+            if isinstance(scan.nutrition_data, dict):
+                latest_per_user.setdefault(scan.user_id, scan)
+        per_user = list(latest_per_user.values())
+        if len(per_user) < min_users:
+            continue
+        nutrition = consensus_nutrition([scan.nutrition_data for scan in per_user])
+        if nutrition is None:
+            continue
+        names = Counter(scan.product_name for scan in per_user if scan.product_name).most_common(1)
+        brands = Counter(scan.brand for scan in per_user if scan.brand).most_common(1)
+        db.session.add(ProductCatalog(
+            barcode=barcode,
+            product_name=names[0][0] if names else None,
+            brand=brands[0][0] if brands else None,
+            nutrition_data=nutrition,
+            source='promoted',
+            scan_count=len(scans),
+        ))
+        front_cache.discard(barcode)
+        promoted += 1
+    db.session.commit()
+    return promoted
@@ -11,8 +11,12 @@ MUSCLE_AI_URL = os.environ.get('MUSCLE_AI_URL', 'http://localhost:5002').rstrip(
 
 
 @celery_app.task(bind=True, name='wellnix.analyze_video')
-def analyze_video(self, video_path: str, exercise_type: str) -> dict:
-    """Send a saved video to the Muscle AI service for analysis."""
+def analyze_video(self, video_path: str, exercise_type: str, options: dict = None) -> dict:
+    """Send a saved video to the Muscle AI service for analysis.
+
+    ``options`` are extra upload form fields (``analysis_fps``, ``mode``,
+    ``timeline``) passed through unchanged.
+    """
     video = Path(video_path)
     if not video.exists():
         return {'error': 'Video file not found', 'status': 'failed'}
@@ -20,7 +24,7 @@ def analyze_video(self, video_path: str, exercise_type: str) -> dict:
     try:
         with open(video_path, 'rb') as f:
             files = {'video': (video.name, f, 'video/mp4')}
-            data = {'exercise_type': exercise_type}
+            data = {**(options or {}), 'exercise_type': exercise_type}
             resp = requests.post(
                 f'{MUSCLE_AI_URL}/muscle/upload',
                 files=files,
@@ -36,3 +40,14 @@ def analyze_video(self, video_path: str, exercise_type: str) -> dict:
         return {'status': 'failed', 'error': f'Service returned {resp.status_code}'}
     except Exception as exc:
         return {'status': 'failed', 'error': str(exc)}
+
+
+@celery_app.task(name='wellnix.promote_catalog_products')
+def promote_catalog_products(min_users: int = 3) -> dict:
+    """Promote barcodes scanned by enough users into the product catalog."""
+    from gateway.app import app
+    from gateway.product_catalog import promote_frequent_products
+
+    with app.app_context():
+        promoted = promote_frequent_products(min_users)
+    return {'status': 'completed', 'promoted': promoted}
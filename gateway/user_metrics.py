@@ -0,0 +1,91 @@
+"""
+Materialized per-user health metrics.
+
+Authenticated users' profiles live on ``User``, so their BMI, BMR, TDEE and
+targets are computed once and stored in ``user_health_metrics``.  The
+settings handlers call ``refresh_if_changed`` and the row is recomputed
+only when a field the metrics depend on actually changed; analyze and Ana
+read the stored values instead of recomputing from a client payload.
+"""
+
+from typing import Dict, Optional, Tuple
+
+from services.nutri_ai_service.core.profile.metrics_engine import compute_metrics
+from services.shared.database.models import db, UserHealthMetrics
+
+# User columns the metrics are computed from.
+METRIC_FIELDS = ('age', 'gender', 'height_cm', 'weight_kg', 'activity_level', 'goal')
+
+
+def profile_from_user(user) -> Dict:
+    """The profile dict the scoring and Ana prompts expect, from ``User``."""
+    return {
+        'age': user.age,
+        'gender': user.gender,
+        'height_cm': user.height_cm,
+        'weight_kg': user.weight_kg,
+        'activity_level': user.activity_level,
+        'diet_type': user.diet_type,
+        'goal': user.goal,
+        'allergies': user.allergies or [],
+        'medical_history': {'diseases': user.medical_conditions or []},
+    }
+
+
+def metric_inputs(user) -> Tuple:
+    """Snapshot of the fields the metrics depend on (compare before/after a save)."""
+    return tuple(getattr(user, field) for field in METRIC_FIELDS)
+
+
+def has_body_measurements(user) -> bool:
+    return bool(user.height_cm) and bool(user.weight_kg)
+
+
+def refresh_user_metrics(user) -> Optional[UserHealthMetrics]:
+    """Recompute and stage the user's metrics row; the caller commits.
+
+    Users without height and weight get no row (the defaults would describe
+    somebody else).
+    """
+    if not has_body_measurements(user):
+        if user.health_metrics is not None:
+            db.session.delete(user.health_metrics)
+            user.health_metrics = None
+        return None
+
+    metrics = compute_metrics(profile_from_user(user))
+    row = user.health_metrics or UserHealthMetrics(user_id=user.id)
+    row.bmi = metrics['bmi']
+    row.bmi_category = metrics['bmi_category']
+    row.bmr = metrics['bmr']
+    row.tdee = metrics['tdee']
+    row.calorie_target = metrics['calorie_target']
+    row.carbs_g = metrics['macros']['carbs_g']
+    row.protein_g = metrics['macros']['protein_g']
+    row.fat_g = metrics['macros']['fat_g']
+    row.disease_risks = metrics['disease_risks']
+    row.ideal_weight_min_kg, row.ideal_weight_max_kg = metrics['ideal_weight_range_kg']
+    if user.health_metrics is None:
+        user.health_metrics = row
+    return row
+
+
+def refresh_if_changed(user, before: Tuple) -> bool:
+    """Refresh the metrics when ``metric_inputs`` changed since ``before``.
+
+    Also fills in a missing row for users who had measurements before this
+    table existed.  Returns True when the row was recomputed.
+    """
+    if metric_inputs(user) == before and (user.health_metrics is not None or not has_body_measurements(user)):
+        return False
+    refresh_user_metrics(user)
+    return True
+
+
+def get_user_metrics(user) -> Optional[Dict]:
+    """Stored metrics for ``user`` (materialized on first use), or None."""
+    if user.health_metrics is None:
+        if refresh_user_metrics(user) is None:
+            return None
+        db.session.commit()
+    return user.health_metrics.to_dict()
@@ -0,0 +1,91 @@
+"""
+Benchmark frame-stride analysis against full-frame analysis.
+
+For each of the six supported exercises, runs every video in
+``<videos>/<exercise>/`` through ``process_video`` once per frame stride.
+Stride 1 (every frame through YOLO) is the reference; the other strides
+are scored on how far their rep count and form score land from it and
+how much pipeline time they save.  Prints a markdown table per stride and
+exercise:
+
+    | exercise | stride | videos | frames inferred | rep error (mean abs) | score error (mean abs) | pipeline s | speedup |
+
+Pipeline time is the decode / inference / encode wall time reported by
+``process_video``.
+
+Requires the exercise models from ``Config.MODEL_PATHS``, ultralytics and
+OpenCV (plus ffmpeg for the fast decode / encode paths).
+
+Usage:
+    python scripts/bench_frame_stride.py path/to/videos [--strides 1 2 3 4 6]
+"""
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from services.muscle_ai_service.config.settings import Config  # noqa: E402
+from services.muscle_ai_service.core.models.yolo import get_yolo_models  # noqa: E402
+from services.muscle_ai_service.utils.video import process_video  # noqa: E402
+
+VIDEO_SUFFIXES = (".mp4", ".avi", ".mov")
+
+
+def run(video: Path, exercise: str, model, stride: int, workdir: Path):
+    """``(repetitions, score, frames_inferred, pipeline_seconds)`` for one run."""
+    stats = {}
+    metrics = process_video(
+        str(video),
+        str(workdir / f"web_{stride}_{video.stem}.mp4"),
+        exercise,
+        model,
+        stats=stats,
+        frame_stride=stride,
+    )
+    if metrics is None:
+        return 0, 0.0, stats["frames_inferred"], stats["wall_s"]
+    return (metrics["repetitions"], metrics["movement_assessment"]["score"],
+            stats["frames_inferred"], stats["wall_s"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("videos", type=Path, help="folder with one sub-folder of videos per exercise")
+    parser.add_argument("--strides", type=int, nargs="+", default=[1, 2, 3, 4, 6])
+    args = parser.parse_args()
+
+    strides = sorted(set(args.strides) | {1})
+    models = get_yolo_models()
+
+    print("| exercise | stride | videos | frames inferred | rep error (mean abs) "
+          "| score error (mean abs) | pipeline s | speedup |")
+    print("|---|---|---|---|---|---|---|---|")
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        for exercise in Config.MODEL_PATHS:
+            folder = args.videos / exercise
+            videos = sorted(p for p in folder.glob("*") if p.suffix.lower() in VIDEO_SUFFIXES) if folder.is_dir() else []
+            if not videos or exercise not in models:
+                print(f"| {exercise} | - | 0 | - | - | - | - | - |")
+                continue
+
+            runs = {stride: [run(v, exercise, models[exercise], stride, workdir) for v in videos]
+                    for stride in strides}
+            reference = runs[1]
+            base_seconds = sum(r[3] for r in reference)
+            for stride in strides:
+                results = runs[stride]
+                rep_error = sum(abs(r[0] - ref[0]) for r, ref in zip(results, reference)) / len(videos)
+                score_error = sum(abs(r[1] - ref[1]) for r, ref in zip(results, reference)) / len(videos)
+                seconds = sum(r[3] for r in results)
+                print(f"| {exercise} | {stride} | {len(videos)} | {sum(r[2] for r in results)} "
+                      f"| {rep_error:.2f} | {score_error:.2f} | {seconds:.1f} "
+                      f"| {base_seconds / seconds if seconds else float('nan'):.1f}x |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark label image preparation (gateway/image_prep.py).
+
+For every image in a folder and every candidate long edge, reports the
+prepared byte size, base64 payload size and preparation time.  With
+--vision (and GROQ_API_KEY set) it also runs the Groq vision extraction on
+the original and on each prepared variant and reports field agreement and
+end-to-end latency, which is how TARGET_LONG_EDGE was chosen: the smallest
+edge whose extractions match the full-resolution ones.
+
+Usage:
+    python scripts/bench_image_prep.py path/to/labels [--edges 1024 1280 1536 2048] [--vision]
+"""
+
+import argparse
+import base64
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from gateway.image_prep import prepare_label_image  # noqa: E402
+
+FIELDS = ["calories", "protein", "carbs", "sugars", "fat", "saturated_fat", "trans_fat", "sodium", "fiber"]
+
+
+def _agreement(reference: dict, candidate: dict) -> float:
+    if "error" in reference or "error" in candidate:
+        return 0.0
+    same = 0
+    for field in FIELDS:
+        try:
+            if abs(float(reference.get(field, 0)) - float(candidate.get(field, 0))) <= 0.5:
+                same += 1
+        except (TypeError, ValueError):
+            pass
+    return same / len(FIELDS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("folder", type=Path)
+    parser.add_argument("--edges", type=int, nargs="+", default=[1024, 1280, 1536, 2048])
+    parser.add_argument("--vision", action="store_true", help="also call the Groq vision model")
+    args = parser.parse_args()
+
+    images = sorted(p for p in args.folder.iterdir() if p.suffix.lower() in (".jpg", ".jpeg", ".png", ".webp"))
+    if not images:
+        sys.exit(f"No images found in {args.folder}")
+
+    if args.vision:
+        from gateway.nutri_ai_lite import extract_nutrition_from_image
+
+    originals = {}
+    for path in images:
+        raw = path.read_bytes()
+        mime = "image/png" if path.suffix.lower() == ".png" else "image/jpeg"
+        originals[path] = (raw, mime)
+
+    reference = {}
+    if args.vision:
+        latencies = []
+        for path, (raw, mime) in originals.items():
+            started = time.perf_counter()
+            reference[path] = extract_nutrition_from_image(raw, mime)
+            latencies.append((time.perf_counter() - started) * 1000)
+        total = sum(len(raw) for raw, _ in originals.values())
+        print(f"original   bytes={total / len(images) / 1024:8.1f} KB  "
+              f"vision={statistics.median(latencies):7.0f} ms (median)")
+
+    for edge in args.edges:
+        sizes, b64_sizes, prep_ms, vision_ms, agree = [], [], [], [], []
+        for path, (raw, mime) in originals.items():
+            prepared, prepared_mime, stats = prepare_label_image(raw, mime, long_edge=edge)
+            sizes.append(stats["prepared_bytes"])
+            b64_sizes.append(len(base64.b64encode(prepared)))
+            prep_ms.append(stats["prep_ms"])
+            if args.vision:
+                started = time.perf_counter()
+                result = extract_nutrition_from_image(prepared, prepared_mime)
+                vision_ms.append((time.perf_counter() - started) * 1000)
+                agree.append(_agreement(reference[path], result))
+
+        original_total = sum(len(raw) for raw, _ in originals.values())
+        line = (
+            f"edge={edge:5d}  bytes={statistics.mean(sizes) / 1024:8.1f} KB  "
+            f"base64={statistics.mean(b64_sizes) / 1024:8.1f} KB  "
+            f"saved={100 * (1 - sum(sizes) / original_total):5.1f}%  "
+            f"prep={statistics.median(prep_ms):6.1f} ms"
+        )
+        if args.vision:
+            line += (f"  vision={statistics.median(vision_ms):7.0f} ms"
+                     f"  agreement={100 * statistics.mean(agree):5.1f}%")
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark the nutrition label parser on recorded OCR outputs.
+
+Replays ``scripts/data/ocr_corpus.json`` (OCR text plus the true values)
+through ``parse_nutrition_label`` and the previous per-field regex parser,
+and reports per-field accuracy and throughput for both.
+
+Usage:
+    python scripts/bench_label_parser.py [--corpus path.json] [--rounds 2000]
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from services.nutri_ai_service.core.ocr.label_parser import FIELDS, parse_nutrition_label  # noqa: E402
+
+DEFAULT_CORPUS = PROJECT_ROOT / "scripts" / "data" / "ocr_corpus.json"
+TOLERANCE = 0.05  # relative, with an absolute floor of 0.5 (kcal/g/mg)
+
+
+def legacy_parse(text):
+    """The per-field re.search parser this module replaced (prints removed)."""
+    def extract_number(patterns, combined_text):
+        for pattern in patterns:
+            match = re.search(pattern, combined_text, re.IGNORECASE)
+            if match:
+                numbers = re.findall(r'[\d.]+', match.group(0))
+                numbers = [float(n) for n in numbers if n.replace('.', '', 1).isdigit()]
+                if numbers:
+                    return max(numbers)
+        return 0.0
+
+    lines = [line.strip().lower() for line in text.splitlines() if line.strip()]
+    stitched_lines, buffer = [], ""
+    for line in lines:
+        if re.match(r'^\d+(\.\d+)?$', line):
+            buffer += " " + line
+        else:
+            if buffer:
+                stitched_lines.append(buffer)
+            buffer = line
+    if buffer:
+        stitched_lines.append(buffer)
+    combined_text = "\n".join(stitched_lines)
+
+    return {
+        "calories": extract_number([r'(?:kcal|energy)[^\d]{0,5}([\d.\s]+)'], combined_text),
+        "protein": extract_number([r'protein[^\d]{0,5}([\d.\s]+)'], combined_text),
+        "carbs": extract_number([r'(?:total\s*)?carbohydrate[^\d]{0,5}([\d.\s]+)'], combined_text),
+        "sugars": extract_number([r'sugars?[^\d]{0,5}([\d.\s]+)'], combined_text),
+        "fat": extract_number([r'(?:total\s*)?fat[^\d]{0,5}([\d.\s]+)'], combined_text),
+        "saturated_fat": extract_number([r'saturated\s*fat[^\d]{0,5}([\d.\s]+)'], combined_text),
+        "trans_fat": extract_number([r'trans\s*fat[^\d]{0,5}([\d.\s]+)'], combined_text),
+        "sodium": extract_number([r'sodium\s*mg[^\d]{0,5}([\d.\s]+)', r'sodium[^\d]{0,5}([\d.\s]+)'], combined_text),
+    }
+
+
+def _matches(got, want) -> bool:
+    return abs(float(got) - float(want)) <= max(0.5, TOLERANCE * abs(float(want)))
+
+
+def _accuracy(parse, corpus, verbose=False):
+    hits, totals = defaultdict(int), defaultdict(int)
+    for sample in corpus:
+        parsed = parse(sample["text"])
+        for field, want in sample["expected"].items():
+            got = parsed.get(field, 0.0)
+            totals[field] += 1
+            if _matches(got, want):
+                hits[field] += 1
+            elif verbose:
+                print(f"  miss {sample['name']:24s} {field:14s} got={got} want={want}")
+    return hits, totals
+
+
+def _throughput(parse, corpus, rounds: int) -> float:
+    texts = [sample["text"] for sample in corpus]
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            parse(text)
+    return rounds * len(texts) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("-v", "--verbose", action="store_true", help="list every miss")
+    args = parser.parse_args()
+
+    corpus = json.loads(args.corpus.read_text())
+    parsers = {
+        "compiled": lambda text: parse_nutrition_label(text)[0],
+        "legacy": legacy_parse,
+    }
+
+    results = {}
+    for name, parse in parsers.items():
+        if args.verbose:
+            print(f"{name}:")
+        hits, totals = _accuracy(parse, corpus, args.verbose)
+        results[name] = (hits, totals, _throughput(parse, corpus, args.rounds))
+
+    print(f"\n{len(corpus)} labels, {sum(results['compiled'][1].values())} expected values\n")
+    print(f"{'field':14s}" + "".join(f"{name:>12s}" for name in parsers))
+    for field in FIELDS:
+        if not results["compiled"][1].get(field):
+            continue
+        row = "".join(
+            f"{100 * hits[field] / totals[field]:11.0f}%" for hits, totals, _ in results.values()
+        )
+        print(f"{field:14s}{row}")
+    overall = "".join(
+        f"{100 * sum(hits.values()) / sum(totals.values()):11.1f}%" for hits, totals, _ in results.values()
+    )
+    print(f"{'overall':14s}{overall}")
+    print(f"{'labels/s':14s}" + "".join(f"{rate:12.0f}" for _, _, rate in results.values()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark the health metrics engine: scalar vs columnar.
+
+Generates random profiles, computes metrics with ``compute_metrics`` one
+by one and with ``compute_columnar`` over the whole cohort, checks that
+both agree and reports the time for each.
+
+Usage:
+    python scripts/bench_metrics_engine.py [--profiles 100000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from services.nutri_ai_service.core.profile.metrics_engine import (  # noqa: E402
+    ACTIVITY_MULTIPLIERS, columnar_row, compute_columnar, compute_metrics, profiles_to_columns,
+)
+
+
+def random_profile(rng: random.Random) -> dict:
+    return {
+        "age": rng.randint(16, 85),
+        "gender": rng.choice(["male", "female"]),
+        "height_cm": rng.uniform(145, 205),
+        "weight_kg": rng.uniform(42, 150),
+        "activity_level": rng.choice(list(ACTIVITY_MULTIPLIERS)),
+        "goal": rng.choice(["lose weight", "maintain weight", "gain weight"]),
+        "smoker": rng.random() < 0.15,
+        "alcohol_consumption": rng.choice(["none", "occasional", "frequent"]),
+        "medical_history": {"family_history": rng.sample(["diabetes", "heart disease"], rng.randint(0, 2))},
+        "sleep_hours": rng.uniform(4, 9),
+        "stress_level": rng.choice(["low", "medium", "high"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--profiles", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    profiles = [random_profile(rng) for _ in range(args.profiles)]
+
+    started = time.perf_counter()
+    scalar = [compute_metrics(p) for p in profiles]
+    scalar_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    columns = profiles_to_columns(profiles)
+    gather_s = time.perf_counter() - started
+    started = time.perf_counter()
+    columnar = compute_columnar(columns)
+    columnar_s = time.perf_counter() - started
+
+    mismatches = sum(1 for i, expected in enumerate(scalar) if columnar_row(columnar, i) != expected)
+    print(f"{args.profiles} profiles, {mismatches} mismatches")
+    print(f"scalar    {scalar_s * 1000:9.1f} ms")
+    print(f"columnar  {columnar_s * 1000:9.1f} ms  (+{gather_s * 1000:.1f} ms to build columns from dicts)")
+    print(f"speedup   {scalar_s / columnar_s:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
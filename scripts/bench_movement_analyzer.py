@@ -0,0 +1,202 @@
+"""
+Benchmark MovementAnalyzer on long synthetic label sequences.
+
+Generates per-frame YOLO label confidences for a long workout (reps as a
+slow oscillation plus noise and dropped detections), feeds them through
+``MovementAnalyzer`` calling ``get_metrics`` every frame as the overlay
+does, and compares against the previous implementation, which recomputed
+mean/min/max over the whole score history on every call and smoothed with
+a list of the last five values.  Rep counts are also compared on
+sequences of threshold-valued confidences (0.5 / 0.8 / 0.85 / 0.9 / 0.95),
+where any rounding difference in the smoother flips the 0.85 / 0.92
+comparisons.
+
+Usage:
+    python scripts/bench_movement_analyzer.py [--minutes 10] [--fps 30]
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np  # noqa: E402
+
+from services.muscle_ai_service.core.models.analyzer import MovementAnalyzer  # noqa: E402
+
+
+def synthetic_labels(minutes: float, fps: float = 30, exercise_type: str = "squat", seed: int = 1):
+    """Per-frame label dicts: a ~0.6 s rep every ~3 s, noise, ~3% missed detections."""
+    rng = random.Random(seed)
+    form_label = "ibw" if exercise_type in ("regular_deadlift", "squat") else "up"
+    period, rep_frames = int(3 * fps), int(0.6 * fps)
+    frames = []
+    for i in range(int(minutes * 60 * fps)):
+        t = i % period
+        # Raised-cosine dip in form confidence during the rep, rise in "down".
+        dip = (1 - math.cos(2 * math.pi * t / rep_frames)) / 2 if t < rep_frames else 0.0
+        labels = {}
+        if rng.random() > 0.03:
+            labels[form_label] = min(1.0, max(0.0, 0.96 - 0.22 * dip + rng.gauss(0, 0.015)))
+        if rng.random() > 0.03:
+            labels["down"] = min(1.0, max(0.0, 0.6 + 0.35 * dip + rng.gauss(0, 0.03)))
+        frames.append(labels)
+    return frames
+
+
+def threshold_labels(frames: int, exercise_type: str = "squat", seed: int = 0):
+    """Form / down confidences drawn from values at or near the rep thresholds."""
+    rng = random.Random(seed)
+    form_label = "ibw" if exercise_type in ("regular_deadlift", "squat") else "up"
+    values = (0.5, 0.8, 0.85, 0.9, 0.95)
+    return [{form_label: rng.choice(values), "down": rng.choice(values)} if rng.random() > 0.1 else {}
+            for _ in range(frames)]
+
+
+class LegacyRepCounter:
+    """The previous smoother and rep state machine, verbatim."""
+
+    def __init__(self, exercise_type):
+        self.exercise_type = exercise_type
+        self.rep_count = 0
+        self.form_values = []
+        self.window_size = 5
+        self.min_frames_between_reps = 10
+        self.frames_since_last_rep = 0
+        self.in_rep_motion = False
+        self.rep_start_threshold = 0.85
+        self.rep_end_threshold = 0.92
+        self.min_rep_frames = 5
+        self.current_rep_frames = 0
+
+    def smooth_value(self, value):
+        self.form_values.append(value if value is not None else self.form_values[-1] if self.form_values else 0)
+        if len(self.form_values) > self.window_size:
+            self.form_values.pop(0)
+        return sum(self.form_values) / len(self.form_values)
+
+    def detect_rep(self, smoothed_value):
+        self.frames_since_last_rep += 1
+        if not self.in_rep_motion:
+            if (smoothed_value < self.rep_start_threshold
+                    and self.frames_since_last_rep > self.min_frames_between_reps):
+                self.in_rep_motion = True
+                self.current_rep_frames = 1
+        else:
+            self.current_rep_frames += 1
+            if smoothed_value > self.rep_end_threshold and self.current_rep_frames >= self.min_rep_frames:
+                self.rep_count += 1
+                self.frames_since_last_rep = 0
+                self.in_rep_motion = False
+                self.current_rep_frames = 0
+            elif self.current_rep_frames > self.min_frames_between_reps * 2:
+                self.in_rep_motion = False
+                self.current_rep_frames = 0
+
+    def process_frame(self, labels):
+        form_key = "ibw" if self.exercise_type in ("regular_deadlift", "squat") else "up"
+        self.detect_rep(self.smooth_value(labels.get(form_key)))
+
+
+def legacy_metrics(analyzer, form_scores, down_scores):
+    """The previous get_metrics body: full passes over the score lists."""
+    if not form_scores or not down_scores:
+        return None
+    form_avg, down_avg = np.mean(form_scores), np.mean(down_scores)
+    return {
+        'frames_analyzed': len(form_scores),
+        'repetitions': analyzer.rep_count,
+        'form_metrics': {'average': form_avg, 'min': min(form_scores), 'max': max(form_scores),
+                         'consistency': 1 - (max(form_scores) - min(form_scores))},
+        'depth_metrics': {'average': down_avg, 'min': min(down_scores), 'max': max(down_scores),
+                          'consistency': 1 - (max(down_scores) - min(down_scores))},
+        'score': round((form_avg * 0.6 + down_avg * 0.4) * 10, 1),
+    }
+
+
+def run_legacy(frames, exercise_type):
+    analyzer = LegacyRepCounter(exercise_type)
+    form_scores, down_scores = [], []
+    form_key = "ibw" if exercise_type in ("regular_deadlift", "squat") else "up"
+    metrics = None
+    for labels in frames:
+        analyzer.process_frame(labels)
+        if labels.get(form_key) is not None:
+            form_scores.append(labels[form_key])
+        if labels.get("down") is not None:
+            down_scores.append(labels["down"])
+        metrics = legacy_metrics(analyzer, form_scores, down_scores)
+    return metrics
+
+
+def run_current(frames, exercise_type):
+    analyzer = MovementAnalyzer(exercise_type)
+    metrics = None
+    for labels in frames:
+        analyzer.process_frame(labels)
+        metrics = analyzer.get_metrics()
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--minutes", type=float, default=10)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--exercise", default="squat")
+    parser.add_argument("--skip-legacy", action="store_true", help="only time the current analyzer")
+    parser.add_argument("--parity-trials", type=int, default=300,
+                        help="threshold-valued sequences to compare rep counts on")
+    args = parser.parse_args()
+
+    frames = synthetic_labels(args.minutes, args.fps, args.exercise)
+    print(f"{len(frames)} frames ({args.minutes:g} min at {args.fps:g} fps)")
+
+    started = time.perf_counter()
+    current = run_current(frames, args.exercise)
+    current_s = time.perf_counter() - started
+    print(f"running aggregates  {current_s:8.2f} s  ({current_s / len(frames) * 1e6:6.1f} us/frame)")
+
+    tracemalloc.start()
+    analyzer = MovementAnalyzer(args.exercise)
+    for labels in frames:
+        analyzer.process_frame(labels)
+    analyzer_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"analyzer state      {analyzer_bytes / 1e6:8.2f} MB")
+
+    if args.skip_legacy:
+        return
+    started = time.perf_counter()
+    legacy = run_legacy(frames, args.exercise)
+    legacy_s = time.perf_counter() - started
+    print(f"full recompute      {legacy_s:8.2f} s  ({legacy_s / len(frames) * 1e6:6.1f} us/frame)")
+    print(f"speedup             {legacy_s / current_s:8.1f}x")
+
+    diffs = [
+        abs(current[group][key] - legacy[group][key])
+        for group in ("form_metrics", "depth_metrics") for key in ("average", "min", "max", "consistency")
+    ]
+    same = (current["frames_analyzed"] == legacy["frames_analyzed"]
+            and current["repetitions"] == legacy["repetitions"]
+            and current["movement_assessment"]["score"] == legacy["score"])
+    print(f"final metrics match: {same}, max abs difference {max(diffs):.2e}")
+
+    mismatches = 0
+    for seed in range(args.parity_trials):
+        sequence = threshold_labels(600, args.exercise, seed)
+        legacy_counter, analyzer = LegacyRepCounter(args.exercise), MovementAnalyzer(args.exercise)
+        for labels in sequence:
+            legacy_counter.process_frame(labels)
+            analyzer.process_frame(labels)
+        mismatches += legacy_counter.rep_count != analyzer.rep_count
+    print(f"threshold-valued rep counts differ in {mismatches}/{args.parity_trials} sequences")
+
+
+if __name__ == "__main__":
+    main()
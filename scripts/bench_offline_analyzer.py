@@ -0,0 +1,72 @@
+"""
+Benchmark offline (vectorized) movement analysis against frame replay.
+
+Builds a long synthetic label sequence, analyses it once by replaying
+every frame through ``MovementAnalyzer`` and once with
+``analyze_series`` on the whole arrays, checks that both give the same
+metrics and reports the time for each.  Rep counts are also compared on
+sequences of threshold-valued confidences, where the smoothing has to
+round exactly as the streaming analyzer does.
+
+Usage:
+    python scripts/bench_offline_analyzer.py [--hours 2] [--fps 30]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_movement_analyzer import synthetic_labels, threshold_labels  # noqa: E402
+from services.muscle_ai_service.core.analyzer.offline import analyze_series, series_from_labels  # noqa: E402
+from services.muscle_ai_service.core.models.analyzer import MovementAnalyzer  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--hours", type=float, default=2)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--exercise", default="squat")
+    parser.add_argument("--parity-trials", type=int, default=300,
+                        help="threshold-valued sequences to compare rep counts on")
+    args = parser.parse_args()
+
+    frames = synthetic_labels(args.hours * 60, args.fps, args.exercise)
+    form, down = series_from_labels(frames, args.exercise)
+    print(f"{len(frames)} frames ({args.hours:g} h at {args.fps:g} fps)")
+
+    started = time.perf_counter()
+    analyzer = MovementAnalyzer(args.exercise)
+    for labels in frames:
+        analyzer.process_frame(labels)
+    streaming = analyzer.get_metrics()
+    replay_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    offline = analyze_series(form, down, args.exercise)
+    offline_s = time.perf_counter() - started
+
+    print(f"frame replay  {replay_s * 1000:10.1f} ms")
+    print(f"offline       {offline_s * 1000:10.1f} ms  ({replay_s / offline_s:.0f}x)")
+    print(f"repetitions   {streaming['repetitions']} streaming / {offline['repetitions']} offline")
+    same = streaming["movement_assessment"] == offline["movement_assessment"]
+    gap = abs(streaming["form_metrics"]["average"] - offline["form_metrics"]["average"])
+    print(f"assessment match: {same}, form average difference {gap:.1e}")
+
+    mismatches = 0
+    for seed in range(args.parity_trials):
+        sequence = threshold_labels(600, args.exercise, seed)
+        analyzer = MovementAnalyzer(args.exercise)
+        for labels in sequence:
+            analyzer.process_frame(labels)
+        offline = analyze_series(*series_from_labels(sequence, args.exercise), args.exercise)
+        mismatches += analyzer.rep_count != offline["repetitions"]
+    print(f"threshold-valued rep counts differ in {mismatches}/{args.parity_trials} sequences")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Compare the ONNX Runtime backend with the PyTorch (ultralytics) path.
+
+Decodes up to ``--frames`` frames from a sample video, runs them through
+each exercise model with both backends in ``process_video``-sized
+micro-batches and reports, per exercise:
+
+* parity - frames whose detected label set matches, and the largest
+  per-label confidence difference (labels as ``extract_labels`` sees them);
+* throughput - frames per second for each backend after one warmup batch.
+
+Both backends run with the ``conf`` / ``iou`` thresholds from ``Config``
+(``MUSCLE_DETECTION_CONF`` / ``MUSCLE_DETECTION_IOU``).  Run
+``scripts/export_onnx.py`` first.  Set ``MUSCLE_ONNX_INTRA_THREADS`` /
+``MUSCLE_ONNX_INTER_THREADS`` to compare thread settings.
+
+Usage:
+    python scripts/bench_onnx_backend.py sample.mp4 [--frames 300] [--batch 2] [--exercise squat ...]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import cv2  # noqa: E402
+
+from services.muscle_ai_service.config.settings import Config  # noqa: E402
+from services.muscle_ai_service.core.models.yolo import PREDICT_ARGS, load_model  # noqa: E402
+from services.muscle_ai_service.utils.video import extract_labels  # noqa: E402
+
+
+def read_frames(video: Path, limit: int):
+    cap = cv2.VideoCapture(str(video))
+    frames = []
+    while len(frames) < limit:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def run(model, frames, batch):
+    """Per-frame labels and frames per second (first batch is warmup)."""
+    list(model(frames[:batch], **PREDICT_ARGS))
+    labels = []
+    started = time.perf_counter()
+    for start in range(0, len(frames), batch):
+        for result in model(frames[start:start + batch], **PREDICT_ARGS):
+            labels.append(extract_labels(result))
+    return labels, len(frames) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("video", type=Path)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--batch", type=int, default=2, help="micro-batch size (MUSCLE_CPU_BATCH)")
+    parser.add_argument("--exercise", nargs="+", choices=sorted(Config.MODEL_PATHS))
+    args = parser.parse_args()
+
+    frames = read_frames(args.video, args.frames)
+    if not frames:
+        sys.exit(f"No frames decoded from {args.video}")
+    print(f"{len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]}, batch {args.batch}\n")
+
+    print("| exercise | label sets equal | max conf diff | torch fps | onnx fps | speedup |")
+    print("|---|---|---|---|---|---|")
+    for exercise, model_path in Config.MODEL_PATHS.items():
+        if args.exercise and exercise not in args.exercise:
+            continue
+        torch_labels, torch_fps = run(load_model(model_path, "torch"), frames, args.batch)
+        onnx_labels, onnx_fps = run(load_model(model_path, "onnx"), frames, args.batch)
+
+        same_sets = sum(a.keys() == b.keys() for a, b in zip(torch_labels, onnx_labels))
+        max_diff = max((abs(a[k] - b[k]) for a, b in zip(torch_labels, onnx_labels) for k in a.keys() & b.keys()),
+                       default=0.0)
+        print(f"| {exercise} | {same_sets}/{len(frames)} | {max_diff:.4f} "
+              f"| {torch_fps:.1f} | {onnx_fps:.1f} | {onnx_fps / torch_fps:.2f}x |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Benchmark nutrition-panel cropping before local OCR.
+
+Runs the panel detector over a set of label images and checks each crop
+against the known panel position (or that nothing is cropped when the
+image has no panel), then runs EasyOCR twice, on the full image and on
+the crop, and reports OCR time and field accuracy for both.
+
+By default the images are rendered from ``scripts/data/panel_fixtures.json``:
+synthetic packaging with ruled and unruled panels, brand art and
+ingredient paragraphs, plus the true values. ``--folder`` benchmarks real
+photos instead; accuracy then needs an ``expected.json`` in the folder
+mapping file names to the true values, e.g.
+``{"oats.jpg": {"calories": 150, "protein": 5}}``.
+
+Usage:
+    python scripts/bench_panel_crop.py [--fixtures path.json] [--no-ocr]
+    python scripts/bench_panel_crop.py --folder path/to/labels
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from services.nutri_ai_service.core.ocr.label_parser import parse_nutrition_table  # noqa: E402
+from services.nutri_ai_service.core.ocr.panel_detector import crop_to_panel  # noqa: E402
+
+DEFAULT_FIXTURES = PROJECT_ROOT / "scripts" / "data" / "panel_fixtures.json"
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+MIN_IOU = 0.5
+
+
+def render_fixture(spec):
+    """Draw a fixture; returns (RGB array, true panel box or None)."""
+    w, h = spec["size"]
+    image = np.full((h, w, 3), spec.get("background", [235, 225, 200]), np.uint8)
+    for item in spec.get("art", []):
+        color = tuple(item.get("color", [180, 30, 30]))
+        if item["kind"] == "disc":
+            cv2.circle(image, tuple(item["at"]), item["radius"], color, -1)
+        elif item["kind"] == "title":
+            cv2.putText(image, item["text"], tuple(item["at"]), FONT, item.get("scale", 3.0),
+                        color, item.get("thickness", 8), cv2.LINE_AA)
+        elif item["kind"] == "paragraph":
+            scale, (x, y) = item.get("scale", 0.6), item["at"]
+            line = ""
+            for word in item["text"].split():
+                candidate = f"{line} {word}".strip()
+                if line and cv2.getTextSize(candidate, FONT, scale, 1)[0][0] > item["width"]:
+                    cv2.putText(image, line, (x, y), FONT, scale, (20, 20, 20), 1, cv2.LINE_AA)
+                    y, line = y + item.get("leading", 26), word
+                else:
+                    line = candidate
+            cv2.putText(image, line, (x, y), FONT, scale, (20, 20, 20), 1, cv2.LINE_AA)
+
+    panel = spec.get("panel")
+    if not panel:
+        return image, None
+    (x, top), pw = panel["at"], panel["width"]
+    scale, leading = panel.get("scale", 0.7), panel.get("leading", 34)
+    bottom = top + leading * (len(panel["rows"]) + 1) + 10
+    cv2.rectangle(image, (x, top), (x + pw, bottom), (255, 255, 255), -1)
+    y = top + leading
+    cv2.putText(image, panel.get("title", "Nutrition Facts"), (x + 10, y), FONT, scale * 1.3,
+                (0, 0, 0), 2, cv2.LINE_AA)
+    for label, value in panel["rows"]:
+        if panel.get("ruled"):
+            cv2.line(image, (x + 8, y + 10), (x + pw - 8, y + 10), (0, 0, 0), 2)
+        y += leading
+        cv2.putText(image, label, (x + 10, y), FONT, scale, (0, 0, 0), 1, cv2.LINE_AA)
+        value_w = cv2.getTextSize(value, FONT, scale, 1)[0][0]
+        cv2.putText(image, value, (x + pw - 10 - value_w, y), FONT, scale, (0, 0, 0), 1, cv2.LINE_AA)
+    cv2.rectangle(image, (x, top), (x + pw, bottom), (0, 0, 0), 2)
+    return image, (x, top, pw, bottom - top)
+
+
+def load_fixtures(path):
+    for spec in json.loads(path.read_text()):
+        image, panel = render_fixture(spec)
+        yield spec["name"], image, panel, spec.get("expected", {})
+
+
+def load_folder(folder):
+    expected_path = folder / "expected.json"
+    expected = json.loads(expected_path.read_text()) if expected_path.exists() else {}
+    images = sorted(p for p in folder.iterdir() if p.suffix.lower() in (".jpg", ".jpeg", ".png"))
+    if not images:
+        sys.exit(f"No images found in {folder}")
+    for path in images:
+        # No ground-truth box for real photos: the crop is only timed and scored by OCR.
+        yield path.name, np.array(Image.open(path).convert("RGB")), ..., expected.get(path.name, {})
+
+
+def _iou(a, b) -> float:
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    ih = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = iw * ih
+    return inter / float(aw * ah + bw * bh - inter)
+
+
+def _crop_verdict(box, panel) -> str:
+    if panel is ...:
+        return "-"
+    if panel is None:
+        return "ok" if box is None else "false crop"
+    if box is None:
+        return "missed"
+    return "ok" if _iou(box, panel) >= MIN_IOU else "wrong box"
+
+
+def _field_accuracy(expected: dict, parsed: dict) -> float:
+    if not expected:
+        return float("nan")
+    hits = sum(1 for k, v in expected.items() if abs(float(parsed.get(k, 0)) - float(v)) <= 0.5)
+    return hits / len(expected)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--fixtures", type=Path, default=DEFAULT_FIXTURES)
+    parser.add_argument("--folder", type=Path, help="benchmark real photos instead of the fixtures")
+    parser.add_argument("--no-ocr", action="store_true", help="only check the detected panel boxes")
+    args = parser.parse_args()
+
+    samples = list(load_folder(args.folder) if args.folder else load_fixtures(args.fixtures))
+
+    reader = None
+    if not args.no_ocr:
+        from services.nutri_ai_service.core.ocr.nutrition_extractor import get_reader
+        reader = get_reader()
+        reader.readtext(np.zeros((32, 32, 3), dtype=np.uint8))  # warm up
+
+    verdicts = []
+    rows = {"full": ([], [], []), "cropped": ([], [], [])}
+    for name, full, panel, expected in samples:
+        started = time.perf_counter()
+        cropped, box = crop_to_panel(full, enabled=True)
+        detect_ms = (time.perf_counter() - started) * 1000
+        verdict = _crop_verdict(box, panel)
+        verdicts.append(verdict)
+        line = f"{name:34s} detect={detect_ms:6.1f} ms  panel={box}  crop={verdict}"
+
+        if reader is not None:
+            for mode, array in (("full", full), ("cropped", cropped)):
+                started = time.perf_counter()
+                text = "\n".join(reader.readtext(array, detail=0))
+                ocr_ms = (time.perf_counter() - started) * 1000
+                if mode == "cropped":
+                    ocr_ms += detect_ms
+                times, accs, pixels = rows[mode]
+                times.append(ocr_ms)
+                accs.append(_field_accuracy(expected, parse_nutrition_table(text)))
+                pixels.append(array.shape[0] * array.shape[1])
+                line += f"  {mode}={ocr_ms:6.0f} ms"
+        print(line)
+
+    checked = [v for v in verdicts if v != "-"]
+    if checked:
+        print(f"\ncrop decisions correct: {checked.count('ok')}/{len(checked)}")
+    if reader is None:
+        return
+    for mode, (times, accs, pixels) in rows.items():
+        scored = [a for a in accs if a == a]
+        acc = f"{100 * statistics.mean(scored):5.1f}%" if scored else "  n/a"
+        print(f"{mode:8s} ocr={statistics.median(times):8.0f} ms (median)  "
+              f"pixels={statistics.mean(pixels) / 1e6:5.2f} MP  accuracy={acc}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Export the exercise models to ONNX for the ONNX Runtime backend.
+
+Writes ``<checkpoint>.onnx`` next to every ``Config.MODEL_PATHS``
+checkpoint (where ``MUSCLE_BACKEND=onnx`` looks for it), with a dynamic
+batch dimension so ``process_video``'s micro-batches run as one call.
+
+Usage:
+    python scripts/export_onnx.py [--imgsz 640] [--opset 17] [--exercise squat ...]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from services.muscle_ai_service.config.settings import Config  # noqa: E402
+from services.muscle_ai_service.core.models.onnx_backend import onnx_path_for  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--exercise", nargs="+", choices=sorted(Config.MODEL_PATHS),
+                        help="only export these exercises (default: all)")
+    args = parser.parse_args()
+
+    from ultralytics import YOLO  # type: ignore
+
+    failed = 0
+    for exercise, model_path in Config.MODEL_PATHS.items():
+        if args.exercise and exercise not in args.exercise:
+            continue
+        if not Path(model_path).exists():
+            print(f"{exercise:18} missing checkpoint {model_path}")
+            failed += 1
+            continue
+        exported = YOLO(model_path).export(format="onnx", imgsz=args.imgsz, opset=args.opset,
+                                           dynamic=True, simplify=True)
+        target = Path(onnx_path_for(model_path))
+        if Path(exported).resolve() != target.resolve():
+            Path(exported).replace(target)
+        print(f"{exercise:18} {target} ({target.stat().st_size / 1e6:.1f} MB)")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
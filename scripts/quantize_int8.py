@@ -0,0 +1,163 @@
+"""
+Quantize the exercise models to INT8 for CPU serving.
+
+Post-training static quantization with ONNX Runtime: each FP32 export
+from ``scripts/export_onnx.py`` is calibrated on frames sampled evenly
+from sample videos of that exercise (``<videos>/<exercise>/*.mp4``,
+falling back to every video directly in ``<videos>``) and written as
+``<checkpoint>.int8.onnx``, which ``MUSCLE_BACKEND=onnx-int8`` serves.
+
+Weights are quantized per channel to int8 and activations to uint8 (QDQ
+format).  The non-convolution nodes of the detection head - box decoding,
+DFL softmax, class sigmoid and the final concat - stay in FP32, since the
+boxes and confidences come straight out of them and they are a small
+share of the compute.
+
+Compare the result with ``scripts/report_int8.py``.
+
+Usage:
+    python scripts/quantize_int8.py path/to/videos [--frames 200] [--method minmax] [--exercise squat ...]
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import cv2  # noqa: E402
+
+from services.muscle_ai_service.config.settings import Config  # noqa: E402
+from services.muscle_ai_service.core.models.onnx_backend import (  # noqa: E402
+    int8_path_for, onnx_path_for, to_tensor,
+)
+
+VIDEO_SUFFIXES = (".mp4", ".avi", ".mov")
+_MODULE_RE = re.compile(r"^/model\.(\d+)/")
+
+
+def sample_videos(root: Path, exercise: str):
+    folder = root / exercise
+    if not folder.is_dir():
+        folder = root
+    return sorted(p for p in folder.glob("*") if p.suffix.lower() in VIDEO_SUFFIXES)
+
+
+def sample_frames(videos, count: int):
+    """About ``count`` frames spread evenly over ``videos``."""
+    frames = []
+    per_video = max(1, count // max(1, len(videos)))
+    for video in videos:
+        cap = cv2.VideoCapture(str(video))
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or per_video
+        step = max(1, total // per_video)
+        for index in range(0, total, step)[:per_video]:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+            ret, frame = cap.read()
+            if ret:
+                frames.append(frame)
+        cap.release()
+    return frames[:count]
+
+
+def head_nodes_to_exclude(model_path: str):
+    """Non-Conv nodes of the last module (the detection head)."""
+    import onnx  # type: ignore
+
+    graph = onnx.load(model_path).graph
+    modules = [int(m.group(1)) for node in graph.node if (m := _MODULE_RE.match(node.name))]
+    if not modules:
+        return []
+    prefix = f"/model.{max(modules)}/"
+    return [node.name for node in graph.node if node.name.startswith(prefix) and node.op_type != "Conv"]
+
+
+def quantize(exercise: str, model_path: str, frames, method: str):
+    from onnxruntime.quantization import (  # type: ignore
+        CalibrationDataReader, CalibrationMethod, QuantFormat, QuantType, quantize_static,
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process  # type: ignore
+    import onnxruntime as ort  # type: ignore
+
+    fp32_path = onnx_path_for(model_path)
+    int8_path = int8_path_for(model_path)
+    prepared_path = str(Path(int8_path).with_suffix(".prep.onnx"))
+
+    session = ort.InferenceSession(fp32_path, providers=["CPUExecutionProvider"])
+    model_input = session.get_inputs()[0]
+    size = tuple(model_input.shape[2:])
+    stride = None
+    if not all(isinstance(d, int) for d in size):
+        # Calibrate on the same minimally padded inputs OnnxYolo feeds it
+        size = (640, 640)
+        stride = int(session.get_modelmeta().custom_metadata_map.get("stride", 32))
+
+    class FrameReader(CalibrationDataReader):
+        def __init__(self):
+            self._frames = iter(frames)
+
+        def get_next(self):
+            frame = next(self._frames, None)
+            if frame is None:
+                return None
+            tensor, _ = to_tensor([frame], size, stride)
+            return {model_input.name: tensor}
+
+    quant_pre_process(fp32_path, prepared_path)
+    try:
+        quantize_static(
+            prepared_path,
+            int8_path,
+            FrameReader(),
+            quant_format=QuantFormat.QDQ,
+            per_channel=True,
+            weight_type=QuantType.QInt8,
+            activation_type=QuantType.QUInt8,
+            calibrate_method={"minmax": CalibrationMethod.MinMax,
+                              "entropy": CalibrationMethod.Entropy,
+                              "percentile": CalibrationMethod.Percentile}[method],
+            nodes_to_exclude=head_nodes_to_exclude(prepared_path),
+        )
+    finally:
+        Path(prepared_path).unlink(missing_ok=True)
+
+    # quantize_static drops the ultralytics metadata (class names, kpt_shape)
+    import onnx  # type: ignore
+    source, target = onnx.load(fp32_path), onnx.load(int8_path)
+    del target.metadata_props[:]
+    target.metadata_props.extend(source.metadata_props)
+    onnx.save(target, int8_path)
+    return Path(fp32_path).stat().st_size, Path(int8_path).stat().st_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("videos", type=Path, help="sample videos (one sub-folder per exercise, or flat)")
+    parser.add_argument("--frames", type=int, default=200, help="calibration frames per exercise")
+    parser.add_argument("--method", choices=("minmax", "entropy", "percentile"), default="minmax")
+    parser.add_argument("--exercise", nargs="+", choices=sorted(Config.MODEL_PATHS))
+    args = parser.parse_args()
+
+    failed = 0
+    for exercise, model_path in Config.MODEL_PATHS.items():
+        if args.exercise and exercise not in args.exercise:
+            continue
+        if not Path(onnx_path_for(model_path)).exists():
+            print(f"{exercise:18} no ONNX export, run scripts/export_onnx.py first")
+            failed += 1
+            continue
+        frames = sample_frames(sample_videos(args.videos, exercise), args.frames)
+        if not frames:
+            print(f"{exercise:18} no calibration frames under {args.videos}")
+            failed += 1
+            continue
+        fp32_bytes, int8_bytes = quantize(exercise, model_path, frames, args.method)
+        print(f"{exercise:18} {len(frames)} calibration frames, "
+              f"{fp32_bytes / 1e6:.1f} MB -> {int8_bytes / 1e6:.1f} MB  {int8_path_for(model_path)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
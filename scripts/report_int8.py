@@ -0,0 +1,89 @@
+"""
+Report INT8 vs FP32 agreement and speed for the exercise models.
+
+Runs every video in ``<videos>/<exercise>/`` through ``process_video`` in
+metrics-only mode twice - with the FP32 model (``--reference``, the FP32
+ONNX export by default, or ``torch``) and with its INT8 quantization from
+``scripts/quantize_int8.py`` - and prints a markdown table per exercise:
+
+    | exercise | videos | failed | reps equal | mean abs rep diff | mean abs score diff | FP32 fps | INT8 fps | speedup |
+
+A video that raises or yields no metrics with either model is counted as
+failed (FP32 / INT8) and left out of the comparison.  Frames per second are whole-pipeline (decode + inference + analysis)
+frames over wall time, so they show what a CPU node would serve.
+
+Usage:
+    python scripts/report_int8.py path/to/videos [--reference onnx|torch] [--exercise squat ...]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from services.muscle_ai_service.config.settings import Config  # noqa: E402
+from services.muscle_ai_service.core.models.yolo import load_model  # noqa: E402
+from services.muscle_ai_service.utils.video import process_video  # noqa: E402
+
+VIDEO_SUFFIXES = (".mp4", ".avi", ".mov")
+
+
+def analyse(videos, exercise, model):
+    """``{video: (repetitions, score)}``, overall frames per second and the
+    number of failed videos."""
+    results, frames, seconds, failed = {}, 0, 0.0, 0
+    for video in videos:
+        stats = {}
+        try:
+            metrics = process_video(str(video), None, exercise, model, stats=stats)
+        except Exception as e:
+            print(f"{video}: {e}", file=sys.stderr)
+            metrics = None
+        if metrics is None or "wall_s" not in stats:
+            failed += 1
+            continue
+        results[video] = (metrics["repetitions"], metrics["movement_assessment"]["score"])
+        frames += stats["decode"]["items"]
+        seconds += stats["wall_s"]
+    return results, frames / seconds if seconds else 0.0, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("videos", type=Path, help="folder with one sub-folder of videos per exercise")
+    parser.add_argument("--reference", choices=("onnx", "torch"), default="onnx",
+                        help="FP32 backend to compare against")
+    parser.add_argument("--exercise", nargs="+", choices=sorted(Config.MODEL_PATHS))
+    args = parser.parse_args()
+
+    print("| exercise | videos | failed | reps equal | mean abs rep diff | mean abs score diff "
+          "| FP32 fps | INT8 fps | speedup |")
+    print("|---|---|---|---|---|---|---|---|---|")
+    for exercise, model_path in Config.MODEL_PATHS.items():
+        if args.exercise and exercise not in args.exercise:
+            continue
+        folder = args.videos / exercise
+        videos = sorted(p for p in folder.glob("*") if p.suffix.lower() in VIDEO_SUFFIXES) if folder.is_dir() else []
+        if not videos:
+            print(f"| {exercise} | 0 | - | - | - | - | - | - | - |")
+            continue
+
+        fp32, fp32_fps, fp32_failed = analyse(videos, exercise, load_model(model_path, args.reference))
+        int8, int8_fps, int8_failed = analyse(videos, exercise, load_model(model_path, "onnx-int8"))
+        pairs = [(fp32[v], int8[v]) for v in videos if v in fp32 and v in int8]
+        n = len(pairs)
+        failed = f"{fp32_failed} / {int8_failed}"
+        if not n:
+            print(f"| {exercise} | {len(videos)} | {failed} | - | - | - | - | - | - |")
+            continue
+        reps_equal = sum(a[0] == b[0] for a, b in pairs)
+        rep_diff = sum(abs(a[0] - b[0]) for a, b in pairs) / n
+        score_diff = sum(abs(a[1] - b[1]) for a, b in pairs) / n
+        print(f"| {exercise} | {len(videos)} | {failed} | {reps_equal}/{n} | {rep_diff:.2f} | {score_diff:.2f} "
+              f"| {fp32_fps:.1f} | {int8_fps:.1f} | {int8_fps / fp32_fps if fp32_fps else float('nan'):.2f}x |")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,17 +6,18 @@ Handles exercise form analysis and video processing endpoints
 from flask import Blueprint, render_template, request, url_for, Response, jsonify
 import os
 import logging
+import math
 from datetime import datetime
 from pathlib import Path
 
 # Import service core modules
 try:
     from ..core.models.analyzer import MovementAnalyzer
-    from ..core.models.yolo import get_yolo_models
+    from ..core.models.registry import model_registry
     from ..utils.video import process_video
 except ImportError:
     MovementAnalyzer = None
-    get_yolo_models = None
+    model_registry = None
     process_video = None
 
 logger = logging.getLogger(__name__)
@@ -38,33 +39,16 @@ SUPPORTED_EXERCISES = [
 ]
 
 VIDEO_FOLDER = Path('data/uploads/videos')
-PROCESSED_FOLDER = Path('data/processed/videos')
 WEB_FOLDER = Path('web/static/videos')
 
-for folder in [VIDEO_FOLDER, PROCESSED_FOLDER, WEB_FOLDER]:
+for folder in [VIDEO_FOLDER, WEB_FOLDER]:
     folder.mkdir(parents=True, exist_ok=True)
 
-models = None
-
-def init_models():
-    """Initialize YOLO models"""
-    global models
-    if models is None:
-        try:
-            if get_yolo_models is None:
-                raise RuntimeError("YOLO loader not available")
-            models = get_yolo_models()
-            logger.info("YOLO models loaded successfully")
-        except Exception as e:
-            logger.error(f"Failed to load YOLO models: {e}")
-            models = {}
-
 
 @muscle_ai_bp.route('/')
 @muscle_ai_bp.route('/index')
 def index():
     """Muscle AI landing page"""
-    init_models()
     return render_template(
         'muscle-ai/index.html',
         gateway_url=os.environ.get('GATEWAY_URL', 'http://127.0.0.1:5000').rstrip('/'),
@@ -72,100 +56,106 @@ def index():
     )
 
 
+def _upload_error(message, metrics_only, status=400):
+    """Upload error as JSON for metrics-only requests, else the page"""
+    if metrics_only:
+        return jsonify({'error': message}), status
+    return render_template(
+        'muscle-ai/index.html',
+        message=message,
+        gateway_url=os.environ.get('GATEWAY_URL', 'http://127.0.0.1:5000').rstrip('/'),
+        supported_exercises=SUPPORTED_EXERCISES
+    )
+
+
 @muscle_ai_bp.route('/upload', methods=['POST'])
 def upload():
-    """Handle video upload and processing"""
-    init_models()
+    """Handle video upload and processing
+
+    ``mode=metrics`` skips rendering the annotated video and returns the
+    metrics as JSON; ``timeline=1`` adds the compact per-frame timeline.
+    """
     gateway_url = os.environ.get('GATEWAY_URL', 'http://127.0.0.1:5000').rstrip('/')
-    
+    metrics_only = request.form.get('mode') == 'metrics'
+    want_timeline = request.form.get('timeline', '').lower() in ('1', 'true', 'yes')
+
     if 'video' not in request.files:
-        return render_template(
-            'muscle-ai/index.html',
-            message='No video file uploaded',
-            gateway_url=gateway_url,
-            supported_exercises=SUPPORTED_EXERCISES
-        )
-    
+        return _upload_error('No video file uploaded', metrics_only)
+
     file = request.files['video']
     if file.filename == '':
-        return render_template(
-            'muscle-ai/index.html',
-            message='No selected file',
-            gateway_url=gateway_url,
-            supported_exercises=SUPPORTED_EXERCISES
-        )
-    
+        return _upload_error('No selected file', metrics_only)
+
     if not file.filename.lower().endswith(('.mp4', '.avi', '.mov')):
-        return render_template(
-            'muscle-ai/index.html',
-            message='Invalid file type. Please upload MP4, AVI, or MOV files',
-            gateway_url=gateway_url,
-            supported_exercises=SUPPORTED_EXERCISES
-        )
-    
+        return _upload_error('Invalid file type. Please upload MP4, AVI, or MOV files', metrics_only)
+
     exercise_type = request.form.get('exercise_type')
     if exercise_type not in SUPPORTED_EXERCISES:
-        return render_template(
-            'muscle-ai/index.html',
-            message='Invalid exercise type',
-            gateway_url=gateway_url,
-            supported_exercises=SUPPORTED_EXERCISES
-        )
-    
+        return _upload_error('Invalid exercise type', metrics_only)
+
+    # Optional fast-analysis mode: run inference at about this many fps
+    analysis_fps = request.form.get('analysis_fps', type=float)
+    if request.form.get('analysis_fps') and not (analysis_fps is not None
+                                                 and math.isfinite(analysis_fps) and analysis_fps > 0):
+        return _upload_error('analysis_fps must be a positive number', metrics_only)
+
+    if model_registry is None or exercise_type not in model_registry:
+        return _upload_error(f'Model for {exercise_type} not available', metrics_only, 503)
+    try:
+        # Loaded on first use; may wait for another request's load or warmup
+        model = model_registry.get(exercise_type)
+    except RuntimeError as e:
+        logger.error(f"Model for {exercise_type} unavailable: {e}")
+        return _upload_error(f'Model for {exercise_type} not available', metrics_only, 503)
+
     try:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         base_filename = os.path.splitext(file.filename)[0]
         filename = f"{timestamp}_{base_filename}"
-        
+
         video_path = VIDEO_FOLDER / f"{filename}.mp4"
-        processed_path = PROCESSED_FOLDER / f"processed_{filename}.mp4"
         web_filename = f'web_{filename}.mp4'
-        web_path = WEB_FOLDER / web_filename
-        
+        web_path = None if metrics_only else WEB_FOLDER / web_filename
+
         file.save(str(video_path))
         logger.info(f"Saved video: {video_path}")
-        
-        if models and exercise_type in models:
+
+        timeline = {} if want_timeline else None
+        try:
             metrics = process_video(
                 str(video_path),
-                str(processed_path),
-                str(web_path),
+                str(web_path) if web_path else None,
                 exercise_type,
-                models[exercise_type]
+                model,
+                analysis_fps=analysis_fps,
+                timeline=timeline
             )
-            
+        finally:
             if video_path.exists():
                 video_path.unlink()
-            if processed_path.exists():
-                processed_path.unlink()
-            
-            return render_template(
-                'muscle-ai/index.html',
-                video_url=url_for('static', filename=f'videos/{web_filename}'),
-                movement_analysis={
-                    'score': metrics['movement_assessment']['score'],
-                    'metrics': metrics
-                },
-                gateway_url=gateway_url,
-                supported_exercises=SUPPORTED_EXERCISES
-            )
-        else:
-            return render_template(
-                'muscle-ai/index.html',
-                message=f'Model for {exercise_type} not available',
-                gateway_url=gateway_url,
-                supported_exercises=SUPPORTED_EXERCISES
-            )
-            
-    except Exception as e:
-        logger.error(f"Error processing upload: {e}", exc_info=True)
+
+        if metrics_only:
+            payload = {'exercise_type': exercise_type, 'metrics': metrics}
+            if timeline is not None:
+                payload['timeline'] = timeline
+            return jsonify(payload), 200
+
         return render_template(
             'muscle-ai/index.html',
-            message=f'Error processing video: {str(e)}',
+            video_url=url_for('static', filename=f'videos/{web_filename}'),
+            movement_analysis={
+                'score': metrics['movement_assessment']['score'],
+                'metrics': metrics,
+                'timeline': timeline
+            },
             gateway_url=gateway_url,
             supported_exercises=SUPPORTED_EXERCISES
         )
 
+    except Exception as e:
+        logger.error(f"Error processing upload: {e}", exc_info=True)
+        return _upload_error(f'Error processing video: {str(e)}', metrics_only, 500)
+
 
 @muscle_ai_bp.route('/api/exercises', methods=['GET'])
 def api_exercises():
@@ -175,13 +165,12 @@ def api_exercises():
 
 @muscle_ai_bp.route('/api/health', methods=['GET'])
 def api_health():
-    """Health check endpoint"""
+    """Health check endpoint with per-model readiness"""
+    registry = model_registry.status() if model_registry is not None else None
     return jsonify({
         'status': 'healthy',
         'service': 'muscle-ai-service',
         'version': '2.0.0',
-        'models_loaded': models is not None and len(models) > 0
+        'models_loaded': bool(registry and registry['resident']),
+        'models': registry
     }), 200
-
-
-init_models()
@@ -10,6 +10,10 @@ class Config:
     PROCESSED_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__),'processed_videos'))
     STATIC_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__),'static'))
     
+    # Detection thresholds, passed to predict() by every inference backend
+    DETECTION_CONF = float(os.getenv('MUSCLE_DETECTION_CONF', '0.25'))
+    DETECTION_IOU = float(os.getenv('MUSCLE_DETECTION_IOU', '0.7'))
+
     # File upload settings
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     
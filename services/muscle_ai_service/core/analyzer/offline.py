@@ -0,0 +1,140 @@
+"""
+Offline (whole-series) movement analysis.
+
+Re-analysing a recorded workout - e.g. after tuning the rep thresholds -
+doesn't need to replay every frame through ``MovementAnalyzer``.  Given the
+per-frame ``form`` and ``down`` confidences as arrays (NaN where the label
+wasn't detected) this module:
+
+* forward-fills missed form detections and applies the same trailing
+  moving average as ``smooth_value``, one vectorized addition per window
+  slot in the same order, so the means are bit-identical;
+* runs the rep state machine over edges only: start and completion
+  candidates are found with array masks and a "next index where true"
+  lookup, so the Python loop runs once per rep / aborted rep, not per
+  frame;
+* aggregates the scores with NumPy and builds the same metrics dict as
+  ``MovementAnalyzer.get_metrics``.
+
+Rep counts match the streaming analyzer exactly; the score averages may
+differ by float rounding.
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from ..models.analyzer import MovementAnalyzer
+
+PARAMS = ('window_size', 'rep_start_threshold', 'rep_end_threshold',
+          'min_frames_between_reps', 'min_rep_frames')
+
+
+def _form_label(exercise_type: str) -> str:
+    return 'ibw' if exercise_type in ('regular_deadlift', 'squat') else 'up'
+
+
+def series_from_labels(frames: Iterable[Dict], exercise_type: str) -> Tuple[np.ndarray, np.ndarray]:
+    """``(form, down)`` float arrays from per-frame label dicts (NaN = missing)."""
+    form_label = _form_label(exercise_type)
+    form, down = [], []
+    for labels in frames:
+        form.append(labels.get(form_label, np.nan))
+        down.append(labels.get('down', np.nan))
+    return np.asarray(form, dtype=np.float64), np.asarray(down, dtype=np.float64)
+
+
+def smooth(form: np.ndarray, window_size: int) -> np.ndarray:
+    """Trailing moving average with missed values repeating the last one."""
+    n = form.shape[0]
+    valid = ~np.isnan(form)
+    last_valid = np.maximum.accumulate(np.where(valid, np.arange(n), -1))
+    filled = np.where(last_valid >= 0, form[np.maximum(last_valid, 0)], 0.0)
+
+    # Sum each window oldest to newest, as smooth_value does: a different
+    # summation order rounds differently and flips threshold comparisons.
+    # The leading zero padding adds exactly nothing to the first windows.
+    padded = np.concatenate([np.zeros(window_size - 1), filled])
+    sums = np.zeros(n)
+    for offset in range(window_size):
+        sums += padded[offset:offset + n]
+    counts = np.minimum(np.arange(1, n + 1), window_size)
+    return sums / counts
+
+
+def _next_true(mask: np.ndarray) -> np.ndarray:
+    """``out[i]`` = first index >= i where ``mask`` is true, or ``len(mask)``."""
+    n = mask.shape[0]
+    index = np.where(mask, np.arange(n), n)
+    return np.minimum.accumulate(index[::-1])[::-1]
+
+
+def count_reps(smoothed: np.ndarray, rep_start_threshold: float, rep_end_threshold: float,
+               min_frames_between_reps: int, min_rep_frames: int) -> Tuple[int, np.ndarray]:
+    """Rep count and the frame index each rep completed on.
+
+    Same rules as ``MovementAnalyzer.detect_rep``: a rep starts below
+    ``rep_start_threshold`` once more than ``min_frames_between_reps``
+    frames have passed since the last rep, completes above
+    ``rep_end_threshold`` after at least ``min_rep_frames`` frames, and is
+    abandoned after ``2 * min_frames_between_reps`` frames.
+    """
+    n = smoothed.shape[0]
+    next_start = _next_true(smoothed < rep_start_threshold)
+    next_end = _next_true(smoothed > rep_end_threshold)
+    max_span = min_frames_between_reps * 2
+
+    completed = []
+    # frames_since_last_rep starts at 0 and is incremented before the
+    # check, so the first start may happen on frame min_frames_between_reps.
+    position = min_frames_between_reps
+    while position < n:
+        start = next_start[position]
+        if start >= n:
+            break
+        # Completion is checked from the frame after the start on
+        earliest_end = start + max(1, min_rep_frames - 1)
+        end = next_end[earliest_end] if earliest_end < n else n
+        if end <= start + max_span and end < n:
+            completed.append(end)
+            position = end + min_frames_between_reps + 1
+        else:
+            # Too slow (or the video ended): abandoned on frame start + max_span.
+            position = start + max_span + 1
+    return len(completed), np.asarray(completed, dtype=np.int64)
+
+
+def analyze_series(form, down, exercise_type: str = '', **params) -> Optional[Dict]:
+    """Metrics for whole ``form`` / ``down`` series, like ``get_metrics``.
+
+    ``params`` overrides the analyzer's rep detection settings (any of
+    ``PARAMS``); defaults come from ``MovementAnalyzer``.
+    """
+    defaults = MovementAnalyzer(exercise_type)
+    unknown = set(params) - set(PARAMS)
+    if unknown:
+        raise TypeError(f"Unknown analysis parameters: {', '.join(sorted(unknown))}")
+    settings = {name: params.get(name, getattr(defaults, name)) for name in PARAMS}
+
+    form = np.asarray(form, dtype=np.float64)
+    down = np.asarray(down, dtype=np.float64)
+    form_scores = form[~np.isnan(form)]
+    down_scores = down[~np.isnan(down)]
+    if not form_scores.size or not down_scores.size:
+        return None
+
+    smoothed = smooth(form, settings['window_size'])
+    repetitions, _ = count_reps(
+        smoothed,
+        settings['rep_start_threshold'],
+        settings['rep_end_threshold'],
+        settings['min_frames_between_reps'],
+        settings['min_rep_frames'],
+    )
+
+    return MovementAnalyzer.build_metrics(
+        int(form_scores.size),
+        repetitions,
+        (float(form_scores.mean()), float(form_scores.min()), float(form_scores.max())),
+        (float(down_scores.mean()), float(down_scores.min()), float(down_scores.max())),
+    )
@@ -80,18 +80,75 @@
 #             }
 #         }
 # app/models/analyzer.py
-import numpy as np
 import math
+from array import array
+
+
+class RunningStats:
+    """Count, sum, min, max and mean of a stream in O(1) per value.
+
+    The sum is compensated (Neumaier) so long videos average the same as a
+    full pass over the values.
+    """
+    __slots__ = ('count', '_sum', '_compensation', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self._sum = 0.0
+        self._compensation = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.count += 1
+
+        total = self._sum + value
+        if abs(self._sum) >= abs(value):
+            self._compensation += (self._sum - total) + value
+        else:
+            self._compensation += (value - total) + self._sum
+        self._sum = total
+
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @property
+    def total(self):
+        return self._sum + self._compensation
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
 class MovementAnalyzer:
+    # One analyzer lives per uploaded video; slots and float32 arrays keep
+    # long videos at 4 bytes per score instead of a boxed float each.
+    __slots__ = (
+        'exercise_type', 'form_scores', 'down_scores', 'rep_count', 'form_stats', 'down_stats',
+        'window_size', '_window', '_window_pos', '_window_len',
+        'rep_threshold', 'min_frames_between_reps', 'frames_since_last_rep', 'in_rep_motion',
+        'rep_start_threshold', 'rep_end_threshold', 'min_rep_frames', 'current_rep_frames',
+    )
+
     def __init__(self, exercise_type):
         self.exercise_type = exercise_type
-        self.form_scores = []  # ibw for regular/squat, up for others
-        self.down_scores = []
+        self.form_scores = array('f')  # ibw for regular/squat, up for others
+        self.down_scores = array('f')
         self.rep_count = 0
+
+        # Running aggregates so get_metrics is O(1) per frame
+        self.form_stats = RunningStats()
+        self.down_stats = RunningStats()
         
         # Rep counting parameters
-        self.form_values = []  # Store recent form values for smoothing
         self.window_size = 5   # Number of frames to use for smoothing
+        # Ring buffer of the recent form values for smoothing
+        self._window = [0.0] * self.window_size
+        self._window_pos = 0
+        self._window_len = 0
         self.rep_threshold = 0.89  # Threshold for rep detection
         self.min_frames_between_reps = 10  # Minimum frames between reps to prevent double counting
         self.frames_since_last_rep = 0
@@ -103,10 +160,20 @@ class MovementAnalyzer:
 
     def smooth_value(self, value):
         """Apply moving average smoothing to reduce noise"""
-        self.form_values.append(value if value is not None else self.form_values[-1] if self.form_values else 0)
-        if len(self.form_values) > self.window_size:
-            self.form_values.pop(0)
-        return sum(self.form_values) / len(self.form_values)
+        window, size = self._window, self.window_size
+        if value is None:
+            # A missed detection repeats the last value (0 before any)
+            value = window[(self._window_pos - 1) % size] if self._window_len else 0
+        window[self._window_pos] = value
+        self._window_pos = (self._window_pos + 1) % size
+        if self._window_len < size:
+            self._window_len += 1
+            return sum(window[:self._window_len]) / self._window_len
+        # Sum oldest to newest, in the same order as a list of the last
+        # values would, so the thresholds see bit-identical means (a
+        # running sum drifts by an ulp and flips 0.85 / 0.92 comparisons).
+        pos = self._window_pos
+        return sum(window[:pos], sum(window[pos:])) / size
 
     def detect_rep(self, smoothed_value):
         """Detect repetition using state machine approach"""
@@ -152,8 +219,10 @@ class MovementAnalyzer:
         # Update scores
         if form_value is not None:
             self.form_scores.append(form_value)
+            self.form_stats.add(form_value)
         if down_value is not None:
             self.down_scores.append(down_value)
+            self.down_stats.add(down_value)
 
         # Apply smoothing and detect reps
         smoothed_value = self.smooth_value(form_value)
@@ -163,23 +232,32 @@ class MovementAnalyzer:
 
     def get_metrics(self):
         """Calculate and return movement metrics"""
-        if not self.form_scores or not self.down_scores:
+        form, down = self.form_stats, self.down_stats
+        if not form.count or not down.count:
             return None
+        return self.build_metrics(form.count, self.rep_count,
+                                  (form.mean, form.min, form.max),
+                                  (down.mean, down.min, down.max))
 
+    @classmethod
+    def build_metrics(cls, frames_analyzed, repetitions, form, down):
+        """Metrics dict from ``(average, min, max)`` of the form and down scores"""
+        form_avg, form_min, form_max = form
+        down_avg, down_min, down_max = down
         metrics = {
-            'frames_analyzed': len(self.form_scores),
-            'repetitions': self.rep_count,
+            'frames_analyzed': frames_analyzed,
+            'repetitions': repetitions,
             'form_metrics': {
-                'average': np.mean(self.form_scores),
-                'min': min(self.form_scores),
-                'max': max(self.form_scores),
-                'consistency': 1 - (max(self.form_scores) - min(self.form_scores))
+                'average': form_avg,
+                'min': form_min,
+                'max': form_max,
+                'consistency': 1 - (form_max - form_min)
             },
             'depth_metrics': {
-                'average': np.mean(self.down_scores),
-                'min': min(self.down_scores),
-                'max': max(self.down_scores),
-                'consistency': 1 - (max(self.down_scores) - min(self.down_scores))
+                'average': down_avg,
+                'min': down_min,
+                'max': down_max,
+                'consistency': 1 - (down_max - down_min)
             }
         }
 
@@ -189,10 +267,10 @@ class MovementAnalyzer:
         overall_score = (form_component + depth_component) * 10
 
         metrics['movement_assessment'] = {
-            'form_quality': self.get_quality_assessment(metrics['form_metrics']['average']),
-            'depth_quality': self.get_quality_assessment(metrics['depth_metrics']['average']),
-            'form_consistency': self.get_quality_assessment(metrics['form_metrics']['consistency']),
-            'depth_consistency': self.get_quality_assessment(metrics['depth_metrics']['consistency']),
+            'form_quality': cls.get_quality_assessment(metrics['form_metrics']['average']),
+            'depth_quality': cls.get_quality_assessment(metrics['depth_metrics']['average']),
+            'form_consistency': cls.get_quality_assessment(metrics['form_metrics']['consistency']),
+            'depth_consistency': cls.get_quality_assessment(metrics['depth_metrics']['consistency']),
             'score': round(overall_score, 1)
         }
 
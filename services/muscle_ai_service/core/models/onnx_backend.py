@@ -0,0 +1,239 @@
+"""
+ONNX Runtime inference backend for the exercise models
+
+CPU-only nodes run the exercise models through ONNX Runtime instead of
+PyTorch eager mode.  ``scripts/export_onnx.py`` exports each
+``Config.MODEL_PATHS`` checkpoint next to it as ``.onnx`` (and
+``scripts/quantize_int8.py`` an INT8 variant); ``OnnxYolo`` loads one
+with tuned intra-/inter-op thread counts and is called like an
+ultralytics model (``model(frames, **PREDICT_ARGS)``, with the same
+``conf`` / ``iou`` thresholds from ``Config``).  It
+yields results with the attributes ``process_video`` reads - ``boxes``
+(``cls``, ``conf``, ``xyxy``), ``names`` and ``keypoints``.
+
+Preprocessing follows ultralytics' PyTorch path: for the dynamic-shape
+exports ``export_onnx.py`` writes, frames are letterboxed with minimal
+padding (up to a multiple of the model stride, ``LetterBox(auto=True)``)
+rather than to the full square; a fixed-shape export is padded to its
+input size.  Postprocessing is the same class-aware NMS.  Labels should
+therefore agree closely, but small confidence differences remain (resize
+and float rounding); ``scripts/bench_onnx_backend.py`` measures the
+agreement per exercise.
+"""
+
+import ast
+import logging
+import os
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from ...config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+INTRA_OP_THREADS = int(os.getenv('MUSCLE_ONNX_INTRA_THREADS', '0'))  # 0 = one per physical core
+INTER_OP_THREADS = int(os.getenv('MUSCLE_ONNX_INTER_THREADS', '1'))
+MAX_DETECTIONS = 300
+_MAX_WH = 7680  # class offset for class-aware NMS, as in ultralytics
+
+
+def onnx_path_for(model_path: str) -> str:
+    """Where ``scripts/export_onnx.py`` writes the ONNX export of a checkpoint"""
+    return os.path.splitext(model_path)[0] + '.onnx'
+
+
+def int8_path_for(model_path: str) -> str:
+    """Where ``scripts/quantize_int8.py`` writes the INT8 model of a checkpoint"""
+    return os.path.splitext(model_path)[0] + '.int8.onnx'
+
+
+def letterbox(frame: np.ndarray, size, color=(114, 114, 114), stride: Optional[int] = None):
+    """Resize keeping the aspect ratio and pad to ``size`` (h, w), or with
+    ``stride`` only up to the next multiple of it (ultralytics' ``auto``)
+
+    Returns ``(image, gain, (pad_x, pad_y))`` to map boxes back.
+    """
+    h, w = frame.shape[:2]
+    new_h, new_w = size
+    gain = min(new_h / h, new_w / w)
+    unpad_w, unpad_h = int(round(w * gain)), int(round(h * gain))
+    dw, dh = new_w - unpad_w, new_h - unpad_h
+    if stride:
+        dw, dh = dw % stride, dh % stride
+    dw, dh = dw / 2, dh / 2
+    if (w, h) != (unpad_w, unpad_h):
+        frame = cv2.resize(frame, (unpad_w, unpad_h), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+    frame = cv2.copyMakeBorder(frame, top, bottom, left, right, cv2.BORDER_CONSTANT, value=color)
+    return frame, gain, (left, top)
+
+
+def to_tensor(frames, size, stride: Optional[int] = None):
+    """Letterboxed NCHW float batch for the model, plus each frame's
+    ``(gain, pad, shape)`` to map detections back
+
+    ``stride`` (minimal padding) applies only when every frame has the same
+    shape, as in ultralytics, so the batch still stacks.
+    """
+    if stride and len({frame.shape for frame in frames}) > 1:
+        stride = None
+    inputs, transforms = [], []
+    for frame in frames:
+        image, gain, pad = letterbox(frame, size, stride=stride)
+        inputs.append(image)
+        transforms.append((gain, pad, frame.shape[:2]))
+    # BGR HWC uint8 -> RGB CHW float in [0, 1]
+    tensor = np.ascontiguousarray(np.stack(inputs)[..., ::-1].transpose(0, 3, 1, 2), dtype=np.float32) / 255.0
+    return tensor, transforms
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Indices of the boxes kept by greedy non-maximum suppression"""
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = w * h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+class _Box:
+    """One detection, as yielded by iterating ``OnnxBoxes``"""
+    __slots__ = ('xyxy', 'conf', 'cls')
+
+    def __init__(self, xyxy, conf, cls):
+        self.xyxy = xyxy
+        self.conf = conf
+        self.cls = cls
+
+
+class OnnxBoxes:
+    """Detections of one frame as arrays (``xyxy`` (n, 4), ``conf``, ``cls``)"""
+    __slots__ = ('xyxy', 'conf', 'cls')
+
+    def __init__(self, xyxy, conf, cls):
+        self.xyxy = xyxy
+        self.conf = conf
+        self.cls = cls
+
+    def __len__(self):
+        return len(self.conf)
+
+    def __iter__(self):
+        for i in range(len(self.conf)):
+            yield _Box(self.xyxy[i], self.conf[i], self.cls[i])
+
+
+class OnnxKeypoints:
+    __slots__ = ('xy', 'conf')
+
+    def __init__(self, xy, conf):
+        self.xy = xy
+        self.conf = conf
+
+
+class OnnxResult:
+    __slots__ = ('boxes', 'names', 'keypoints', 'orig_shape')
+
+    def __init__(self, boxes, names, keypoints, orig_shape):
+        self.boxes = boxes
+        self.names = names
+        self.keypoints = keypoints
+        self.orig_shape = orig_shape
+
+
+class OnnxYolo:
+    """An exported YOLO detection / pose model run with ONNX Runtime on CPU"""
+
+    def __init__(self, onnx_path: str, intra_op_threads: int = INTRA_OP_THREADS,
+                 inter_op_threads: int = INTER_OP_THREADS, conf: float = Config.DETECTION_CONF,
+                 iou: float = Config.DETECTION_IOU):
+        # Optional dependency: onnxruntime (only for MUSCLE_BACKEND=onnx)
+        import onnxruntime as ort  # type: ignore
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(onnx_path, sess_options=options, providers=['CPUExecutionProvider'])
+        self.path = onnx_path
+        self.conf = conf
+        self.iou = iou
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch, _, height, width = model_input.shape
+        self.dynamic_batch = not isinstance(batch, int)
+
+        # ultralytics stores class names, the keypoint shape, stride and
+        # export size as metadata
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.dynamic_shape = not (isinstance(height, int) and isinstance(width, int))
+        if self.dynamic_shape:
+            imgsz = ast.literal_eval(metadata['imgsz']) if 'imgsz' in metadata else [640, 640]
+            self.input_size = tuple(imgsz) if isinstance(imgsz, (list, tuple)) else (imgsz, imgsz)
+        else:
+            self.input_size = (height, width)
+        # Minimal (stride-aligned) padding needs an input that accepts any size
+        self.stride: Optional[int] = int(metadata.get('stride', 32)) if self.dynamic_shape else None
+        self.names: Dict[int, str] = ast.literal_eval(metadata['names']) if 'names' in metadata else {}
+        kpt_shape = ast.literal_eval(metadata['kpt_shape']) if 'kpt_shape' in metadata else None
+        self.kpt_shape: Optional[List[int]] = list(kpt_shape) if kpt_shape else None
+        self.overrides = {'imgsz': max(self.input_size)}  # read by model_input_size()
+        logger.info(f"Loaded ONNX model {onnx_path} (input {width}x{height}, "
+                    f"{intra_op_threads or 'auto'} intra / {inter_op_threads} inter-op threads)")
+
+    def __call__(self, source, stream=False, verbose=False, conf=None, iou=None, **kwargs):
+        frames = source if isinstance(source, (list, tuple)) else [source]
+        results = self._predict(frames, self.conf if conf is None else conf, self.iou if iou is None else iou)
+        return results if stream else list(results)
+
+    def _predict(self, frames, conf, iou):
+        step = len(frames) if self.dynamic_batch else 1
+        for start in range(0, len(frames), step):
+            tensor, transforms = to_tensor(frames[start:start + step], self.input_size, self.stride)
+            output = self.session.run(None, {self.input_name: tensor})[0]
+            for prediction, transform in zip(output, transforms):
+                yield self._postprocess(prediction, *transform, conf, iou)
+
+    def _postprocess(self, prediction, gain, pad, orig_shape, conf_threshold, iou_threshold):
+        """(4 + classes [+ keypoints], anchors) output -> an ``OnnxResult``"""
+        prediction = prediction.T
+        nc = len(self.names) if self.names else prediction.shape[1] - 4
+        scores = prediction[:, 4:4 + nc]
+        cls = scores.argmax(axis=1)
+        conf = scores[np.arange(len(cls)), cls]
+        mask = conf >= conf_threshold
+        prediction, cls, conf = prediction[mask], cls[mask], conf[mask]
+
+        cx, cy, w, h = prediction[:, 0], prediction[:, 1], prediction[:, 2], prediction[:, 3]
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+        keep = nms(boxes + cls[:, None] * _MAX_WH, conf, iou_threshold)[:MAX_DETECTIONS]
+        boxes, cls, conf, prediction = boxes[keep], cls[keep], conf[keep], prediction[keep]
+
+        # Undo the letterbox and clip to the frame
+        pad_x, pad_y = pad
+        height, width = orig_shape
+        boxes[:, [0, 2]] = np.clip((boxes[:, [0, 2]] - pad_x) / gain, 0, width)
+        boxes[:, [1, 3]] = np.clip((boxes[:, [1, 3]] - pad_y) / gain, 0, height)
+
+        keypoints = None
+        if self.kpt_shape:
+            kpts = prediction[:, 4 + nc:].reshape(len(keep), *self.kpt_shape)
+            xy = (kpts[..., :2] - (pad_x, pad_y)) / gain
+            keypoints = OnnxKeypoints(xy, kpts[..., 2] if self.kpt_shape[1] == 3 else None)
+
+        return OnnxResult(OnnxBoxes(boxes, conf.astype(np.float32), cls.astype(np.float32)),
+                          self.names, keypoints, orig_shape)
@@ -0,0 +1,203 @@
+"""
+Lazy per-exercise model registry
+
+Loading all six exercise models at import made every Muscle AI process
+pay the startup time and memory for exercises it may never serve.  The
+registry loads a model the first time its exercise is requested, keeps at
+most ``MUSCLE_MAX_MODELS`` resident (least recently used is evicted) and
+warms each fresh model up with a dummy frame before serving it, so lazy
+CUDA / kernel initialisation doesn't land inside a real video's first
+batch.  Loading and warmup run on the requesting thread: the request that
+triggers a load - and any request for that model arriving meanwhile -
+waits until both are done.
+
+To keep that wait off the request path, ``MUSCLE_PRELOAD_MODELS`` (comma
+separated exercise names, by default the two most common lifts and at
+most ``MUSCLE_MAX_MODELS``) loads and warms models on a background thread
+at startup; set it empty to load everything lazily.  ``status()`` reports
+per-model readiness for the health endpoint.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from ...config.settings import Config
+from .yolo import BACKEND, PREDICT_ARGS, load_model
+
+logger = logging.getLogger(__name__)
+
+MAX_LOADED_MODELS = int(os.getenv('MUSCLE_MAX_MODELS', '2'))
+WARMUP_ENABLED = os.getenv('MUSCLE_MODEL_WARMUP', '1') == '1'
+WARMUP_SIZE = int(os.getenv('MUSCLE_INFERENCE_SIZE', '640'))
+DEFAULT_PRELOAD_MODELS = 'squat,regular_deadlift'
+PRELOAD_MODELS = [m.strip() for m in os.getenv('MUSCLE_PRELOAD_MODELS', DEFAULT_PRELOAD_MODELS).split(',') if m.strip()]
+LOAD_TIMEOUT_SECONDS = float(os.getenv('MUSCLE_MODEL_LOAD_TIMEOUT', '300'))
+
+# Model states reported by status()
+NOT_LOADED, LOADING, WARMING, READY, FAILED = 'not_loaded', 'loading', 'warming', 'ready', 'failed'
+
+
+class _Entry:
+    """Load state of one exercise model"""
+    __slots__ = ('state', 'model', 'ready', 'error', 'load_ms', 'warmup_ms', 'loads', 'last_used')
+
+    def __init__(self):
+        self.state = NOT_LOADED
+        self.model = None
+        self.ready = threading.Event()  # set once loaded and warmed (or failed)
+        self.error = None
+        self.load_ms = None
+        self.warmup_ms = None
+        self.loads = 0
+        self.last_used = None
+
+
+class ModelRegistry:
+    """Exercise models loaded on first use with LRU eviction"""
+
+    def __init__(self, model_paths: Optional[Dict[str, str]] = None,
+                 max_loaded: int = MAX_LOADED_MODELS, warmup: bool = WARMUP_ENABLED, loader=load_model):
+        self.model_paths = dict(model_paths if model_paths is not None else Config.MODEL_PATHS)
+        self.max_loaded = max(1, max_loaded)
+        self.warmup = warmup
+        self._loader = loader
+        self._entries = {exercise: _Entry() for exercise in self.model_paths}
+        self._resident = OrderedDict()  # exercise -> None, least recently used first
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def __contains__(self, exercise_type):
+        return exercise_type in self.model_paths
+
+    def get(self, exercise_type: str, timeout: float = LOAD_TIMEOUT_SECONDS):
+        """The model for ``exercise_type``, loading (and warming) it if needed
+
+        Raises ``KeyError`` for unknown exercises and ``RuntimeError`` when
+        the model fails to load.
+        """
+        entry = self._entries[exercise_type]
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                start_load = entry.state in (NOT_LOADED, FAILED)
+                if start_load:
+                    entry.state = LOADING
+                    entry.error = None
+                    entry.ready.clear()
+                entry.last_used = time.time()
+                if exercise_type in self._resident:
+                    self._resident.move_to_end(exercise_type)
+
+            if start_load:
+                # Load and warm up on the caller's thread; other requests wait on ``ready``.
+                self._load(exercise_type, entry)
+
+            if not entry.ready.wait(max(0.0, deadline - time.monotonic())):
+                raise RuntimeError(f"Timed out waiting for the {exercise_type} model")
+            with self._lock:
+                model, state, error = entry.model, entry.state, entry.error
+            if model is not None:
+                return model
+            if state == FAILED:
+                raise RuntimeError(f"Model for {exercise_type} failed to load: {error}")
+            # Evicted before we got it: load it again.
+
+    def preload(self, exercises: Iterable[str]) -> None:
+        """Load and warm ``exercises`` on a background thread"""
+        exercises = [e for e in exercises if e in self.model_paths][:self.max_loaded]
+        if not exercises:
+            return
+
+        def run():
+            for exercise in exercises:
+                try:
+                    self.get(exercise)
+                except Exception as e:
+                    logger.error(f"Preloading {exercise} model failed: {e}")
+
+        threading.Thread(target=run, name='muscle-model-preload', daemon=True).start()
+
+    def _load(self, exercise_type: str, entry: _Entry) -> None:
+        started = time.perf_counter()
+        try:
+            model = self._loader(self.model_paths[exercise_type])
+        except Exception as e:
+            logger.error(f"Failed to load {exercise_type} model: {e}")
+            with self._lock:
+                entry.state = FAILED
+                entry.error = str(e)
+                entry.ready.set()
+            return
+
+        with self._lock:
+            entry.model = model
+            entry.loads += 1
+            entry.load_ms = round((time.perf_counter() - started) * 1000, 1)
+            self._resident[exercise_type] = None
+            self._resident.move_to_end(exercise_type)
+            self._evict_locked()
+            entry.state = WARMING if self.warmup else READY
+        logger.info(f"Loaded {exercise_type} model in {entry.load_ms} ms")
+
+        if self.warmup:
+            self._warmup(exercise_type, entry, model)
+        else:
+            entry.ready.set()
+
+    def _warmup(self, exercise_type: str, entry: _Entry, model) -> None:
+        started = time.perf_counter()
+        try:
+            frame = np.zeros((WARMUP_SIZE, WARMUP_SIZE, 3), dtype=np.uint8)
+            list(model([frame], **PREDICT_ARGS))
+        except Exception as e:
+            # A failed warmup only costs the first request some latency.
+            logger.warning(f"Warmup of {exercise_type} model failed: {e}")
+        with self._lock:
+            entry.warmup_ms = round((time.perf_counter() - started) * 1000, 1)
+            if entry.model is model:  # not evicted (or reloaded) meanwhile
+                entry.state = READY
+                entry.ready.set()
+
+    def _evict_locked(self) -> None:
+        while len(self._resident) > self.max_loaded:
+            exercise, _ = self._resident.popitem(last=False)
+            entry = self._entries[exercise]
+            # Requests already holding the model keep their reference.
+            entry.model = None
+            entry.state = NOT_LOADED
+            entry.ready.set()  # wake waiters so they reload it
+            self.evictions += 1
+            logger.info(f"Evicted {exercise} model (max {self.max_loaded} resident)")
+
+    def status(self) -> Dict:
+        with self._lock:
+            models = {
+                exercise: {
+                    'state': entry.state,
+                    'ready': entry.state == READY,
+                    'error': entry.error,
+                    'load_ms': entry.load_ms,
+                    'warmup_ms': entry.warmup_ms,
+                    'loads': entry.loads,
+                    'last_used': entry.last_used,
+                }
+                for exercise, entry in self._entries.items()
+            }
+            return {
+                'backend': BACKEND,
+                'max_loaded': self.max_loaded,
+                'resident': list(self._resident),
+                'evictions': self.evictions,
+                'models': models,
+            }
+
+
+model_registry = ModelRegistry()
+if PRELOAD_MODELS:
+    model_registry.preload(PRELOAD_MODELS)
@@ -2,12 +2,26 @@
 YOLO model loader module
 """
 import logging
+import os
 import torch
 
 from ...config.settings import Config
 
 logger = logging.getLogger(__name__)
 
+# Inference backend: 'torch' (ultralytics / PyTorch), 'onnx' (ONNX Runtime on CPU)
+# or 'onnx-int8' (the INT8-quantized ONNX models)
+BACKEND = os.getenv('MUSCLE_BACKEND', 'torch')
+
+# Keyword arguments for every model call, so all backends run with the same
+# thresholds (ultralytics ignores attributes set on the model object).
+PREDICT_ARGS = {
+    'stream': True,
+    'verbose': False,
+    'conf': Config.DETECTION_CONF,
+    'iou': Config.DETECTION_IOU,
+}
+
 def setup_gpu():
     """Configure GPU settings if available"""
     if torch.cuda.is_available():
@@ -18,30 +32,49 @@ def setup_gpu():
     logger.info("CUDA not available. Using CPU")
     return False
 
+def load_yolo_model(model_path, use_gpu=None):
+    """Load one YOLO model, moved to the GPU in FP16 when available"""
+    # Import ultralytics lazily so the service can still boot without optional deps.
+    from ultralytics import YOLO  # type: ignore
+
+    model = YOLO(model_path)
+    if use_gpu is None:
+        use_gpu = setup_gpu()
+    if use_gpu:
+        logger.info(f"Optimizing model for GPU")
+        model.to('cuda')
+        model.half()  # Use FP16
+    return model
+
+
+def load_model(model_path, backend=None):
+    """Load a checkpoint with the configured backend
+
+    The ONNX backends load the ``.onnx`` export next to the checkpoint
+    (see ``scripts/export_onnx.py``) or its INT8 quantization
+    (``scripts/quantize_int8.py``); all are called the same way.
+    """
+    backend = backend or BACKEND
+    if backend in ('onnx', 'onnx-int8'):
+        from .onnx_backend import OnnxYolo, int8_path_for, onnx_path_for
+        return OnnxYolo(int8_path_for(model_path) if backend == 'onnx-int8' else onnx_path_for(model_path))
+    if backend != 'torch':
+        raise ValueError(f"Unknown MUSCLE_BACKEND {backend!r} (expected 'torch', 'onnx' or 'onnx-int8')")
+    return load_yolo_model(model_path)
+
+
 def get_yolo_models():
-    """Load and optimize YOLO models"""
+    """Load and optimize all YOLO models"""
     try:
-        # Import ultralytics lazily so the service can still boot without optional deps.
-        from ultralytics import YOLO  # type: ignore
-
         logger.info("Loading YOLO models...")
+        use_gpu = setup_gpu()
         models = {}
-        
+
         for exercise_type, model_path in Config.MODEL_PATHS.items():
-            models[exercise_type] = YOLO(model_path)
-        
-        # Optimize for GPU if available
-        use_gpu = setup_gpu()
-        if use_gpu:
-            for model in models.values():
-                logger.info(f"Optimizing model for GPU")
-                model.to('cuda')
-                model.conf = 0.3
-                model.iou = 0.45
-                model.half()  # Use FP16
-        
+            models[exercise_type] = load_yolo_model(model_path, use_gpu)
+
         logger.info("Models loaded successfully")
         return models
     except Exception as e:
         logger.error(f"Error loading YOLO models: {e}")
-        raise
\ No newline at end of file
+        raise
@@ -0,0 +1,248 @@
+"""
+ffmpeg subprocess helpers for the video pipeline
+
+Decoding through an ffmpeg pipe lets ffmpeg scale frames down in native
+code before they reach Python, so 1080p and 4K phone uploads never
+materialize as full-size arrays.  ``FFmpegReader`` mimics the small part
+of ``cv2.VideoCapture`` that ``process_video`` uses (``read`` /
+``release``).
+
+``FFmpegWriter`` is the matching encoder: annotated frames are piped
+into a single libx264 process that writes the web-ready MP4 (yuv420p,
+``+faststart``) directly, with the preset and CRF from the environment.
+
+The ffmpeg binary is taken from the PATH, else from ``imageio-ffmpeg``'s
+bundled build.  That build has no ffprobe, so ``probe`` uses ffprobe when
+it is installed and otherwise parses the stream line ``ffmpeg -i`` prints.
+Everything here degrades gracefully: callers fall back to OpenCV when
+ffmpeg is missing or probing fails.
+"""
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from fractions import Fraction
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FFMPEG_BIN = os.getenv('MUSCLE_FFMPEG', 'ffmpeg')
+FFPROBE_BIN = os.getenv('MUSCLE_FFPROBE', 'ffprobe')
+X264_PRESET = os.getenv('MUSCLE_X264_PRESET', 'veryfast')
+X264_CRF = int(os.getenv('MUSCLE_X264_CRF', '23'))
+
+_ffmpeg_path = None
+_warned_no_ffprobe = False
+
+_VIDEO_STREAM_RE = re.compile(r'Stream #\d+:\d+.*?: Video: (?P<line>.*)')
+_SIZE_RE = re.compile(r'[\s,](\d{2,5})x(\d{2,5})[\s,\[]')
+_FPS_RE = re.compile(r'([\d.]+)(k?) (?:fps|tbr)\b')
+_ROTATION_RE = re.compile(r'rotate\s*:\s*(-?[\d.]+)|rotation of (-?[\d.]+) degrees')
+
+
+def ffmpeg_binary():
+    """Path of the ffmpeg executable, or None"""
+    global _ffmpeg_path
+    if _ffmpeg_path is None:
+        _ffmpeg_path = shutil.which(FFMPEG_BIN) or ''
+        if not _ffmpeg_path:
+            try:
+                # Optional dependency: imageio-ffmpeg ships a static build
+                import imageio_ffmpeg  # type: ignore
+                _ffmpeg_path = imageio_ffmpeg.get_ffmpeg_exe()
+            except Exception:
+                _ffmpeg_path = ''
+    return _ffmpeg_path or None
+
+
+def can_decode():
+    """True when ffmpeg is available (``probe`` works with or without ffprobe)"""
+    return ffmpeg_binary() is not None
+
+
+def can_encode():
+    return ffmpeg_binary() is not None
+
+
+def _rotation(stream):
+    """Display rotation in degrees from the stream tags or side data"""
+    rotate = stream.get('tags', {}).get('rotate')
+    if rotate is None:
+        for side_data in stream.get('side_data_list', []):
+            if 'rotation' in side_data:
+                rotate = side_data['rotation']
+                break
+    try:
+        return int(float(rotate or 0)) % 360
+    except ValueError:
+        return 0
+
+
+def probe(video_path):
+    """``(width, height, fps)`` of the first video stream as displayed, or None
+
+    Width and height are swapped for rotated phone videos, since ffmpeg
+    applies the rotation while decoding.
+    """
+    global _warned_no_ffprobe
+    if shutil.which(FFPROBE_BIN) is None:
+        if not _warned_no_ffprobe:
+            _warned_no_ffprobe = True
+            logger.warning(f"{FFPROBE_BIN} not found; reading video info from `ffmpeg -i` output instead")
+        return _probe_with_ffmpeg(video_path)
+    cmd = [
+        FFPROBE_BIN, '-v', 'error', '-select_streams', 'v:0',
+        '-show_entries', 'stream=width,height,avg_frame_rate,r_frame_rate:stream_tags=rotate:stream_side_data=rotation',
+        '-of', 'json', video_path,
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True, timeout=30).stdout
+        stream = json.loads(out)['streams'][0]
+        width, height = int(stream['width']), int(stream['height'])
+        fps = 0.0
+        for key in ('avg_frame_rate', 'r_frame_rate'):
+            rate = stream.get(key, '0/0')
+            if not rate.endswith('/0'):
+                fps = float(Fraction(rate))
+            if fps > 0:
+                break
+    except (OSError, subprocess.SubprocessError, ValueError, KeyError, IndexError, ZeroDivisionError) as e:
+        logger.warning(f"ffprobe failed for {video_path}: {e}")
+        return None
+    if _rotation(stream) in (90, 270):
+        width, height = height, width
+    return width, height, fps
+
+
+def _probe_with_ffmpeg(video_path):
+    """``probe`` without ffprobe: parse the first video stream ffmpeg reports
+
+    ``ffmpeg -i`` with no output prints the stream info to stderr (and exits
+    non-zero); fps comes rounded to two decimals, which is close enough for
+    frame strides and the output frame rate.
+    """
+    try:
+        err = subprocess.run([ffmpeg_binary(), '-hide_banner', '-nostdin', '-i', video_path],
+                             capture_output=True, timeout=30).stderr.decode(errors='replace')
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning(f"ffmpeg probe failed for {video_path}: {e}")
+        return None
+
+    match = _VIDEO_STREAM_RE.search(err)
+    size = _SIZE_RE.search(match.group('line') + ' ') if match else None
+    if size is None:
+        logger.warning(f"ffmpeg probe found no video stream in {video_path}")
+        return None
+    width, height = int(size.group(1)), int(size.group(2))
+
+    fps = 0.0
+    for value, kilo in _FPS_RE.findall(match.group('line')):
+        fps = float(value) * (1000 if kilo else 1)
+        if fps > 0:
+            break
+
+    # Rotation sits in the stream's Metadata / Side data lines, before the next stream
+    block = err[match.end():]
+    next_stream = block.find('Stream #')
+    rotation = _ROTATION_RE.search(block if next_stream < 0 else block[:next_stream])
+    if rotation and int(float(rotation.group(1) or rotation.group(2))) % 180 == 90:
+        width, height = height, width
+    return width, height, fps
+
+
+def fit_within(width, height, max_side):
+    """Scale ``(width, height)`` down so the longer side is at most ``max_side``
+
+    Never scales up; dimensions are kept even for the H.264 encoders.
+    ``max_side`` of 0 or None keeps the size.
+    """
+    if max_side and max(width, height) > max_side:
+        scale = max_side / max(width, height)
+        width, height = width * scale, height * scale
+    return max(2, int(width) // 2 * 2), max(2, int(height) // 2 * 2)
+
+
+class FFmpegReader:
+    """Raw BGR frames of ``size`` from an ffmpeg decode pipe"""
+
+    def __init__(self, video_path, size):
+        self.width, self.height = size
+        self.frame_bytes = self.width * self.height * 3
+        cmd = [
+            ffmpeg_binary(), '-v', 'error', '-nostdin', '-i', video_path,
+            '-an', '-sn',
+            '-vf', f'scale={self.width}:{self.height}:flags=area',
+            '-f', 'rawvideo', '-pix_fmt', 'bgr24', 'pipe:1',
+        ]
+        self.proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                     bufsize=self.frame_bytes)
+
+    def isOpened(self):
+        return self.proc.poll() is None or self.proc.returncode == 0
+
+    def read(self):
+        """``(True, frame)`` like ``cv2.VideoCapture.read``, ``(False, None)`` at the end"""
+        frame = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        view = memoryview(frame).cast('B')
+        filled = 0
+        while filled < self.frame_bytes:
+            n = self.proc.stdout.readinto(view[filled:])
+            if not n:
+                return False, None
+            filled += n
+        return True, frame
+
+    def release(self):
+        if self.proc.stdout:
+            self.proc.stdout.close()
+        if self.proc.poll() is None:
+            self.proc.kill()
+        self.proc.wait()
+
+
+class FFmpegWriter:
+    """H.264 MP4 encoder fed raw BGR frames of ``size`` through stdin"""
+
+    def __init__(self, path, size, fps, preset=X264_PRESET, crf=X264_CRF):
+        width, height = size
+        self.path = path
+        self._stderr = tempfile.TemporaryFile()
+        cmd = [
+            ffmpeg_binary(), '-v', 'error', '-y',
+            '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f'{width}x{height}',
+            '-r', f'{fps or 30:.3f}', '-i', 'pipe:0',
+            '-an', '-c:v', 'libx264', '-preset', preset, '-crf', str(crf),
+            '-pix_fmt', 'yuv420p', '-movflags', '+faststart',
+            path,
+        ]
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=self._stderr)
+
+    def _error(self):
+        self._stderr.seek(0)
+        message = self._stderr.read().decode(errors='replace').strip()
+        return IOError(f"ffmpeg encoding {self.path} failed: {message or self.proc.returncode}")
+
+    def write(self, frame):
+        try:
+            self.proc.stdin.write(memoryview(np.ascontiguousarray(frame)).cast('B'))
+        except BrokenPipeError:
+            self.proc.wait()
+            raise self._error() from None
+
+    def release(self):
+        """Flush and wait for the encoder; raises IOError if it failed"""
+        try:
+            if not self.proc.stdin.closed:
+                self.proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        self.proc.wait()
+        try:
+            if self.proc.returncode != 0:
+                raise self._error()
+        finally:
+            self._stderr.close()
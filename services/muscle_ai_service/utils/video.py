@@ -1,147 +1,575 @@
 """
 Video processing utilities
+
+``process_video`` runs as a three-stage pipeline so decoding, inference
+and encoding overlap instead of taking turns on one thread:
+
+    decoder thread --frame queue--> inference (caller's thread) --output queue--> writer thread
+
+The writer draws the overlay and pipes each frame into a single ffmpeg
+libx264 process that produces the web-ready MP4 directly (see
+``ffmpeg.FFmpegWriter``); without ffmpeg, OpenCV writes an mp4v file.
+
+The queues are bounded, so a slow stage applies backpressure to the ones
+before it instead of buffering the whole video.  Inference consumes
+micro-batches (small on CPU, larger on GPU); the analyzer sees frames in
+order because there is a single inference consumer.  Each stage records
+its busy and waiting time, logged at the end and returned through
+``stats``.
+
+Rep detection doesn't need every frame of a 60 fps upload.  With a frame
+stride N (or a target analysis fps, from which N is derived) only every
+Nth frame goes through YOLO.  The frames in between are held until the
+next sampled frame is inferred; the analyzer then sees them with label
+confidences interpolated between the two samples, so its frame-based
+thresholds behave as on a full run.  The output video carries the last
+sampled frame's keypoints and overlay forward over the held frames.
+The stride is capped at ``MUSCLE_MAX_FRAME_STRIDE`` since held frames sit
+outside the bounded queues.
+
+Frames are decoded through an ffmpeg pipe that scales them in ffmpeg to
+the output size (the source capped at ``MUSCLE_OUTPUT_MAX_SIDE``), so a
+4K upload never exists as full-size arrays in Python; OpenCV decoding is
+the fallback.  Inference gets frames resized to the model's input size
+and keypoints are scaled back to output coordinates for drawing.
+
+Without a ``web_path`` the pipeline runs metrics-only: frames are decoded
+straight at the model's input size and nothing is drawn, written or
+encoded.  A compact per-frame timeline of the form / depth confidences
+and rep completions can be requested in either mode.
 """
 import os
 import logging
+import math
+import queue
+import threading
+import time
+from array import array
 import cv2
 import torch
 import numpy as np
 from ..core.models.analyzer import MovementAnalyzer
+from ..core.models.yolo import PREDICT_ARGS
+from . import ffmpeg
 
 logger = logging.getLogger(__name__)
 
+QUEUE_SIZE = int(os.getenv('MUSCLE_PIPELINE_QUEUE', '16'))
+CPU_BATCH_SIZE = int(os.getenv('MUSCLE_CPU_BATCH', '2'))
+GPU_BATCH_SIZE = int(os.getenv('MUSCLE_GPU_BATCH', '8'))
+ANALYSIS_FPS = float(os.getenv('MUSCLE_ANALYSIS_FPS', '0'))  # 0 = every frame
+MAX_FRAME_STRIDE = int(os.getenv('MUSCLE_MAX_FRAME_STRIDE', '8'))  # bounds the frames held between samples
+DECODER = os.getenv('MUSCLE_DECODER', 'auto')  # auto | ffmpeg | opencv
+OUTPUT_MAX_SIDE = int(os.getenv('MUSCLE_OUTPUT_MAX_SIDE', '1280'))  # 0 = source size
+INFERENCE_SIZE = int(os.getenv('MUSCLE_INFERENCE_SIZE', '640'))
+
+_END = object()  # end-of-stream marker on the queues
+
+
 class NullContext:
     """A context manager that does nothing"""
     def __enter__(self): return None
     def __exit__(self, *excinfo): pass
 
-def process_video(video_path, output_path, web_path, exercise_type, yolo_model):
+
+class StageTimer:
+    """Busy / waiting seconds and item count for one pipeline stage"""
+    __slots__ = ('busy', 'waiting', 'items')
+
+    def __init__(self):
+        self.busy = 0.0
+        self.waiting = 0.0
+        self.items = 0
+
+    def as_dict(self):
+        return {
+            'busy_s': round(self.busy, 3),
+            'waiting_s': round(self.waiting, 3),
+            'items': self.items,
+            'ms_per_item': round(self.busy * 1000 / self.items, 2) if self.items else None,
+        }
+
+
+class _Stage(threading.Thread):
+    """Daemon thread that records the first exception it hits"""
+
+    def __init__(self, name, target, stop):
+        super().__init__(name=name, daemon=True)
+        self._target_fn = target
+        self.stop = stop
+        self.error = None
+
+    def run(self):
+        try:
+            self._target_fn()
+        except BaseException as e:  # surfaced by the caller
+            self.error = e
+            self.stop.set()
+
+
+def _put(q, item, stop, timer):
+    """Blocking put that gives up once the pipeline is stopping"""
+    started = time.perf_counter()
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            break
+        except queue.Full:
+            continue
+    timer.waiting += time.perf_counter() - started
+
+
+def _get(q, stop, timer):
+    started = time.perf_counter()
+    while True:
+        try:
+            item = q.get(timeout=0.1)
+            break
+        except queue.Empty:
+            if stop.is_set():
+                item = _END
+                break
+    timer.waiting += time.perf_counter() - started
+    return item
+
+
+class ResizingCapture:
+    """OpenCV fallback decoder that resizes frames to the output size"""
+
+    def __init__(self, cap, size):
+        self.cap = cap
+        self.size = size
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if ret and (frame.shape[1], frame.shape[0]) != self.size:
+            frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        return ret, frame
+
+    def release(self):
+        self.cap.release()
+
+
+def open_video(video_path, max_side=OUTPUT_MAX_SIDE):
+    """``(reader, (width, height), fps)`` with frames decoded at most ``max_side`` wide/high"""
+    if DECODER != 'opencv' and ffmpeg.can_decode():
+        probed = ffmpeg.probe(video_path)
+        if probed is not None:
+            width, height, fps = probed
+            size = ffmpeg.fit_within(width, height, max_side)
+            reader = ffmpeg.FFmpegReader(video_path, size)
+            if reader.isOpened():
+                logger.info(f"Decoding {width}x{height} with ffmpeg at {size[0]}x{size[1]}")
+                return reader, size, fps
+            reader.release()
+    if DECODER == 'ffmpeg':
+        logger.warning("ffmpeg decoding unavailable, falling back to OpenCV")
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError("Error opening video file")
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    size = ffmpeg.fit_within(width, height, max_side)
+    return ResizingCapture(cap, size), size, cap.get(cv2.CAP_PROP_FPS)
+
+
+def open_writer(web_path, size, fps):
+    """H.264 writer for ``web_path`` (ffmpeg), or an OpenCV mp4v writer without ffmpeg"""
+    if ffmpeg.can_encode():
+        return ffmpeg.FFmpegWriter(web_path, size, fps)
+    logger.warning("ffmpeg not found, writing mp4v with OpenCV (may not play in every browser)")
+    return cv2.VideoWriter(web_path, cv2.VideoWriter_fourcc(*'mp4v'), fps or 30, size)
+
+
+def model_input_size(yolo_model):
+    """Longest side the model is run at (``imgsz``), default ``MUSCLE_INFERENCE_SIZE``"""
+    overrides = getattr(yolo_model, 'overrides', None) or {}
+    imgsz = overrides.get('imgsz')
+    if isinstance(imgsz, (list, tuple)):
+        imgsz = max(imgsz)
+    return int(imgsz or INFERENCE_SIZE)
+
+
+def compact_timeline(fps, form, down, rep_frames, decimals=2):
+    """Per-frame form / depth confidences (None = not detected) and the
+    frames on which each rep completed, rounded to keep the JSON small"""
+    def series(values):
+        rounded = np.round(np.frombuffer(values, dtype=np.float32).astype(np.float64), decimals)
+        return [None if math.isnan(v) else v for v in rounded.tolist()]
+    return {
+        'fps': round(fps, 3),
+        'frames': len(form),
+        'form': series(form),
+        'down': series(down),
+        'rep_frames': rep_frames,
+    }
+
+
+def _positive(value):
+    return value is not None and math.isfinite(value) and value > 0
+
+
+def frame_stride_for(fps, analysis_fps=None, frame_stride=None):
+    """Infer every Nth frame: an explicit stride wins, else ``fps / analysis_fps``
+
+    ``analysis_fps`` is clamped to 1..fps and the stride to
+    ``MAX_FRAME_STRIDE``; invalid values mean every frame.
+    """
+    if frame_stride:
+        return min(MAX_FRAME_STRIDE, max(1, int(frame_stride)))
+    if analysis_fps is None:
+        analysis_fps = ANALYSIS_FPS
+    if not _positive(analysis_fps) or not _positive(fps):
+        return 1
+    analysis_fps = min(max(analysis_fps, 1.0), fps)
+    return min(MAX_FRAME_STRIDE, max(1, int(round(fps / analysis_fps))))
+
+
+def interpolate_labels(before, after, weight):
+    """Label confidences ``weight`` (0..1) of the way from ``before`` to ``after``
+
+    A label detected on both samples is interpolated linearly; one seen on
+    only one of them is kept if that sample is the nearer one.
+    """
+    nearer = before if weight < 0.5 else after
+    labels = {}
+    for label in before.keys() | after.keys():
+        if label in before and label in after:
+            labels[label] = before[label] + (after[label] - before[label]) * weight
+        elif label in nearer:
+            labels[label] = nearer[label]
+    return labels
+
+
+def _to_numpy(values):
+    """Tensor (any device) or array-like -> NumPy array"""
+    return values.cpu().numpy() if hasattr(values, 'cpu') else np.asarray(values)
+
+
+def _concat(parts):
+    """Concatenate per-result tensors / arrays with a single device transfer"""
+    if parts and hasattr(parts[0], 'cpu'):
+        return _to_numpy(torch.cat(parts))
+    return np.concatenate([np.asarray(part) for part in parts]) if parts else np.empty(0)
+
+
+def extract_batch(results, with_keypoints=True, keypoint_scale=None):
+    """``[(labels, keypoints)]`` for a batch of YOLO results
+
+    The class ids and confidences of all boxes in the batch are pulled to
+    NumPy in one transfer each; ``labels`` maps each detected class name
+    to its highest-confidence box.  ``keypoints`` are the first detected
+    person's as an (N, 2) array (times ``keypoint_scale``), or None.
+    """
+    counts = [len(r.boxes) if r.boxes is not None else 0 for r in results]
+    with_boxes = [r for r, n in zip(results, counts) if n]
+    labels = [{} for _ in results]
+    if with_boxes:
+        cls = _concat([r.boxes.cls for r in with_boxes]).astype(np.int64)
+        conf = _concat([r.boxes.conf for r in with_boxes]).astype(np.float64)
+        n_classes = int(cls.max()) + 1
+        slot = np.repeat(np.arange(len(results)) * n_classes, counts) + cls
+        # Assign in ascending confidence order: the highest box of each
+        # (frame, class) slot is written last and wins.
+        order = np.argsort(conf, kind='stable')
+        best = np.full(len(results) * n_classes, -1.0)
+        best[slot[order]] = conf[order]
+        filled = np.flatnonzero(best >= 0)
+        for index, score in zip(filled.tolist(), best[filled].tolist()):
+            i, class_id = divmod(index, n_classes)
+            labels[i][results[i].names[class_id]] = score
+
+    keypoints = [None] * len(results)
+    if with_keypoints:
+        people = [i for i, r in enumerate(results)
+                  if getattr(r, 'keypoints', None) is not None and len(r.keypoints.xy)]
+        if people:
+            first = [results[i].keypoints.xy[0] for i in people]
+            stacked = _to_numpy(torch.stack(first)) if hasattr(first[0], 'cpu') else np.stack(first)
+            if keypoint_scale is not None:
+                stacked = stacked * keypoint_scale
+            for i, points in zip(people, stacked):
+                keypoints[i] = points
+    return list(zip(labels, keypoints))
+
+
+def extract_labels(result):
+    """Label -> highest box confidence for one YOLO result"""
+    return extract_batch([result], with_keypoints=False)[0][0]
+
+
+class OverlayRenderer:
+    """Draws keypoints and the score / rep counter onto frames in place
+
+    Keypoint dots are stamped with precomputed disc offsets as flat pixel
+    indices, one assignment per channel, and the text is rendered once into
+    a mask per distinct (score, reps) as flat indices, reused until the
+    values change.
+    """
+    COLOR = (0, 255, 0)
+    RADIUS = 5
+
+    def __init__(self):
+        dy, dx = np.mgrid[-self.RADIUS:self.RADIUS + 1, -self.RADIUS:self.RADIUS + 1]
+        inside = dx * dx + dy * dy <= self.RADIUS * self.RADIUS
+        self._dy, self._dx = dy[inside], dx[inside]  # (M,) disc offsets
+        self._offsets_width = None
+        self._offsets = None
+        self._text_key = None
+        self._text_pixels = None
+
+    def draw(self, frame, keypoints, overlay):
+        height, width = frame.shape[:2]
+        if keypoints is not None and len(keypoints):
+            self._paint(frame, self._dots(keypoints, height, width))
+        if overlay:
+            self._paint(frame, self._text(overlay, height, width))
+
+    def _paint(self, frame, pixels):
+        if not frame.flags.c_contiguous:
+            rows, cols = np.divmod(pixels, frame.shape[1])
+            frame[rows, cols] = self.COLOR
+            return
+        flat = frame.reshape(-1)
+        for channel, value in enumerate(self.COLOR):
+            flat[pixels * 3 + channel] = value
+
+    def _dots(self, keypoints, height, width):
+        """Flat pixel indices of a filled disc around every keypoint"""
+        if width != self._offsets_width:
+            self._offsets_width, self._offsets = width, self._dy * width + self._dx
+        r = self.RADIUS
+        cols = keypoints[:, 0].astype(np.intp)
+        rows = keypoints[:, 1].astype(np.intp)
+        # Whole discs inside the frame need no per-pixel bounds check
+        inner = (cols >= r) & (cols < width - r) & (rows >= r) & (rows < height - r)
+        pixels = ((rows[inner] * width + cols[inner])[:, None] + self._offsets).ravel()
+        if inner.all():
+            return pixels
+        # Keypoints near the border (undetected ones sit at (0, 0)): clip
+        edge_rows = (rows[~inner, None] + self._dy).ravel()
+        edge_cols = (cols[~inner, None] + self._dx).ravel()
+        keep = (edge_rows >= 0) & (edge_rows < height) & (edge_cols >= 0) & (edge_cols < width)
+        return np.concatenate([pixels, edge_rows[keep] * width + edge_cols[keep]])
+
+    def _text(self, overlay, height, width):
+        key = (overlay, height, width)
+        if key != self._text_key:
+            score, reps = overlay
+            canvas = np.zeros((min(height, 120), width), dtype=np.uint8)
+            cv2.putText(canvas, f"Score: {score}/10", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, 255, 2)
+            cv2.putText(canvas, f"Reps: {reps}", (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, 255, 2)
+            self._text_key, self._text_pixels = key, np.flatnonzero(canvas)
+        return self._text_pixels
+
+
+def process_video(video_path, web_path, exercise_type, yolo_model, stats=None,
+                  analysis_fps=None, frame_stride=None, timeline=None):
     """
     Process a video using the YOLO model and movement analyzer
-    
+
     Args:
         video_path (str): Path to the input video
-        output_path (str): Path for the processed video
-        web_path (str): Path for the web-friendly video
+        web_path (str): Path for the annotated, web-friendly (H.264) video;
+            None analyses metrics only, without drawing or writing a video
         exercise_type (str): Type of exercise for analysis
         yolo_model: The YOLO model to use for detection
-        
+        stats (dict, optional): Filled with the per-stage timing breakdown
+        analysis_fps (float, optional): Run inference at about this many frames
+            per second (defaults to MUSCLE_ANALYSIS_FPS; 0 = every frame),
+            at most every ``MAX_FRAME_STRIDE``th frame
+        frame_stride (int, optional): Run inference on every Nth frame;
+            overrides ``analysis_fps``
+        timeline (dict, optional): Filled with a compact per-frame timeline
+            (see ``compact_timeline``)
+
     Returns:
         dict: Movement metrics
     """
     try:
-        # Optional dependency: moviepy (only needed for conversion step)
-        from moviepy.video.io.VideoFileClip import VideoFileClip  # type: ignore
-
         use_gpu = torch.cuda.is_available()
         logger.info(f"Processing video with GPU acceleration: {use_gpu}")
-        
+
         analyzer = MovementAnalyzer(exercise_type)
-        
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise IOError("Error opening video file")
-
-        # Get video properties
-        frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-
-        # Use NVIDIA encoder if available
-        if use_gpu:
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        render = web_path is not None
+
+        # Metrics-only runs decode straight at the model input size.
+        input_side = model_input_size(yolo_model)
+        cap, (frame_width, frame_height), fps = open_video(video_path, OUTPUT_MAX_SIDE if render else input_side)
+
+        # Frames larger than the model input are resized before inference
+        # and their keypoints scaled back to the output frame.
+        input_size = ffmpeg.fit_within(frame_width, frame_height, input_side)
+        if input_size == (frame_width, frame_height):
+            input_size = None
+            keypoint_scale = None
         else:
-            fourcc = cv2.VideoWriter_fourcc(*'XVID')
-
-        out = cv2.VideoWriter(
-            output_path,
-            fourcc,
-            fps,
-            (frame_width, frame_height)
-        )
-
-        # Batch processing parameters
-        batch_size = 4 if use_gpu else 1
-        
-        # Use CUDA stream for parallel processing
-        with torch.cuda.amp.autocast() if use_gpu else NullContext():
-            for _ in range(0, total_frames, batch_size):
-                frames_buffer = []
-                for _ in range(batch_size):
-                    ret, frame = cap.read()
-                    if ret:
-                        frames_buffer.append(frame)
-                    else:
-                        break
-                
-                if not frames_buffer:
+            keypoint_scale = np.array([frame_width / input_size[0], frame_height / input_size[1]], dtype=np.float32)
+
+        out = open_writer(web_path, (frame_width, frame_height), fps) if render else None
+
+        stride = frame_stride_for(fps, analysis_fps, frame_stride)
+        if stride > 1:
+            logger.info(f"Running inference on every {stride} frames ({fps / stride:.1f} fps)")
+
+        batch_size = GPU_BATCH_SIZE if use_gpu else CPU_BATCH_SIZE
+        frames_q = queue.Queue(maxsize=QUEUE_SIZE)
+        output_q = queue.Queue(maxsize=QUEUE_SIZE)
+        stop = threading.Event()
+        timers = {'decode': StageTimer(), 'inference': StageTimer()}
+        if render:
+            timers['write'] = StageTimer()
+
+        def decode():
+            timer = timers['decode']
+            while not stop.is_set():
+                started = time.perf_counter()
+                ret, frame = cap.read()
+                timer.busy += time.perf_counter() - started
+                if not ret:
                     break
+                _put(frames_q, (frame, timer.items % stride == 0), stop, timer)
+                timer.items += 1
+            _put(frames_q, _END, stop, timer)
+
+        def write():
+            timer = timers['write']
+            renderer = OverlayRenderer()
+            while True:
+                item = _get(output_q, stop, timer)
+                if item is _END:
+                    break
+                frame, keypoints, overlay = item
+                started = time.perf_counter()
+                renderer.draw(frame, keypoints, overlay)
+                out.write(frame)
+                timer.busy += time.perf_counter() - started
+                timer.items += 1
+
+        stages = [_Stage('video-decode', decode, stop)]
+        if render:
+            stages.append(_Stage('video-write', write, stop))
+        for stage in stages:
+            stage.start()
+
+        timer = timers['inference']
+        inferred = 0
+        last_sample = None  # (labels, keypoints, overlay) of the last inferred frame
+        held = []           # frames since then, waiting for the next inferred one
+        form_series, down_series, rep_frames = array('f'), array('f'), []
+
+        def analyse(labels):
+            form_value, down_value = analyzer.process_frame(labels)
+            if timeline is not None:
+                form_series.append(math.nan if form_value is None else form_value)
+                down_series.append(math.nan if down_value is None else down_value)
+                if analyzer.rep_count > len(rep_frames):
+                    rep_frames.append(len(form_series) - 1)
+            if not render:
+                return None
+            metrics = analyzer.get_metrics()
+            return (metrics['movement_assessment']['score'], metrics['repetitions']) if metrics else None
+
+        def release_held(next_labels):
+            """Analyse the held frames (interpolating towards ``next_labels``,
+            or repeating the last sample at the end of the video) and return
+            them for the writer with the last overlay carried forward."""
+            labels, keypoints, overlay = last_sample
+            span = len(held) + 1
+            released = []
+            for i, frame in enumerate(held, 1):
+                analyse(labels if next_labels is None else interpolate_labels(labels, next_labels, i / span))
+                released.append((frame, keypoints, overlay))
+            held.clear()
+            return released
+
+        started_at = time.perf_counter()
+        try:
+            with torch.cuda.amp.autocast() if use_gpu else NullContext():
+                finished = False
+                while not finished and not stop.is_set():
+                    # Block for the first frame, then take whatever is ready
+                    # (up to a batch of frames to infer) so a slow decoder
+                    # never stalls us.
+                    chunk = []
+                    to_infer = 0
+                    item = _get(frames_q, stop, timer)
+                    while item is not _END:
+                        chunk.append(item)
+                        to_infer += item[1]
+                        if to_infer >= batch_size:
+                            break
+                        try:
+                            item = frames_q.get_nowait()
+                        except queue.Empty:
+                            break
+                    finished = item is _END
+                    if not chunk:
+                        break
+
+                    started = time.perf_counter()
+                    sampled = [frame for frame, is_sample in chunk if is_sample]
+                    if input_size is not None:
+                        sampled = [cv2.resize(frame, input_size, interpolation=cv2.INTER_AREA) for frame in sampled]
+                    results = list(yolo_model(sampled, **PREDICT_ARGS)) if sampled else []
+                    extracted = iter(extract_batch(results, render, keypoint_scale))
+                    batch_output = []
+                    for frame, is_sample in chunk:
+                        if not is_sample:
+                            held.append(frame if render else None)
+                            continue
+                        labels, keypoints = next(extracted)
+                        if held:
+                            batch_output.extend(release_held(labels))
+                        overlay = analyse(labels)
+                        last_sample = (labels, keypoints, overlay)
+                        batch_output.append((frame, keypoints, overlay))
+                    if finished and held:
+                        batch_output.extend(release_held(None))
+                    timer.busy += time.perf_counter() - started
+                    timer.items += len(chunk)
+
+                    if render:
+                        for entry in batch_output:
+                            _put(output_q, entry, stop, timer)
+
+                    # Clear GPU cache periodically
+                    if use_gpu and sampled and inferred // (batch_size * 10) != (inferred + len(sampled)) // (batch_size * 10):
+                        torch.cuda.empty_cache()
+                    inferred += len(sampled)
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            if render:
+                _put(output_q, _END, stop, timer)
+            for stage in stages:
+                stage.join()
+            cap.release()
+            try:
+                if out is not None:
+                    out.release()  # waits for the encoder to finish the file
+            except IOError:
+                if not stop.is_set():
+                    raise
+
+        for stage in stages:
+            if stage.error is not None:
+                raise stage.error
+
+        breakdown = {name: t.as_dict() for name, t in timers.items()}
+        breakdown['wall_s'] = round(time.perf_counter() - started_at, 3)
+        breakdown['frame_stride'] = stride
+        breakdown['frames_inferred'] = inferred
+        logger.info(f"Pipeline timings: {breakdown}")
+        if stats is not None:
+            stats.update(breakdown)
+        if timeline is not None:
+            timeline.update(compact_timeline(fps, form_series, down_series, rep_frames))
 
-                # Process batch
-                if use_gpu:
-                    frames_tensor = torch.from_numpy(np.stack(frames_buffer)).cuda().half()
-                    results = yolo_model(frames_tensor, stream=True)
-                else:
-                    results = yolo_model(frames_buffer, stream=True)
-
-                # Process results
-                for frame, result in zip(frames_buffer, results):
-                    labels = {}
-                    if result.boxes is not None:
-                        for box in result.boxes:
-                            class_id = int(box.cls)
-                            conf = float(box.conf)
-                            label = result.names[class_id]
-                            labels[label] = conf
-
-                    form_value, down_value = analyzer.process_frame(labels)
-
-                    if hasattr(result, 'keypoints') and result.keypoints is not None:
-                        keypoints = result.keypoints.xy[0]
-                        for point in keypoints:
-                            x, y = int(point[0]), int(point[1])
-                            cv2.circle(frame, (x, y), 5, (0, 255, 0), -1)
-
-                    metrics = analyzer.get_metrics()
-                    if metrics:
-                        cv2.putText(frame, f"Score: {metrics['movement_assessment']['score']}/10",
-                                  (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-                        cv2.putText(frame, f"Reps: {metrics['repetitions']}",
-                                  (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-
-                    out.write(frame)
-
-                # Clear GPU cache periodically
-                if use_gpu and _ % (batch_size * 10) == 0:
-                    torch.cuda.empty_cache()
-
-        cap.release()
-        out.release()
-
-        # Convert to web format using GPU acceleration
-        logger.info("Converting video to web format")
-        clip = VideoFileClip(output_path)
-        
-        if use_gpu:
-            clip.write_videofile(web_path, 
-                               codec='libx264',
-                               preset='fast',
-                               threads=4,
-                               ffmpeg_params=[
-                                   '-hwaccel', 'cuda',
-                                   '-hwaccel_output_format', 'cuda',
-                                   '-c:v', 'h264_nvenc',
-                                   '-preset', 'p4',
-                                   '-tune', 'zerolatency'
-                               ])
-        else:
-            clip.write_videofile(web_path, codec='libx264')
-            
-        clip.close()
-        
         return analyzer.get_metrics()
 
     except Exception as e:
         logger.error(f"Error processing video: {e}")
-        raise
\ No newline at end of file
+        raise
@@ -3,15 +3,18 @@ Nutri AI Service - API Routes
 Handles nutrition analysis and health scoring endpoints
 """
 
-from flask import Blueprint, request, render_template, jsonify, redirect, url_for, session
-from werkzeug.utils import secure_filename
+from flask import (
+    Blueprint, Response, request, render_template, jsonify, redirect, url_for, session, stream_with_context,
+)
 import os
 import json
+import time
 from datetime import datetime
 from pathlib import Path
 
 # Import service core modules (internal microservice implementation)
-from ..core.ocr.nutrition_extractor import extract_nutrition_info, parse_nutrition_table
+from ..core.ocr.nutrition_extractor import parse_nutrition_label, parse_nutrition_table
+from ..core.ocr.ocr_pool import ocr_pool, OCRPoolBusy
 from ..core.profile.process_profile import calculate_health_metrics
 from ..core.scoring.consumability_agent import generate_consumability_score
 
@@ -26,6 +29,7 @@ nutri_ai_bp = Blueprint(
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 UPLOAD_FOLDER = Path('data/uploads')
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
+BATCH_MAX_IMAGES = int(os.getenv('OCR_BATCH_MAX_IMAGES', '1000'))
 
 # Ensure directories exist
 UPLOAD_FOLDER.mkdir(parents=True, exist_ok=True)
@@ -102,22 +106,15 @@ def upload_nutrition():
         
         if file and allowed_file(file.filename):
             try:
-                filename = secure_filename(file.filename)
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                filename = f"{timestamp}_{filename}"
-                filepath = UPLOAD_FOLDER / filename
-                file.save(str(filepath))
-                
-                extracted_text = extract_nutrition_info(str(filepath))
+                extracted_text = ocr_pool.readtext(file.read())
                 nutrition_info = parse_nutrition_table(extracted_text)
                 
                 session['nutrition_info'] = nutrition_info
                 
-                if filepath.exists():
-                    filepath.unlink()
-                
                 return redirect(url_for('health.results'))
                 
+            except OCRPoolBusy as e:
+                return jsonify({'error': str(e)}), 503, {'Retry-After': '5'}
             except Exception as e:
                 return jsonify({'error': f'OCR processing error: {str(e)}'}), 500
         else:
@@ -211,6 +208,77 @@ def api_analyze():
         return jsonify({'error': str(e)}), 500
 
 
+@nutri_ai_bp.route('/api/ocr', methods=['POST'])
+def api_ocr():
+    """OCR one label image (multipart field ``image``) for the gateway's
+    local extraction tier; returns the parsed values and their confidence.
+
+    The gateway's ``prepare_label_image`` has already cropped the image to
+    its nutrition panel, so it is OCR'd as sent."""
+    file = request.files.get('image')
+    if file is None or not file.filename:
+        return jsonify({'error': 'No image provided (multipart field "image")'}), 400
+    started = time.perf_counter()
+    try:
+        text = ocr_pool.readtext(file.read(), crop_panel=False)
+    except OCRPoolBusy as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '5'}
+    except Exception as e:
+        return jsonify({'error': f'OCR processing error: {str(e)}'}), 500
+    nutrition_info, confidence = parse_nutrition_label(text)
+    return jsonify({
+        'nutrition_info': nutrition_info,
+        'confidence': confidence,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+    })
+
+
+@nutri_ai_bp.route('/api/batch-upload', methods=['POST'])
+def api_batch_upload():
+    """OCR many label images in one request (catalog onboarding).
+
+    Multipart field ``images`` may repeat.  Images are decoded in memory by
+    the OCR workers (no temp files) and results are streamed back as
+    newline-delimited JSON, one line per image in completion order, then a
+    summary line.
+    """
+    files = [f for f in request.files.getlist('images') if f.filename]
+    if not files:
+        return jsonify({'error': 'No images provided (multipart field "images")'}), 400
+    if len(files) > BATCH_MAX_IMAGES:
+        return jsonify({'error': f'At most {BATCH_MAX_IMAGES} images per batch'}), 413
+
+    def generate():
+        started = time.perf_counter()
+        failed = 0
+        for index, file in enumerate(files):
+            if not allowed_file(file.filename):
+                failed += 1
+                yield json.dumps({'index': index, 'filename': file.filename,
+                                  'error': 'Invalid file type. Please upload PNG, JPG, or JPEG'}) + '\n'
+
+        # Files are read one at a time as workers free up.
+        jobs = ((index, file.read()) for index, file in enumerate(files) if allowed_file(file.filename))
+        for index, text, error in ocr_pool.imap_unordered(jobs):
+            line = {'index': index, 'filename': files[index].filename,
+                    'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)}
+            if error is not None:
+                failed += 1
+                line['error'] = f'OCR processing error: {error}'
+            else:
+                line['nutrition_info'], line['confidence'] = parse_nutrition_label(text)
+            yield json.dumps(line) + '\n'
+
+        yield json.dumps({
+            'done': True,
+            'count': len(files),
+            'failed': failed,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+        }) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
 @nutri_ai_bp.route('/api/health', methods=['GET'])
 def api_health():
     """Health check endpoint"""
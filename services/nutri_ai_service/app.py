@@ -11,6 +11,7 @@ from flask import Flask
 from flask_cors import CORS
 
 from .api.routes import nutri_ai_bp
+from .core.ocr.ocr_pool import ocr_pool
 
 
 def create_app() -> Flask:
@@ -31,6 +32,10 @@ def create_app() -> Flask:
     # Blueprint contains url_prefix='/health'
     app.register_blueprint(nutri_ai_bp)
 
+    # OCR workers load their EasyOCR models lazily; opt in to a warm start
+    if os.environ.get('OCR_POOL_PRELOAD') == '1':
+        ocr_pool.start()
+
     return app
 
 
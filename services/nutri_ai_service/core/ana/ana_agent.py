@@ -9,10 +9,15 @@ healthy, personalised diet plan.
 
 import json
 import os
+import re
 import requests
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
+from .conversation_store import conversation_store
+from .plan_cache import canonicalize_ingredients, plan_cache
+from ..prompts.compiler import prompt_compiler
+
 DATA_DIR = Path(__file__).resolve().parents[4] / "data" / "nutri-ai"
 
 
@@ -28,14 +33,6 @@ def _load_book_chunks() -> List[Dict]:
     return _load_json("book_chunks.json")
 
 
-def _load_diseases() -> Dict:
-    return _load_json("diseases.json")
-
-
-def _load_nutrient_limits() -> Dict:
-    return _load_json("nutrient_limits.json")
-
-
 def _retrieve_chunks_for_ingredients(
     ingredients: List[str],
     user_profile: Optional[Dict] = None,
@@ -81,76 +78,25 @@ def _retrieve_chunks_for_ingredients(
     return results
 
 
-def _build_system_prompt() -> str:
-    return (
-        "You are Ana, Wellnix's friendly nutrition assistant. "
-        "You are an expert dietitian trained on the Harvard Medical School "
-        "Guide to Healthy Eating. Your job is to take the ingredients a user "
-        "has available and suggest a practical, healthy diet plan they can "
-        "prepare at home.\n\n"
-        "Guidelines:\n"
-        "- Always be encouraging and positive.\n"
-        "- Suggest 2-3 meal ideas (breakfast / lunch / dinner as applicable).\n"
-        "- For each meal give a short recipe outline (3-5 steps).\n"
-        "- Mention approximate calorie and macro estimates per meal.\n"
-        "- If the user has medical conditions or dietary restrictions, respect them.\n"
-        "- If the ingredients are limited, suggest what single item they could "
-        "add from the store to round out nutrition.\n"
-        "- Keep responses concise but informative. Use markdown formatting.\n"
-        "- End with a short motivational health tip.\n"
-    )
-
-
 def _build_user_prompt(
     ingredients: List[str],
-    user_profile: Optional[Dict],
     knowledge_context: str,
-    diseases_context: str,
-    nutrient_limits_context: str,
-    conversation_history: Optional[List[Dict]] = None,
     latest_message: str = "",
 ) -> str:
-    profile_block = ""
-    if user_profile:
-        profile_block = (
-            "\n**User Profile:**\n"
-            f"- Age: {user_profile.get('age', 'N/A')}\n"
-            f"- Gender: {user_profile.get('gender', 'N/A')}\n"
-            f"- Activity Level: {user_profile.get('activity_level', 'N/A')}\n"
-            f"- Diet Type: {user_profile.get('diet_type', 'N/A')}\n"
-            f"- Goal: {user_profile.get('goal', 'N/A')}\n"
-            f"- Allergies: {', '.join(user_profile.get('allergies', [])) or 'None'}\n"
-            f"- Medical Conditions: {', '.join(_flat_diseases(user_profile)) or 'None'}\n"
-        )
-
+    """Per-request segment; the profile, disease constraints and nutrient
+    limits are earlier, cacheable segments (see ``prompt_compiler``)."""
     ingredients_str = ", ".join(ingredients) if ingredients else latest_message
 
     prompt = (
-        f"The user currently has these ingredients: **{ingredients_str}**\n"
-        f"{profile_block}\n"
+        f"The user currently has these ingredients: **{ingredients_str}**\n\n"
         f"**Relevant Nutrition Knowledge (from Harvard Medical School):**\n"
         f"{knowledge_context}\n\n"
-        f"**Disease-Specific Dietary Guidelines:**\n"
-        f"{diseases_context}\n\n"
-        f"**Daily Nutrient Limits:**\n"
-        f"{nutrient_limits_context}\n\n"
         "Based on the above, suggest a healthy diet plan using the available "
         "ingredients. Be specific with portion sizes and preparation methods."
     )
     return prompt
 
 
-def _flat_diseases(profile: Dict) -> List[str]:
-    diseases = profile.get("medical_history", {}).get("diseases", [])
-    names = []
-    for d in diseases:
-        if isinstance(d, dict):
-            names.append(d.get("name", ""))
-        else:
-            names.append(str(d))
-    return [n for n in names if n]
-
-
 GROQ_MODELS = [
     "openai/gpt-oss-120b",
     "llama-3.3-70b-versatile",
@@ -158,6 +104,9 @@ GROQ_MODELS = [
 ]
 
 
+GROQ_FAILURE_REPLY = "I'm sorry, I couldn't generate a response right now."
+
+
 def _call_groq(messages: List[Dict], api_key: str) -> str:
     url = "https://api.groq.com/openai/v1/chat/completions"
     headers = {
@@ -183,7 +132,7 @@ def _call_groq(messages: List[Dict], api_key: str) -> str:
         except Exception as exc:
             last_error = f"{model}: {exc}"
 
-    return f"I'm sorry, I couldn't generate a response right now. Last error: {last_error}"
+    return f"{GROQ_FAILURE_REPLY} Last error: {last_error}"
 
 
 def _extract_ingredients(text: str) -> List[str]:
@@ -206,63 +155,136 @@ def _extract_ingredients(text: str) -> List[str]:
     return [p for p in parts if p and len(p) < 60]
 
 
+_PANTRY_PREFIXES = (
+    "i have", "i've got", "i got", "my ingredients", "ingredients:",
+    "here are my ingredients",
+)
+_QUESTION_WORDS = {
+    "what", "how", "why", "when", "which", "who", "can", "could", "would",
+    "should", "is", "are", "do", "does", "will",
+}
+# Words that show a list item is a request or a meal, not an ingredient.
+_NON_INGREDIENT_WORDS = _QUESTION_WORDS | {
+    "about", "instead", "more", "less", "make", "give", "want", "need", "it",
+    "me", "please", "plan", "recipe", "recipes", "meal", "meals", "breakfast",
+    "lunch", "dinner", "snack", "snacks", "today", "tomorrow", "week",
+}
+
+
+def _looks_like_ingredient_list(text: str) -> bool:
+    """True when a message reads as a (new) pantry rather than a follow-up
+    question about the current plan.
+
+    A pantry prefix ("i have ...") always counts.  Otherwise the message
+    must not be a question and must split on commas / "and" into at least
+    two items, most of them short and free of request or meal words, so
+    "what about lunch and dinner?" stays a follow-up.
+    """
+    cleaned = text.lower().strip()
+    if cleaned.startswith(_PANTRY_PREFIXES):
+        return True
+    if "?" in cleaned or cleaned.split(" ", 1)[0] in _QUESTION_WORDS:
+        return False
+    parts = [p.strip(" .!") for p in re.split(r",|\band\b", cleaned)]
+    parts = [p for p in parts if p]
+    if len(parts) < 2:
+        return False
+    food_like = sum(
+        1 for p in parts
+        if len(p.split()) <= 3 and not any(w in _NON_INGREDIENT_WORDS for w in p.split())
+    )
+    return food_like * 2 > len(parts)
+
+
 def chat(
     message: str,
     history: Optional[List[Dict]] = None,
     user_profile: Optional[Dict] = None,
     api_key: Optional[str] = None,
-) -> str:
+    conversation_id: Optional[str] = None,
+    owner_id: Optional[int] = None,
+) -> Dict[str, Any]:
     """
     Main entry point.  Accepts a user message (typically a list of
-    ingredients), optional conversation history, and returns Ana's reply.
+    ingredients) and an optional ``conversation_id``; returns a dict with
+    Ana's ``reply`` and the ``conversation_id`` to send on the next turn.
+
+    Conversation state lives server-side (see ``conversation_store``).
+    ``history`` is only used to seed a brand-new conversation for clients
+    that still post the full transcript.  Plans for a pantry that was
+    already answered for the same profile come from ``plan_cache`` and are
+    flagged with ``cached: True``.
     """
+    conversation = conversation_store.get_or_create(conversation_id, owner_id)
+    if history and not conversation.turns and not conversation.summary_lines:
+        for entry in history:
+            conversation.add_turn(entry.get("role", "user"), entry.get("content", ""))
+
     api_key = api_key or os.getenv("GROQ_API_KEY")
     if not api_key:
-        return (
-            "Ana is not configured yet — the GROQ_API_KEY environment "
-            "variable is missing. Please ask the admin to set it up."
-        )
-
-    ingredients = _extract_ingredients(message)
+        return {
+            "reply": (
+                "Ana is not configured yet — the GROQ_API_KEY environment "
+                "variable is missing. Please ask the admin to set it up."
+            ),
+            "conversation_id": conversation.conversation_id,
+            "cached": False,
+        }
 
-    chunks = _retrieve_chunks_for_ingredients(ingredients, user_profile)
+    # Follow-ups ("what about dinner?") keep talking about the pantry from
+    # earlier in the conversation, so they reuse its memoized retrieval.
+    follow_up = bool(conversation.ingredients) and not _looks_like_ingredient_list(message)
+    ingredients = conversation.ingredients if follow_up else _extract_ingredients(message)
+
+    chunk_key = canonicalize_ingredients(ingredients)
+    # Only context-free answers are reusable for another conversation.
+    fresh = not conversation.turns and not conversation.summary_lines
+
+    cache_key = None
+    if not follow_up and chunk_key:
+        cache_key = plan_cache.key(chunk_key, user_profile)
+        cached_reply = plan_cache.get(cache_key)
+        if cached_reply is not None:
+            conversation.ingredients = ingredients
+            conversation.add_turn("user", message)
+            conversation.add_turn("assistant", cached_reply)
+            return {
+                "reply": cached_reply,
+                "conversation_id": conversation.conversation_id,
+                "cached": True,
+            }
+
+    chunks = conversation.cached_chunks(chunk_key)
+    if chunks is None:
+        chunks = _retrieve_chunks_for_ingredients(ingredients, user_profile)
+        conversation.remember_chunks(chunk_key, chunks)
     knowledge_context = "\n---\n".join(chunks[:6]) if chunks else "No specific knowledge retrieved."
 
-    diseases_data = _load_diseases()
-    user_diseases = _flat_diseases(user_profile) if user_profile else []
-    disease_entries = []
-    for d_name in user_diseases:
-        key = d_name.lower()
-        if key in diseases_data:
-            info = diseases_data[key]
-            disease_entries.append(
-                f"**{d_name}**: {info.get('recommended_diet', '')} "
-                f"Risks: {json.dumps(info.get('nutrient_risks', {}))}"
-            )
-    diseases_context = "\n".join(disease_entries) if disease_entries else "No specific disease constraints."
-
-    nutrient_limits = _load_nutrient_limits()
-    nutrient_limits_context = json.dumps(nutrient_limits.get("general", {}), indent=2)
-
     user_prompt = _build_user_prompt(
         ingredients=ingredients,
-        user_profile=user_profile,
         knowledge_context=knowledge_context,
-        diseases_context=diseases_context,
-        nutrient_limits_context=nutrient_limits_context,
-        conversation_history=history,
         latest_message=message,
     )
+    if follow_up:
+        user_prompt += f"\n\nThe user's follow-up request: {message}"
+
+    # Segment order is fixed (static -> per-user -> conversation -> request)
+    # so consecutive requests share the longest possible prompt prefix.
+    fragments = prompt_compiler.fragments(user_profile, owner_id)
+    messages: List[Dict] = [
+        {"role": "system", "content": prompt_compiler.ana_system},
+        {"role": "system", "content": fragments.ana_system},
+    ]
+    messages.extend(conversation.context_messages())
+    messages.append({"role": "user", "content": user_prompt})
 
-    messages: List[Dict] = [{"role": "system", "content": _build_system_prompt()}]
-
-    if history:
-        for entry in history[-8:]:
-            messages.append({
-                "role": entry.get("role", "user"),
-                "content": entry.get("content", ""),
-            })
+    reply = _call_groq(messages, api_key)
+    if fresh and cache_key is not None and not reply.startswith(GROQ_FAILURE_REPLY):
+        plan_cache.put(cache_key, reply)
 
-    messages.append({"role": "user", "content": user_prompt})
+    if not follow_up:
+        conversation.ingredients = ingredients
+    conversation.add_turn("user", message)
+    conversation.add_turn("assistant", reply)
 
-    return _call_groq(messages, api_key)
+    return {"reply": reply, "conversation_id": conversation.conversation_id, "cached": False}
@@ -0,0 +1,152 @@
+"""
+Server-side conversation memory for Ana.
+
+Clients send a ``conversation_id`` instead of replaying the whole chat on
+every turn.  Each conversation keeps its most recent turns verbatim, folds
+older turns into a short rolling summary, and memoizes the knowledge chunks
+retrieved for it so follow-up questions don't repeat retrieval.
+
+The store is process-local (the gateway runs a single worker); conversations
+expire after ``CONVERSATION_TTL_SECONDS`` of inactivity and the oldest ones
+are evicted once ``MAX_CONVERSATIONS`` is reached.
+"""
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+RECENT_TURNS = 4                 # turns kept verbatim (2 user/assistant exchanges)
+SUMMARY_MAX_CHARS = 1200         # cap on the rolling summary
+TURN_SNIPPET_CHARS = 160         # how much of a folded turn survives in the summary
+MAX_CHUNK_SETS = 4               # memoized retrieval results per conversation
+CONVERSATION_TTL_SECONDS = 6 * 60 * 60
+MAX_CONVERSATIONS = 5000
+
+
+def _snippet(role: str, content: str) -> str:
+    """Compress a turn to one line for the rolling summary.
+
+    Ana's replies are long markdown plans, so keep only their headings
+    (the meal names); user turns are short and kept as-is.
+    """
+    lines = [l.strip() for l in content.splitlines() if l.strip()]
+    if role == "assistant":
+        headings = [l.lstrip("#").strip(" *") for l in lines if l.startswith("#")]
+        text = "; ".join(h for h in headings if h) or (lines[0] if lines else "")
+    else:
+        text = " ".join(lines)
+    if len(text) > TURN_SNIPPET_CHARS:
+        text = text[:TURN_SNIPPET_CHARS - 3].rstrip() + "..."
+    return text
+
+
+class Conversation:
+    """One Ana chat: recent turns, a rolling summary and retrieval memo."""
+
+    def __init__(self, conversation_id: str, owner_id: Optional[int] = None):
+        self.conversation_id = conversation_id
+        self.owner_id = owner_id
+        self.turns: List[Dict] = []
+        self.summary_lines: List[str] = []
+        self.ingredients: List[str] = []
+        self._chunks: "OrderedDict[Tuple[str, ...], List[str]]" = OrderedDict()
+        self.updated_at = time.time()
+
+    @property
+    def summary(self) -> str:
+        return "\n".join(self.summary_lines)
+
+    def add_turn(self, role: str, content: str) -> None:
+        self.turns.append({"role": role, "content": content})
+        while len(self.turns) > RECENT_TURNS:
+            old = self.turns.pop(0)
+            self._fold(old)
+        self.updated_at = time.time()
+
+    def _fold(self, turn: Dict) -> None:
+        speaker = "User" if turn["role"] == "user" else "Ana"
+        text = _snippet(turn["role"], turn.get("content", ""))
+        if not text:
+            return
+        self.summary_lines.append(f"- {speaker}: {text}")
+        while len(self.summary) > SUMMARY_MAX_CHARS and len(self.summary_lines) > 1:
+            self.summary_lines.pop(0)
+
+    def context_messages(self) -> List[Dict]:
+        """Messages to send upstream ahead of the new user prompt."""
+        messages: List[Dict] = []
+        if self.summary_lines:
+            messages.append({
+                "role": "system",
+                "content": "Summary of the earlier conversation:\n" + self.summary,
+            })
+        messages.extend(dict(t) for t in self.turns)
+        return messages
+
+    def cached_chunks(self, key: Tuple[str, ...]) -> Optional[List[str]]:
+        chunks = self._chunks.get(key)
+        if chunks is not None:
+            self._chunks.move_to_end(key)
+        return chunks
+
+    def remember_chunks(self, key: Tuple[str, ...], chunks: List[str]) -> None:
+        self._chunks[key] = chunks
+        self._chunks.move_to_end(key)
+        while len(self._chunks) > MAX_CHUNK_SETS:
+            self._chunks.popitem(last=False)
+
+
+class ConversationStore:
+    """Thread-safe, TTL- and size-bounded map of conversation ID to state."""
+
+    def __init__(self, ttl_seconds: int = CONVERSATION_TTL_SECONDS,
+                 max_conversations: int = MAX_CONVERSATIONS):
+        self.ttl_seconds = ttl_seconds
+        self.max_conversations = max_conversations
+        self._items: "OrderedDict[str, Conversation]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, conversation_id: Optional[str] = None,
+                      owner_id: Optional[int] = None) -> Conversation:
+        """Return the live conversation for ``conversation_id``.
+
+        Unknown, expired or foreign IDs start a new conversation with a
+        freshly generated ID.  A conversation belongs to exactly one owner:
+        a signed-in user's only to that user, an anonymous one only to
+        anonymous callers.
+        """
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            conv = self._items.get(conversation_id) if conversation_id else None
+            if conv is not None and conv.owner_id != owner_id:
+                conv = None
+            if conv is None:
+                conv = Conversation(secrets.token_urlsafe(16), owner_id)
+                self._items[conv.conversation_id] = conv
+                while len(self._items) > self.max_conversations:
+                    self._items.popitem(last=False)
+            else:
+                self._items.move_to_end(conv.conversation_id)
+            conv.updated_at = now
+            return conv
+
+    def drop(self, conversation_id: str) -> None:
+        with self._lock:
+            self._items.pop(conversation_id, None)
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.ttl_seconds
+        while self._items:
+            oldest = next(iter(self._items.values()))
+            if oldest.updated_at >= cutoff:
+                break
+            self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+conversation_store = ConversationStore()
@@ -0,0 +1,201 @@
+"""
+Meal-plan cache for Ana.
+
+Many requests are the same pantry in a different order or spelling
+("eggs, spinach and rice" vs "rice, egg, spinach").  Ingredients are
+canonicalized (lowercased, singularized, synonym-folded, de-duplicated and
+sorted) and generated plans are cached per canonical pantry plus a
+fingerprint of the user profile, with a TTL and LRU eviction.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+PLAN_CACHE_TTL_SECONDS = 24 * 60 * 60
+PLAN_CACHE_MAX_ENTRIES = 512
+
+# Regional / alternate names folded onto one canonical ingredient.
+SYNONYMS = {
+    "aubergine": "eggplant",
+    "brinjal": "eggplant",
+    "courgette": "zucchini",
+    "capsicum": "bell pepper",
+    "garbanzo": "chickpea",
+    "garbanzo bean": "chickpea",
+    "chana": "chickpea",
+    "coriander": "cilantro",
+    "scallion": "green onion",
+    "spring onion": "green onion",
+    "yoghurt": "yogurt",
+    "curd": "yogurt",
+    "dahi": "yogurt",
+    "prawn": "shrimp",
+    "maize": "corn",
+    "sweetcorn": "corn",
+    "rocket": "arugula",
+    "beetroot": "beet",
+    "mince": "ground meat",
+    "minced meat": "ground meat",
+    "oat": "oats",
+    "oatmeal": "oats",
+    "porridge oats": "oats",
+    "aloo": "potato",
+    "palak": "spinach",
+    "chawal": "rice",
+    "anda": "egg",
+}
+
+# Words that describe an ingredient without changing what it is.
+_FILLER = {
+    "a", "an", "the", "some", "few", "of", "fresh", "frozen", "raw",
+    "leftover", "cup", "cups", "handful", "bunch", "pack", "can", "tin",
+    "g", "kg", "gram", "grams", "ml", "litre", "liter", "lb", "lbs",
+}
+
+# Words where a trailing "s" is not a plural.
+_UNCOUNTABLE = {
+    "oats", "hummus", "asparagus", "couscous", "molasses", "swiss", "brussels",
+}
+
+_SPLIT_RE = re.compile(r",|;|\band\b|&|\+|\bwith\b")
+_TOKEN_RE = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+
+def _singularize(word: str) -> str:
+    if word in _UNCOUNTABLE or len(word) <= 3:
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith("oes"):
+        return word[:-2]
+    if word.endswith(("ches", "shes", "xes", "sses")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def canonical_ingredient(raw: str) -> str:
+    """Normalize one ingredient phrase, e.g. ``"Fresh Tomatoes"`` -> ``"tomato"``."""
+    words = [w for w in _TOKEN_RE.findall(raw.lower()) if w not in _FILLER]
+    if not words:
+        return ""
+    phrase = " ".join(words)
+    if phrase in SYNONYMS:
+        return SYNONYMS[phrase]
+    words = [_singularize(w) for w in words]
+    phrase = " ".join(words)
+    if phrase in SYNONYMS:
+        return SYNONYMS[phrase]
+    return " ".join(SYNONYMS.get(w, w) for w in words)
+
+
+def canonicalize_ingredients(ingredients: List[str]) -> Tuple[str, ...]:
+    """Canonical, order-independent form of ``_extract_ingredients`` output."""
+    canonical = set()
+    for item in ingredients:
+        for part in _SPLIT_RE.split(item.lower()):
+            name = canonical_ingredient(part)
+            if name:
+                canonical.add(name)
+    return tuple(sorted(canonical))
+
+
+def flat_diseases(profile: Optional[Dict]) -> List[str]:
+    """Disease names from ``medical_history.diseases`` (strings or dicts)."""
+    if not profile:
+        return []
+    names = []
+    for d in (profile.get("medical_history") or {}).get("diseases", []):
+        name = d.get("name", "") if isinstance(d, dict) else str(d)
+        if name:
+            names.append(name)
+    return names
+
+
+def prompt_profile(profile: Optional[Dict]) -> Optional[Dict]:
+    """The profile fields the prompts render, with the prompts' defaults.
+
+    ``PromptCompiler._render`` builds the profile blocks from this and
+    ``profile_fingerprint`` hashes it, so a field that changes a prompt
+    always changes the fingerprint too.
+    """
+    if not profile:
+        return None
+    fields = {
+        key: profile.get(key, "N/A")
+        for key in ("age", "gender", "activity_level", "diet_type", "goal")
+    }
+    fields["allergies"] = list(profile.get("allergies") or [])
+    fields["diseases"] = flat_diseases(profile)
+    metrics = profile.get("health_metrics")
+    if metrics:
+        macros = metrics.get("macros") or {}
+        fields["metrics"] = {
+            "bmi": metrics.get("bmi"),
+            "bmi_category": metrics.get("bmi_category"),
+            "calorie_target": metrics.get("calorie_target"),
+            "carbs_g": macros.get("carbs_g"),
+            "protein_g": macros.get("protein_g"),
+            "fat_g": macros.get("fat_g"),
+        }
+    else:
+        fields["metrics"] = None
+    return fields
+
+
+def profile_fingerprint(user_profile: Optional[Dict]) -> str:
+    """Stable short hash of the profile fields that shape a meal plan."""
+    fields = prompt_profile(user_profile)
+    if fields is None:
+        return "anonymous"
+    blob = json.dumps(fields, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:16]
+
+
+class PlanCache:
+    """Thread-safe TTL + LRU cache of generated plans."""
+
+    def __init__(self, ttl_seconds: int = PLAN_CACHE_TTL_SECONDS,
+                 max_entries: int = PLAN_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._items: "OrderedDict[Tuple, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(ingredients: Tuple[str, ...], user_profile: Optional[Dict]) -> Tuple:
+        return (ingredients, profile_fingerprint(user_profile))
+
+    def get(self, key: Tuple) -> Optional[str]:
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None or time.time() - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self._items[key]
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Tuple, reply: str) -> None:
+        with self._lock:
+            self._items[key] = (time.time(), reply)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._items), "hits": self.hits, "misses": self.misses}
+
+
+plan_cache = PlanCache()
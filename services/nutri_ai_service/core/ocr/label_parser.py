@@ -0,0 +1,185 @@
+"""
+Single-pass nutrition label parser.
+
+Turns OCR text into nutrient values in one pass over the lines:
+
+* lines are lowercased and split once; a line that starts with a number
+  and carries no label (OCR often puts the value on its own line) is
+  stitched onto the previous one;
+* every label variant is matched by one precompiled alternation, so each
+  line is scanned once regardless of how many fields there are;
+* the value after each label is parsed together with its unit and
+  normalized (g / mg / kcal, kJ -> kcal, salt -> sodium);
+* each field gets a confidence in [0, 1] from the unit, duplicates and
+  plausibility, so callers can decide whether to trust the parse.
+
+Pure Python (only ``re``) so the gateway can use it too.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+FIELDS = ["calories", "protein", "carbs", "sugars", "fat", "saturated_fat", "trans_fat", "sodium", "fiber"]
+
+# Order matters where variants overlap at the same position: the more
+# specific label must come first ("saturated fat" before "fat").
+_LABELS = [
+    ("_skip", r"calories\s*from\s*fat|daily\s*values?"),
+    ("saturated_fat", r"saturated\s*fat(?:ty\s*acids)?|saturates|sat\.?\s*fat"),
+    ("trans_fat", r"trans\s*fat(?:ty\s*acids)?"),
+    ("fiber", r"(?:dietary\s*)?fib(?:er|re)"),
+    ("sugars", r"(?:total\s*|added\s*)?sugars?"),
+    ("carbs", r"(?:total\s*)?carbohydrates?|carbs"),
+    ("protein", r"proteins?"),
+    ("sodium", r"sodium"),
+    ("salt", r"salt"),
+    ("fat", r"(?:total\s*)?fat"),
+    ("calories", r"calories|energy|kcal"),
+]
+_GROUPS = {f"f{i}": name for i, (name, _) in enumerate(_LABELS)}
+# The lookahead on the labels' first letters lets the scanner skip most
+# positions without trying every alternative (keep it in sync with _LABELS).
+LABEL_RE = re.compile(
+    r"\b(?=[cdefkopst])(?:"
+    + "|".join(f"(?P<f{i}>{pattern})" for i, (_, pattern) in enumerate(_LABELS))
+    + ")"
+)
+
+# A value right after the label: optional unit in brackets or separators
+# ("protein (g) 5.2", "sodium: 480mg"), then number and unit.
+_VALUE_RE = re.compile(
+    r"^[^\da-z]*(?:(kcal|kj|mg|mcg|g)\b[^\da-z]*)?"
+    r"(\d+(?:[.,]\d+)?)\s*(kcal|kj|cal|mg|mcg|µg|g)?\b"
+)
+_ENERGY_RE = re.compile(r"(\d+(?:[.,]\d+)?)\s*(kcal|kj|cal)?\b")
+_DIGIT_RE = re.compile(r"\d")
+_TRAILING_NUMBER_RE = re.compile(r"(\d+(?:[.,]\d+)?)\s*$")
+_NUMBER_LINE_RE = re.compile(r"^\d+(?:[.,]\d+)?\s*(?:kcal|kj|mg|g|%)?\b")
+
+_PLAUSIBLE_MAX = {"calories": 1500, "sodium": 5000}
+_MACRO_MAX = 100.0
+
+
+def _number(raw: str, thousands: bool = False) -> float:
+    if "," in raw:
+        whole, frac = raw.split(",", 1)
+        # "1,046 kJ" / "2,300 mg" use a thousands separator; "5,2 g" is a
+        # decimal comma.
+        raw = whole + frac if thousands and len(frac) == 3 else whole + "." + frac
+    return float(raw)
+
+
+def _tokenize(text: str) -> List[str]:
+    lines: List[str] = []
+    for line in text.lower().splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if lines and _NUMBER_LINE_RE.match(line) and not LABEL_RE.search(line):
+            lines[-1] = f"{lines[-1]} {line}"
+        else:
+            lines.append(line)
+    return lines
+
+
+def _parse_value(field: str, segment: str) -> Optional[Tuple[float, float]]:
+    """Normalized ``(value, confidence)`` from the text after a label."""
+    if field == "calories":
+        matches = [(_number(n, True), u) for n, u in _ENERGY_RE.findall(segment)]
+        if not matches:
+            return None
+        for value, unit in matches:
+            if unit in ("kcal", "cal"):
+                return value, 0.95
+        value, unit = matches[0]
+        # "energy (kj) 1046" puts the unit before the number.
+        if unit == "kj" or (unit is None and "kj" in segment and "kcal" not in segment):
+            return round(value / 4.184, 1), 0.85
+        return value, 0.9 if "kcal" in segment else 0.75
+
+    match = _VALUE_RE.match(segment)
+    if not match:
+        return None
+    unit = match.group(3) or match.group(1)
+    value = _number(match.group(2), thousands=field == "sodium")
+
+    if field in ("sodium", "salt"):
+        # Both end up in mg; a bare number is taken as mg for sodium and
+        # g for salt, which is how labels print them.
+        if unit == "g" or (unit is None and field == "salt"):
+            return value * 1000, 0.9 if unit else 0.7
+        if unit == "mg":
+            return value, 0.95
+        return value, 0.7
+
+    if unit == "mg":
+        return value / 1000, 0.8
+    if unit in ("mcg", "µg"):
+        return value / 1_000_000, 0.6
+    return value, 0.95 if unit == "g" else 0.75
+
+
+def parse_nutrition_label(text: str) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """Parse OCR text into ``(values, confidence)`` dicts keyed by ``FIELDS``.
+
+    Missing fields are 0.0 with confidence 0.0.
+    """
+    found: Dict[str, Tuple[float, float]] = {}
+    duplicates: Dict[str, bool] = {}
+
+    for line in _tokenize(text):
+        matches = [(_GROUPS[m.lastgroup], m) for m in LABEL_RE.finditer(line)]
+        # "energy (kcal) 450" matches twice; fold a repeated label into the
+        # first one so the value lands in its segment.
+        merged: List[Tuple[str, "re.Match"]] = []
+        for field, match in matches:
+            if merged and merged[-1][0] == field and not _DIGIT_RE.search(
+                line, merged[-1][1].end(), match.start()
+            ):
+                continue
+            merged.append((field, match))
+
+        for i, (field, match) in enumerate(merged):
+            if field == "_skip":
+                continue
+            end = merged[i + 1][1].start() if i + 1 < len(merged) else len(line)
+            parsed = _parse_value(field, line[match.end():end])
+            if parsed is None and field == "calories":
+                # "492 kcal" puts the number before the unit-as-label.
+                start = merged[i - 1][1].end() if i else 0
+                trailing = _TRAILING_NUMBER_RE.search(line, start, match.start())
+                if trailing:
+                    parsed = (_number(trailing.group(1), True), 0.9)
+            if parsed is None:
+                continue
+            if field in found:
+                # Per-serving column comes first; a second value is usually
+                # per 100 g.  Keep the first, but trust it a little less.
+                if abs(found[field][0] - parsed[0]) > 1e-6:
+                    duplicates[field] = True
+                continue
+            found[field] = parsed
+
+    if "sodium" not in found and "salt" in found:
+        salt_mg, confidence = found["salt"]
+        found["sodium"] = (round(salt_mg * 0.4, 1), confidence * 0.9)  # sodium = salt / 2.5
+
+    values: Dict[str, float] = {}
+    confidence: Dict[str, float] = {}
+    for field in FIELDS:
+        if field not in found:
+            values[field], confidence[field] = 0.0, 0.0
+            continue
+        value, conf = found[field]
+        if duplicates.get(field):
+            conf *= 0.85
+        if value > _PLAUSIBLE_MAX.get(field, _MACRO_MAX):
+            conf = min(conf, 0.3)
+        values[field] = round(value, 3)
+        confidence[field] = round(conf, 2)
+    return values, confidence
+
+
+def parse_nutrition_table(text: str) -> Dict[str, float]:
+    """Values only (see ``parse_nutrition_label`` for confidences)."""
+    return parse_nutrition_label(text)[0]
@@ -55,68 +55,38 @@
 #         nutrition_info["sodium"] = int(sodium_match.group(1))
 
 #     return nutrition_info
-import easyocr
-import re
+import threading
 from PIL import Image
 import numpy as np
 import os
 
-# Initialize EasyOCR reader
-reader = easyocr.Reader(['en'], gpu=False)
+from .label_parser import parse_nutrition_label, parse_nutrition_table  # noqa: F401 (re-exported)
+from .panel_detector import crop_to_panel
 
-def extract_nutrition_info(image_path):
-    if not os.path.exists(image_path):
-        raise FileNotFoundError(f"Image not found at: {image_path}")
-
-    image = Image.open(image_path)
-    image_np = np.array(image)
-    result = reader.readtext(image_np, detail=0)
-    extracted_text = "\n".join(result)
-    print("Extracted OCR Text:\n", extracted_text)
-    return extracted_text
+# EasyOCR loads its detection/recognition models on construction, so the
+# reader is created on first use rather than at import.  The web service
+# goes through the worker pool in ocr_pool.py instead of this reader.
+_reader = None
+_reader_lock = threading.Lock()
 
-def parse_nutrition_table(text):
-    def extract_number(patterns, combined_text):
-        for pattern in patterns:
-            match = re.search(pattern, combined_text, re.IGNORECASE)
-            if match:
-                numbers = re.findall(r'[\d.]+', match.group(0))
-                numbers = [float(n) for n in numbers if n.replace('.', '', 1).isdigit()]
-                if numbers:
-                    return max(numbers)  # Choose the most likely correct value
-        return 0.0
 
-    # Step 1: Preprocess lines and stitch broken values
-    lines = [line.strip().lower() for line in text.splitlines() if line.strip()]
-    stitched_lines = []
-    buffer = ""
+def get_reader():
+    global _reader
+    with _reader_lock:
+        if _reader is None:
+            import easyocr
+            _reader = easyocr.Reader(['en'], gpu=False)
+        return _reader
 
-    for line in lines:
-        if re.match(r'^\d+(\.\d+)?$', line):  # If it's just a number, attach to previous line
-            buffer += " " + line
-        else:
-            if buffer:
-                stitched_lines.append(buffer)
-            buffer = line
-    if buffer:
-        stitched_lines.append(buffer)
 
-    combined_text = "\n".join(stitched_lines)
-    print("\nProcessed Text for Regex:\n", combined_text)
-
-    # Step 2: Apply flexible regex patterns
-    nutrition_data = {
-        "calories": extract_number([r'(?:kcal|energy)[^\d]{0,5}([\d.\s]+)'], combined_text),
-        "protein": extract_number([r'protein[^\d]{0,5}([\d.\s]+)'], combined_text),
-        "carbs": extract_number([r'(?:total\s*)?carbohydrate[^\d]{0,5}([\d.\s]+)'], combined_text),
-        "sugars": extract_number([r'sugars?[^\d]{0,5}([\d.\s]+)'], combined_text),
-        "fat": extract_number([r'(?:total\s*)?fat[^\d]{0,5}([\d.\s]+)'], combined_text),
-        "saturated_fat": extract_number([r'saturated\s*fat[^\d]{0,5}([\d.\s]+)'], combined_text),
-        "trans_fat": extract_number([r'trans\s*fat[^\d]{0,5}([\d.\s]+)'], combined_text),
-        "sodium": extract_number([r'sodium\s*mg[^\d]{0,5}([\d.\s]+)', r'sodium[^\d]{0,5}([\d.\s]+)'], combined_text),
-    }
+def extract_nutrition_info(image_path, crop_panel=True):
+    if not os.path.exists(image_path):
+        raise FileNotFoundError(f"Image not found at: {image_path}")
 
-    return nutrition_data
+    image = Image.open(image_path).convert('RGB')
+    image_np, _ = crop_to_panel(np.array(image), enabled=crop_panel)
+    result = get_reader().readtext(image_np, detail=0)
+    return "\n".join(result)
 
 # --- Main Execution ---
 # if __name__ == "__main__":
@@ -0,0 +1,172 @@
+"""
+Bounded pool of EasyOCR worker processes.
+
+Each worker process loads one ``easyocr.Reader`` when it starts and reuses
+it for every job, so the detection/recognition models are loaded once per
+worker instead of in every process that imports the OCR module.  The pool
+is created lazily on first use.
+
+Backpressure: at most ``size + queue_limit`` jobs may be in flight; beyond
+that ``submit`` raises ``OCRPoolBusy`` immediately so the route can answer
+503 instead of piling up requests behind a slow OCR.  Batches go through
+``imap_unordered``, which keeps a small window of jobs in flight (waiting
+for a slot rather than failing) and yields results as they complete.
+"""
+
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Hashable, Iterable, Iterator, Optional, Tuple
+
+from .panel_detector import crop_to_panel
+
+logger = logging.getLogger(__name__)
+
+OCR_POOL_SIZE = int(os.getenv("OCR_POOL_SIZE", "2"))
+OCR_QUEUE_LIMIT = int(os.getenv("OCR_QUEUE_LIMIT", "8"))
+OCR_TIMEOUT_SECONDS = float(os.getenv("OCR_TIMEOUT_SECONDS", "60"))
+
+_worker_reader = None
+
+
+def _init_worker():
+    """Runs once in every worker process: preload the reader."""
+    global _worker_reader
+    import easyocr
+    _worker_reader = easyocr.Reader(["en"], gpu=False)
+
+
+def _to_array(image):
+    import numpy as np
+    from PIL import Image
+
+    if isinstance(image, (bytes, bytearray)):
+        return np.array(Image.open(io.BytesIO(image)).convert("RGB"))
+    if isinstance(image, str):
+        return np.array(Image.open(image).convert("RGB"))
+    return image
+
+
+def _ocr_job(image, crop_panel: bool = True) -> str:
+    """Worker-side job: image bytes, path or array -> newline-joined text."""
+    array, _ = crop_to_panel(_to_array(image), enabled=crop_panel)
+    result = _worker_reader.readtext(array, detail=0)
+    return "\n".join(result)
+
+
+class OCRPoolBusy(RuntimeError):
+    """Raised when the pool's queue is full."""
+
+
+class OCRPool:
+    def __init__(self, size: int = OCR_POOL_SIZE, queue_limit: int = OCR_QUEUE_LIMIT):
+        self.size = max(1, size)
+        self.queue_limit = max(0, queue_limit)
+        self._slots = threading.BoundedSemaphore(self.size + self.queue_limit)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                logger.info(f"Starting OCR pool with {self.size} workers")
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.size,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return self._executor
+
+    def start(self) -> None:
+        """Spawn the workers ahead of the first request (optional warm start)."""
+        executor = self._get_executor()
+        for _ in range(self.size):
+            executor.submit(os.getpid)
+
+    def submit(self, image, block: bool = False, crop_panel: bool = True) -> Future:
+        """Queue an OCR job for image bytes, a path or an RGB array.
+
+        Raises ``OCRPoolBusy`` when the queue is full, unless ``block`` is
+        set, in which case it waits up to ``OCR_TIMEOUT_SECONDS`` for a slot.
+        Pass ``crop_panel=False`` for images that were already cropped to
+        their nutrition panel upstream.
+        """
+        acquired = (self._slots.acquire(timeout=OCR_TIMEOUT_SECONDS) if block
+                    else self._slots.acquire(blocking=False))
+        if not acquired:
+            raise OCRPoolBusy("OCR queue is full, please retry shortly")
+        try:
+            future = self._get_executor().submit(_ocr_job, image, crop_panel)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); start a fresh pool and retry once.
+            with self._lock:
+                self._executor = None
+            try:
+                future = self._get_executor().submit(_ocr_job, image, crop_panel)
+            except Exception:
+                self._slots.release()
+                raise
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def readtext(self, image, timeout: float = OCR_TIMEOUT_SECONDS, crop_panel: bool = True) -> str:
+        """Blocking convenience wrapper around ``submit``."""
+        return self.submit(image, crop_panel=crop_panel).result(timeout=timeout)
+
+    def imap_unordered(
+        self, images: Iterable[Tuple[Hashable, object]], window: Optional[int] = None,
+    ) -> Iterator[Tuple[Hashable, Optional[str], Optional[Exception]]]:
+        """OCR ``(key, image)`` pairs, yielding ``(key, text, error)`` as jobs finish.
+
+        At most ``window`` jobs (default: one per worker plus one) are in
+        flight, so a large batch neither buffers every image in memory nor
+        takes all the queue slots from single uploads.  Images are pulled
+        from ``images`` lazily.
+        """
+        window = max(1, window or self.size + 1)
+        pending = {}
+        source = iter(images)
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < window:
+                try:
+                    key, image = next(source)
+                except StopIteration:
+                    exhausted = True
+                    break
+                try:
+                    pending[self.submit(image, block=True)] = key
+                except Exception as e:
+                    yield key, None, e
+            if not pending:
+                continue
+            done, _ = wait(pending, timeout=OCR_TIMEOUT_SECONDS, return_when=FIRST_COMPLETED)
+            if not done:
+                # Nothing finished in time: fail what is in flight, keep going.
+                for future, key in pending.items():
+                    future.cancel()
+                    yield key, None, TimeoutError("OCR timed out")
+                pending.clear()
+                continue
+            for future in done:
+                key = pending.pop(future)
+                try:
+                    yield key, future.result(), None
+                except Exception as e:
+                    yield key, None, e
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+ocr_pool = OCRPool()
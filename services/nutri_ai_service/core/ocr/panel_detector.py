@@ -0,0 +1,169 @@
+"""
+Nutrition-facts panel detection.
+
+Most of a product photo is packaging art; running OCR (or spending the
+vision model's pixel budget) on all of it is slow and adds noise tokens.
+This finds the nutrition table with classical OpenCV operations and crops
+to it before recognition:
+
+1. ruled tables - a stack of long horizontal rules (morphological opening
+   with a wide 1-px kernel), merged into one block;
+2. otherwise the densest text block that looks like a table -
+   morphological gradient, Otsu threshold and closing to turn text lines
+   into blobs, then keep the first block with enough separate text lines,
+   a sane aspect ratio and an empty gutter between the label column and
+   the value column. Ingredient paragraphs and brand art fail that check;
+   with no such block nothing is cropped.
+
+OpenCV and NumPy are optional: without them (e.g. on the lightweight
+gateway) ``crop_to_panel`` returns the image unchanged.
+"""
+
+import os
+from typing import Optional, Tuple
+
+PANEL_CROP_ENABLED = os.getenv("NUTRI_PANEL_CROP", "1") == "1"
+WORK_LONG_EDGE = 800          # detection runs on a downscaled copy
+MIN_RULES = 4                 # horizontal rules needed to trust a ruled table
+MIN_AREA_FRACTION = 0.04      # ignore specks
+MAX_AREA_FRACTION = 0.90      # a "panel" this big isn't worth cropping to
+PAD_FRACTION = 0.04
+MIN_TEXT_LINES = 5            # lines needed before an unruled block counts as a table
+MAX_ASPECT = 4.0              # blocks wider or taller than this aren't panels
+MIN_GUTTER_FRACTION = 0.04    # label/value gutter width, relative to the block
+MAX_GUTTER_INK = 0.25         # share of lines allowed to cross the gutter
+
+Box = Tuple[int, int, int, int]  # x, y, w, h in source pixels
+
+
+def _ruled_table_box(cv2, np, gray) -> Optional[Box]:
+    h, w = gray.shape
+    bw = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C,
+                               cv2.THRESH_BINARY_INV, 15, 10)
+    rules = cv2.morphologyEx(
+        bw, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (max(w // 10, 20), 1)),
+    )
+    # Merge stacked rules into table-sized blocks.
+    blocks = cv2.dilate(rules, cv2.getStructuringElement(cv2.MORPH_RECT, (3, max(h // 12, 15))))
+    contours, _ = cv2.findContours(blocks, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    best, best_rules = None, 0
+    for contour in contours:
+        x, y, cw, ch = cv2.boundingRect(contour)
+        n_rules, _ = cv2.connectedComponents(rules[y:y + ch, x:x + cw])
+        n_rules -= 1  # background label
+        if n_rules > best_rules:
+            best, best_rules = (x, y, cw, ch), n_rules
+    return best if best_rules >= MIN_RULES else None
+
+
+def _line_runs(np, mask):
+    """(start, stop) row ranges of the text lines in a binary block."""
+    filled = np.concatenate(([False], np.count_nonzero(mask, axis=1) > 0, [False]))
+    edges = np.flatnonzero(filled[1:] != filled[:-1])
+    return list(zip(edges[::2], edges[1::2]))
+
+
+def _has_value_gutter(np, mask, runs) -> bool:
+    """True if the lines share an empty vertical gutter away from the edges.
+
+    Nutrition tables put values in a column of their own; justified or
+    wrapped prose has words at every horizontal position.
+    """
+    width = mask.shape[1]
+    per_line = np.stack([np.count_nonzero(mask[a:b], axis=0) > 0 for a, b in runs])
+    empty = per_line.mean(axis=0) <= MAX_GUTTER_INK
+    lo, hi = int(width * 0.1), int(width * 0.9)
+    longest = run = 0
+    for is_empty in empty[lo:hi]:
+        run = run + 1 if is_empty else 0
+        longest = max(longest, run)
+    return longest >= max(3, width * MIN_GUTTER_FRACTION)
+
+
+def _looks_like_table(cv2, np, bw, box: Box) -> bool:
+    x, y, w, h = box
+    if max(w, h) > MAX_ASPECT * min(w, h):
+        return False
+    block = bw[y:y + h, x:x + w]
+    # Drop frame lines and rules so only the text is left, then join each
+    # word into one run without bridging the label/value gutter.
+    strokes = cv2.bitwise_or(
+        cv2.morphologyEx(block, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(h // 2, 3)))),
+        cv2.morphologyEx(block, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (max(w // 2, 3), 1))),
+    )
+    text = cv2.morphologyEx(cv2.bitwise_and(block, cv2.bitwise_not(strokes)), cv2.MORPH_CLOSE,
+                            cv2.getStructuringElement(cv2.MORPH_RECT, (max(w // 40, 5), 1)))
+    runs = _line_runs(np, text)
+    return len(runs) >= MIN_TEXT_LINES and _has_value_gutter(np, text, runs)
+
+
+def _text_density_box(cv2, np, gray) -> Optional[Box]:
+    h, w = gray.shape
+    grad = cv2.morphologyEx(gray, cv2.MORPH_GRADIENT,
+                            cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3)))
+    _, bw = cv2.threshold(grad, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    lines = cv2.morphologyEx(bw, cv2.MORPH_CLOSE,
+                             cv2.getStructuringElement(cv2.MORPH_RECT, (max(w // 40, 9), 1)))
+    blocks = cv2.dilate(lines, cv2.getStructuringElement(cv2.MORPH_RECT, (max(w // 30, 9), max(h // 40, 5))))
+    contours, _ = cv2.findContours(blocks, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    boxes = [cv2.boundingRect(contour) for contour in contours]
+    boxes.sort(key=lambda b: int(np.count_nonzero(bw[b[1]:b[1] + b[3], b[0]:b[0] + b[2]])), reverse=True)
+    for box in boxes:
+        if _looks_like_table(cv2, np, bw, box):
+            return box
+    return None
+
+
+def find_panel_box(image_rgb) -> Optional[Box]:
+    """Bounding box of the nutrition panel in an RGB array, or None."""
+    try:
+        import cv2
+        import numpy as np
+    except ImportError:
+        return None
+
+    src_h, src_w = image_rgb.shape[:2]
+    scale = min(1.0, WORK_LONG_EDGE / max(src_h, src_w))
+    gray = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2GRAY) if image_rgb.ndim == 3 else image_rgb
+    if scale < 1.0:
+        gray = cv2.resize(gray, (int(src_w * scale), int(src_h * scale)), interpolation=cv2.INTER_AREA)
+
+    box = _ruled_table_box(cv2, np, gray) or _text_density_box(cv2, np, gray)
+    if box is None:
+        return None
+
+    x, y, w, h = (v / scale for v in box)
+    area_fraction = (w * h) / float(src_w * src_h)
+    if not MIN_AREA_FRACTION <= area_fraction <= MAX_AREA_FRACTION:
+        return None
+
+    pad_x, pad_y = w * PAD_FRACTION, h * PAD_FRACTION
+    x0, y0 = max(0, int(x - pad_x)), max(0, int(y - pad_y))
+    x1, y1 = min(src_w, int(x + w + pad_x)), min(src_h, int(y + h + pad_y))
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def crop_to_panel(image, enabled: bool = PANEL_CROP_ENABLED):
+    """Crop a PIL image or RGB array to its nutrition panel.
+
+    Returns ``(image, box)``; ``box`` is None (and the image untouched) when
+    cropping is disabled, unavailable or no panel was found.
+    """
+    if not enabled:
+        return image, None
+    try:
+        import numpy as np
+    except ImportError:
+        return image, None
+
+    is_array = isinstance(image, np.ndarray)
+    array = image if is_array else np.asarray(image.convert("RGB"))
+    box = find_panel_box(array)
+    if box is None:
+        return image, None
+    x, y, w, h = box
+    if is_array:
+        return image[y:y + h, x:x + w], box
+    return image.crop((x, y, x + w, y + h)), box
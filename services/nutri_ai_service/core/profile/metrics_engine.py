@@ -0,0 +1,298 @@
+"""
+Health metrics engine.
+
+One implementation of the profile metrics (BMI, BMR, TDEE, calorie target,
+macros, disease risk flags, ideal weight range) with two front ends:
+
+* ``compute_metrics(profile)`` - scalar, pure Python, for one profile dict.
+  The gateway and the Nutri AI service both delegate to it.
+* ``compute_columnar(columns)`` - NumPy, for arrays of profiles (cohort
+  analytics, batch scoring).  Every step is an array expression; the only
+  loops are over the handful of categories (activity levels, risks), never
+  over profiles.  ``profiles_to_columns`` builds the columns from dicts.
+
+Both front ends share the constants below and produce the same numbers.
+
+Defaults for missing or unknown values: age 30, male, 170 cm, 70 kg,
+"moderate" activity (x1.55) and "maintain weight".  An unrecognized
+activity level also gets 1.55 - the middle of the scale rather than the
+sedentary floor, so a typo doesn't silently cut the target by ~350 kcal.
+BMR and TDEE are computed unrounded and rounded to whole kcal on output.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+DEFAULTS = {
+    "age": 30,
+    "gender": "male",
+    "height_cm": 170,
+    "weight_kg": 70,
+    "activity_level": "moderate",
+    "goal": "maintain weight",
+    "sleep_hours": 7,
+}
+
+ACTIVITY_MULTIPLIERS = {
+    "sedentary": 1.2,
+    "light": 1.375,
+    "moderate": 1.55,
+    "active": 1.725,
+    "very_active": 1.9,
+}
+DEFAULT_ACTIVITY_MULTIPLIER = ACTIVITY_MULTIPLIERS["moderate"]
+
+GOAL_ADJUSTMENTS = {"lose weight": -500, "gain weight": 500}
+
+# Share of calories from carbs / protein / fat, and kcal per gram.
+MACRO_SPLIT = {"carbs_g": (0.4, 4), "protein_g": (0.3, 4), "fat_g": (0.3, 9)}
+
+BMI_CATEGORIES = ("Underweight", "Normal weight", "Overweight", "Obesity")
+BMI_BOUNDS = (18.5, 25, 30)
+
+# Risk levels are ordered so that combining two assessments is a max().
+RISK_LEVELS = (None, "Low", "Moderate", "Elevated", "High")
+RISKS = ("obesity", "diabetes", "heart_disease", "lung_disease", "liver_disease",
+         "metabolic_disorders", "hypertension")
+_LEVEL = {name: code for code, name in enumerate(RISK_LEVELS)}
+
+
+def _value(profile: Dict, key: str):
+    value = profile.get(key)
+    return DEFAULTS[key] if value is None or value == "" else value
+
+
+def bmi_category(bmi: float) -> str:
+    """BMI category name for a (rounded) BMI."""
+    for bound, category in zip(BMI_BOUNDS, BMI_CATEGORIES):
+        if bmi < bound:
+            return category
+    return BMI_CATEGORIES[-1]
+
+
+def _family_history(profile: Dict) -> List[str]:
+    history = (profile.get("medical_history") or {}).get("family_history") or []
+    return [str(condition).lower() for condition in history]
+
+
+def disease_risks(profile: Dict, bmi: Optional[float] = None) -> Dict[str, str]:
+    """Risk flags for one profile; only risks that apply are included."""
+    if bmi is None:
+        height_m = float(_value(profile, "height_cm")) / 100
+        bmi = float(_value(profile, "weight_kg")) / (height_m * height_m)
+    codes = dict.fromkeys(RISKS, 0)
+
+    def raise_to(risk, level):
+        codes[risk] = max(codes[risk], _LEVEL[level])
+
+    if bmi >= 30:
+        raise_to("obesity", "High")
+        raise_to("diabetes", "Elevated")
+        raise_to("heart_disease", "Elevated")
+    elif bmi >= 25:
+        for risk in ("obesity", "diabetes", "heart_disease"):
+            raise_to(risk, "Moderate")
+    if profile.get("smoker", False):
+        raise_to("lung_disease", "High")
+        raise_to("heart_disease", "High")
+    alcohol = profile.get("alcohol_consumption", "none")
+    if alcohol == "frequent":
+        raise_to("liver_disease", "High")
+    elif alcohol == "occasional":
+        raise_to("liver_disease", "Low")
+    family = _family_history(profile)
+    if "diabetes" in family:
+        raise_to("diabetes", "Low")
+    if "heart disease" in family:
+        raise_to("heart_disease", "Low")
+    if float(_value(profile, "sleep_hours")) < 6:
+        raise_to("metabolic_disorders", "Moderate")
+    if profile.get("stress_level", "low") == "high":
+        raise_to("hypertension", "Moderate")
+
+    return {risk: RISK_LEVELS[code] for risk, code in codes.items() if code}
+
+
+def compute_metrics(profile: Dict) -> Dict:
+    """All health metrics for one profile dict."""
+    age = float(_value(profile, "age"))
+    height_cm = float(_value(profile, "height_cm"))
+    weight_kg = float(_value(profile, "weight_kg"))
+    is_male = str(_value(profile, "gender")).lower() == "male"
+
+    height_m = height_cm / 100
+    bmi = weight_kg / (height_m * height_m)
+
+    bmr = 10 * weight_kg + 6.25 * height_cm - 5 * age + (5 if is_male else -161)
+    multiplier = ACTIVITY_MULTIPLIERS.get(_value(profile, "activity_level"), DEFAULT_ACTIVITY_MULTIPLIER)
+    tdee = round(bmr * multiplier)
+    calorie_target = tdee + GOAL_ADJUSTMENTS.get(_value(profile, "goal"), 0)
+
+    # Devine formula
+    ideal_weight = (50 if is_male else 45.5) + 2.3 * (height_cm / 2.54 - 60)
+
+    return {
+        "bmi": round(bmi, 2),
+        "bmi_category": bmi_category(round(bmi, 2)),
+        "bmr": round(bmr),
+        "tdee": tdee,
+        "calorie_target": calorie_target,
+        "macros": {
+            name: round(calorie_target * share / kcal_per_g)
+            for name, (share, kcal_per_g) in MACRO_SPLIT.items()
+        },
+        "disease_risks": disease_risks(profile, bmi),
+        "ideal_weight_range_kg": (round(ideal_weight - 5, 1), round(ideal_weight + 5, 1)),
+    }
+
+
+# -- Columnar ----------------------------------------------------------------
+
+COLUMNS = ("age", "gender", "height_cm", "weight_kg", "activity_level", "goal", "smoker",
+           "alcohol_consumption", "family_diabetes", "family_heart_disease", "sleep_hours",
+           "stress_level")
+
+
+def profiles_to_columns(profiles: Iterable[Dict]) -> Dict:
+    """Gather profile dicts into the column arrays ``compute_columnar`` takes.
+
+    Callers that already hold columns (a DB query, a DataFrame) should pass
+    those directly and skip this step.
+    """
+    import numpy as np
+
+    profiles = list(profiles)
+
+    def numeric(key):
+        return np.array([float(_value(p, key)) for p in profiles], dtype=np.float64)
+
+    def text(key, default=None):
+        return np.array([str(p.get(key) or DEFAULTS.get(key, default)) for p in profiles])
+
+    family = [_family_history(p) for p in profiles]
+    return {
+        "age": numeric("age"),
+        "gender": np.char.lower(text("gender")),
+        "height_cm": numeric("height_cm"),
+        "weight_kg": numeric("weight_kg"),
+        "activity_level": text("activity_level"),
+        "goal": text("goal"),
+        "smoker": np.array([bool(p.get("smoker", False)) for p in profiles]),
+        "alcohol_consumption": text("alcohol_consumption", "none"),
+        "family_diabetes": np.array(["diabetes" in f for f in family]),
+        "family_heart_disease": np.array(["heart disease" in f for f in family]),
+        "sleep_hours": numeric("sleep_hours"),
+        "stress_level": text("stress_level", "low"),
+    }
+
+
+def compute_columnar(columns: Dict) -> Dict:
+    """Health metrics for arrays of profiles.
+
+    ``columns`` maps the names in ``COLUMNS`` to equal-length arrays (only
+    ``height_cm`` and ``weight_kg`` are required; other columns fall back to
+    the scalar defaults).  Returns a dict of arrays: ``bmi``,
+    ``bmi_category`` (index into ``BMI_CATEGORIES``), ``bmr``, ``tdee``,
+    ``calorie_target``, ``carbs_g`` / ``protein_g`` / ``fat_g``,
+    ``risk_<name>`` (index into ``RISK_LEVELS``, 0 = not flagged) and
+    ``ideal_weight_min_kg`` / ``ideal_weight_max_kg``.
+    """
+    import numpy as np
+
+    height_cm = np.asarray(columns["height_cm"], dtype=np.float64)
+    weight_kg = np.asarray(columns["weight_kg"], dtype=np.float64)
+    n = height_cm.shape[0]
+
+    def numeric(key):
+        if key in columns:
+            return np.asarray(columns[key], dtype=np.float64)
+        return np.full(n, float(DEFAULTS[key]))
+
+    def text(key, default=None):
+        if key in columns:
+            return np.asarray(columns[key])
+        return np.full(n, DEFAULTS.get(key, default))
+
+    def flag(key):
+        return np.asarray(columns[key], dtype=bool) if key in columns else np.zeros(n, dtype=bool)
+
+    age = numeric("age")
+    is_male = np.char.lower(text("gender").astype(str)) == "male"
+
+    height_m = height_cm / 100
+    bmi = weight_kg / (height_m * height_m)
+    bmi_rounded = np.round(bmi, 2)
+
+    bmr = 10 * weight_kg + 6.25 * height_cm - 5 * age + np.where(is_male, 5.0, -161.0)
+
+    activity = text("activity_level")
+    multiplier = np.full(n, DEFAULT_ACTIVITY_MULTIPLIER)
+    for level, value in ACTIVITY_MULTIPLIERS.items():
+        multiplier[activity == level] = value
+    tdee = np.round(bmr * multiplier)
+
+    goal = text("goal")
+    adjustment = np.zeros(n)
+    for name, delta in GOAL_ADJUSTMENTS.items():
+        adjustment[goal == name] = delta
+    calorie_target = tdee + adjustment
+
+    result = {
+        "bmi": bmi_rounded,
+        "bmi_category": np.searchsorted(np.array(BMI_BOUNDS), bmi_rounded, side="right").astype(np.int8),
+        "bmr": np.round(bmr),
+        "tdee": tdee,
+        "calorie_target": calorie_target,
+    }
+    for name, (share, kcal_per_g) in MACRO_SPLIT.items():
+        result[name] = np.round(calorie_target * share / kcal_per_g)
+
+    level = _LEVEL
+    risk = {name: np.zeros(n, dtype=np.int8) for name in RISKS}
+
+    def raise_to(name, mask, value):
+        np.maximum(risk[name], np.where(mask, level[value], 0).astype(np.int8), out=risk[name])
+
+    obese, overweight = bmi >= 30, (bmi >= 25) & (bmi < 30)
+    raise_to("obesity", obese, "High")
+    raise_to("diabetes", obese, "Elevated")
+    raise_to("heart_disease", obese, "Elevated")
+    for name in ("obesity", "diabetes", "heart_disease"):
+        raise_to(name, overweight, "Moderate")
+    smoker = flag("smoker")
+    raise_to("lung_disease", smoker, "High")
+    raise_to("heart_disease", smoker, "High")
+    alcohol = text("alcohol_consumption", "none")
+    raise_to("liver_disease", alcohol == "frequent", "High")
+    raise_to("liver_disease", alcohol == "occasional", "Low")
+    raise_to("diabetes", flag("family_diabetes"), "Low")
+    raise_to("heart_disease", flag("family_heart_disease"), "Low")
+    raise_to("metabolic_disorders", numeric("sleep_hours") < 6, "Moderate")
+    raise_to("hypertension", text("stress_level", "low") == "high", "Moderate")
+    for name, codes in risk.items():
+        result[f"risk_{name}"] = codes
+
+    ideal_weight = np.where(is_male, 50.0, 45.5) + 2.3 * (height_cm / 2.54 - 60)
+    result["ideal_weight_min_kg"] = np.round(ideal_weight - 5, 1)
+    result["ideal_weight_max_kg"] = np.round(ideal_weight + 5, 1)
+    return result
+
+
+def columnar_row(result: Dict, index: int) -> Dict:
+    """One profile from ``compute_columnar`` output, shaped like ``compute_metrics``."""
+    calorie_target = int(result["calorie_target"][index])
+    return {
+        "bmi": float(result["bmi"][index]),
+        "bmi_category": BMI_CATEGORIES[int(result["bmi_category"][index])],
+        "bmr": int(result["bmr"][index]),
+        "tdee": int(result["tdee"][index]),
+        "calorie_target": calorie_target,
+        "macros": {name: int(result[name][index]) for name in MACRO_SPLIT},
+        "disease_risks": {
+            name: RISK_LEVELS[int(result[f"risk_{name}"][index])]
+            for name in RISKS if result[f"risk_{name}"][index]
+        },
+        "ideal_weight_range_kg": (
+            float(result["ideal_weight_min_kg"][index]),
+            float(result["ideal_weight_max_kg"][index]),
+        ),
+    }
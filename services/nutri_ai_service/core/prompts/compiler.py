@@ -0,0 +1,175 @@
+"""
+Prompt compilation for Ana and consumability scoring.
+
+Prompts are assembled from segments in a fixed order, most stable first:
+
+1. static system segment (persona, rules, nutrient-limits JSON), rendered
+   once when the module is imported;
+2. per-user fragment (profile block, disease constraints), cached until the
+   user's settings change (see ``invalidate_user``);
+3. per-request content (ingredients, retrieved knowledge, nutrition facts).
+
+Keeping that order stable means every request for the same user shares a
+byte-identical prefix, which upstream prompt-prefix caching can reuse.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from ..ana.plan_cache import profile_fingerprint, prompt_profile
+
+DATA_DIR = Path(__file__).resolve().parents[4] / "data" / "nutri-ai"
+
+MAX_CACHED_PROFILES = 2048
+
+ANA_PERSONA = (
+    "You are Ana, Wellnix's friendly nutrition assistant. "
+    "You are an expert dietitian trained on the Harvard Medical School "
+    "Guide to Healthy Eating. Your job is to take the ingredients a user "
+    "has available and suggest a practical, healthy diet plan they can "
+    "prepare at home.\n\n"
+    "Guidelines:\n"
+    "- Always be encouraging and positive.\n"
+    "- Suggest 2-3 meal ideas (breakfast / lunch / dinner as applicable).\n"
+    "- For each meal give a short recipe outline (3-5 steps).\n"
+    "- Mention approximate calorie and macro estimates per meal.\n"
+    "- If the user has medical conditions or dietary restrictions, respect them.\n"
+    "- If the ingredients are limited, suggest what single item they could "
+    "add from the store to round out nutrition.\n"
+    "- Keep responses concise but informative. Use markdown formatting.\n"
+    "- End with a short motivational health tip.\n"
+)
+
+SCORING_PERSONA = (
+    "You are a nutritional expert that provides personalized health advice. "
+    "Analyze a food's nutrition against the user's profile and assign a "
+    "Consumability Score from 0-100.\n\n"
+    "Respond in this exact format:\n"
+    "SCORE: [number 0-100]\n\n"
+    "EXPLANATION:\n"
+    "[detailed explanation]\n\n"
+    "RECOMMENDATIONS:\n"
+    "[specific recommendations]"
+)
+
+
+def _load_json(data_dir: Path, filename: str):
+    path = data_dir / filename
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class UserFragments:
+    """Rendered per-user prompt segments."""
+
+    def __init__(self, ana_profile: str, scoring_profile: str, disease_constraints: str):
+        self.ana_profile = ana_profile
+        self.scoring_profile = scoring_profile
+        self.disease_constraints = disease_constraints
+
+    @property
+    def ana_system(self) -> str:
+        """Second (per-user) system segment for Ana."""
+        return (
+            f"{self.ana_profile}\n"
+            "**Disease-Specific Dietary Guidelines:**\n"
+            f"{self.disease_constraints}"
+        ).lstrip()
+
+
+class PromptCompiler:
+    """Holds static prompt segments and an LRU of per-user fragments."""
+
+    def __init__(self, data_dir: Path = DATA_DIR, max_profiles: int = MAX_CACHED_PROFILES):
+        limits = _load_json(data_dir, "nutrient_limits.json")
+        self.nutrient_limits_json = json.dumps(limits.get("general", {}), indent=2)
+
+        self._disease_blocks: Dict[str, str] = {}
+        for name, info in _load_json(data_dir, "diseases.json").items():
+            self._disease_blocks[name.lower()] = (
+                f"{info.get('recommended_diet', '')} "
+                f"Risks: {json.dumps(info.get('nutrient_risks', {}))}"
+            )
+
+        self.ana_system = (
+            f"{ANA_PERSONA}\n"
+            "**Daily Nutrient Limits:**\n"
+            f"{self.nutrient_limits_json}"
+        )
+        self.scoring_system = SCORING_PERSONA
+
+        self.max_profiles = max_profiles
+        self._fragments: "OrderedDict[Tuple, UserFragments]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def fragments(self, user_profile: Optional[Dict], user_id: Optional[int] = None) -> UserFragments:
+        """Per-user fragments, rendered once per (user, profile) pair."""
+        key = (user_id, profile_fingerprint(user_profile))
+        with self._lock:
+            cached = self._fragments.get(key)
+            if cached is not None:
+                self._fragments.move_to_end(key)
+                return cached
+
+        rendered = self._render(user_profile)
+        with self._lock:
+            self._fragments[key] = rendered
+            while len(self._fragments) > self.max_profiles:
+                self._fragments.popitem(last=False)
+        return rendered
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop cached fragments after the user's settings change."""
+        with self._lock:
+            for key in [k for k in self._fragments if k[0] == user_id]:
+                del self._fragments[key]
+
+    def _render(self, profile: Optional[Dict]) -> UserFragments:
+        fields = prompt_profile(profile)
+        diseases = fields["diseases"] if fields else []
+        entries = [
+            f"**{name}**: {self._disease_blocks[name.lower()]}"
+            for name in diseases if name.lower() in self._disease_blocks
+        ]
+        disease_constraints = "\n".join(entries) if entries else "No specific disease constraints."
+
+        if not fields:
+            return UserFragments("", "USER PROFILE:\nNot provided", disease_constraints)
+
+        allergies = ", ".join(fields["allergies"]) or "None"
+        conditions = ", ".join(diseases) or "None"
+        ana_profile = (
+            "**User Profile:**\n"
+            f"- Age: {fields['age']}\n"
+            f"- Gender: {fields['gender']}\n"
+            f"- Activity Level: {fields['activity_level']}\n"
+            f"- Diet Type: {fields['diet_type']}\n"
+            f"- Goal: {fields['goal']}\n"
+            f"- Allergies: {allergies}\n"
+            f"- Medical Conditions: {conditions}\n"
+        )
+        metrics = fields["metrics"]
+        if metrics:
+            ana_profile += (
+                f"- BMI: {metrics['bmi']} ({metrics['bmi_category']})\n"
+                f"- Daily Targets: {metrics['calorie_target']} kcal, "
+                f"carbs {metrics['carbs_g']} g, protein {metrics['protein_g']} g, "
+                f"fat {metrics['fat_g']} g\n"
+            )
+        scoring_profile = (
+            "USER PROFILE:\n"
+            f"Age: {fields['age']}, Gender: {fields['gender']}\n"
+            f"Activity: {fields['activity_level']}, Goal: {fields['goal']}\n"
+            f"Diet: {fields['diet_type']}\n"
+            f"Allergies: {allergies}\n"
+            f"Medical Conditions: {conditions}"
+        )
+        return UserFragments(ana_profile, scoring_profile, disease_constraints)
+
+
+prompt_compiler = PromptCompiler()
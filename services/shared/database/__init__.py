@@ -1,4 +1,4 @@
 # Wellnix Database Module
-from .models import db, User, ScanHistory, WorkoutSession, Achievement, APIKey, init_db
+from .models import db, User, ScanHistory, ProductCatalog, UserHealthMetrics, WorkoutSession, Achievement, APIKey, init_db
 
-__all__ = ['db', 'User', 'ScanHistory', 'WorkoutSession', 'Achievement', 'APIKey', 'init_db']
+__all__ = ['db', 'User', 'ScanHistory', 'ProductCatalog', 'UserHealthMetrics', 'WorkoutSession', 'Achievement', 'APIKey', 'init_db']
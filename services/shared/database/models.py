@@ -5,6 +5,7 @@ Shared across all microservices
 
 from datetime import datetime, timezone
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 
@@ -47,6 +48,7 @@ class User(db.Model, UserMixin):
     # Relationships
     scans = db.relationship('ScanHistory', backref='user', lazy='dynamic', cascade='all, delete-orphan')
     workouts = db.relationship('WorkoutSession', backref='user', lazy='dynamic', cascade='all, delete-orphan')
+    health_metrics = db.relationship('UserHealthMetrics', backref='user', uselist=False, cascade='all, delete-orphan')
     
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -108,7 +110,7 @@ class ScanHistory(db.Model):
     # Product info
     product_name = db.Column(db.String(255))
     brand = db.Column(db.String(255))
-    barcode = db.Column(db.String(50))
+    barcode = db.Column(db.String(50), index=True)
     
     # Nutrition data
     nutrition_data = db.Column(db.JSON)
@@ -154,6 +156,74 @@ class ScanHistory(db.Model):
         }
 
 
+class ProductCatalog(db.Model):
+    """Canonical nutrition data per barcode (skips OCR on repeat scans)"""
+    __tablename__ = 'product_catalog'
+
+    id = db.Column(db.Integer, primary_key=True)
+    barcode = db.Column(db.String(50), unique=True, nullable=False, index=True)
+
+    product_name = db.Column(db.String(255))
+    brand = db.Column(db.String(255))
+    nutrition_data = db.Column(db.JSON, nullable=False)
+
+    # How the entry got here and how often it has been scanned
+    source = db.Column(db.String(20), default='promoted')  # promoted, manual
+    scan_count = db.Column(db.Integer, default=0)
+
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    def to_dict(self):
+        return {
+            'barcode': self.barcode,
+            'product_name': self.product_name,
+            'brand': self.brand,
+            'nutrition_data': self.nutrition_data,
+            'source': self.source,
+            'scan_count': self.scan_count,
+        }
+
+
+class UserHealthMetrics(db.Model):
+    """Health metrics computed from the user's profile, refreshed when it changes"""
+    __tablename__ = 'user_health_metrics'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), unique=True, nullable=False, index=True)
+
+    bmi = db.Column(db.Float)
+    bmi_category = db.Column(db.String(20))
+    bmr = db.Column(db.Integer)
+    tdee = db.Column(db.Integer)
+    calorie_target = db.Column(db.Integer)
+    carbs_g = db.Column(db.Integer)
+    protein_g = db.Column(db.Integer)
+    fat_g = db.Column(db.Integer)
+    disease_risks = db.Column(db.JSON, default=dict)
+    ideal_weight_min_kg = db.Column(db.Float)
+    ideal_weight_max_kg = db.Column(db.Float)
+
+    computed_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    def to_dict(self):
+        """Same shape as the metrics engine's ``compute_metrics``"""
+        return {
+            'bmi': self.bmi,
+            'bmi_category': self.bmi_category,
+            'bmr': self.bmr,
+            'tdee': self.tdee,
+            'calorie_target': self.calorie_target,
+            'macros': {
+                'carbs_g': self.carbs_g,
+                'protein_g': self.protein_g,
+                'fat_g': self.fat_g,
+            },
+            'disease_risks': self.disease_risks or {},
+            'ideal_weight_range_kg': (self.ideal_weight_min_kg, self.ideal_weight_max_kg),
+        }
+
+
 class WorkoutSession(db.Model):
     """Workout/exercise session history"""
     __tablename__ = 'workout_sessions'
@@ -232,9 +302,19 @@ class APIKey(db.Model):
     last_used = db.Column(db.DateTime)
 
 
+# create_all() never alters existing tables, so indexes added to them
+# after the first deploy are created here (SQLite / PostgreSQL syntax).
+ADDED_INDEXES = (
+    ('ix_scan_history_barcode', 'scan_history', 'barcode'),
+)
+
+
 def init_db(app):
     """Initialize database with app context"""
     db.init_app(app)
     with app.app_context():
         db.create_all()
+        for name, table, column in ADDED_INDEXES:
+            db.session.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({column})'))
+        db.session.commit()
 